@@ -0,0 +1,35 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .models import User
+from .tokens import get_token_version
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the signed role claim instead of loading the user row.
+
+    ``request.user`` is a User holding only id and role; any other field loads
+    the row on first access. Tokens are checked against the user's current
+    token version (see accounts.tokens), so changing the role, the
+    password or is_active revokes them. Tokens issued without these claims
+    fall back to the usual database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token or 'tv' not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        version = get_token_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if version != validated_token['tv']:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+        return User.from_claims(user_id, validated_token['role'], version)
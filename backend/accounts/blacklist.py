@@ -0,0 +1,117 @@
+"""
+In-process cache of blacklisted refresh-token JTIs.
+
+Checking a refresh token against ``token_blacklist.BlacklistedToken`` costs a
+query on every refresh, although almost no presented token is blacklisted.
+``BlacklistCache`` keeps a bloom filter of every blacklisted JTI: a token not in
+the filter is certainly not blacklisted and needs no query. Filter hits (real or
+false positives) are answered from a bounded LRU of confirmed lookups, falling
+back to the database.
+
+Each process picks up rows blacklisted by other processes by reading only the
+rows added since its last sync, at most every ``TOKEN_BLACKLIST_SYNC_SECONDS``.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+
+from django.conf import settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, key):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+
+class BlacklistCache:
+    capacity = 100_000
+    error_rate = 0.01
+    lru_size = 4096
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.lru = OrderedDict()
+        self.last_id = 0
+        self.count = 0
+        self.synced_at = 0.0
+
+    def is_blacklisted(self, jti):
+        self.sync()
+        with self.lock:
+            if jti not in self.bloom:
+                return False
+            if jti in self.lru:
+                self.lru.move_to_end(jti)
+                return self.lru[jti]
+        blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        self.remember(jti, blacklisted)
+        return blacklisted
+
+    def add(self, jti):
+        self.sync()
+        with self.lock:
+            self.bloom.add(jti)
+            self.count += 1
+        self.remember(jti, True)
+
+    def remember(self, jti, blacklisted):
+        with self.lock:
+            self.lru[jti] = blacklisted
+            self.lru.move_to_end(jti)
+            while len(self.lru) > self.lru_size:
+                self.lru.popitem(last=False)
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and self.bloom is not None and now - self.synced_at < settings.TOKEN_BLACKLIST_SYNC_SECONDS:
+            return
+        if self.bloom is None or self.count > self.capacity:
+            self.rebuild()
+        else:
+            self.load(BlacklistedToken.objects.filter(id__gt=self.last_id))
+        self.synced_at = now
+
+    def rebuild(self):
+        # Rows for expired tokens are left to prune_tokens; they cost filter space only.
+        bloom = BloomFilter(max(self.capacity, 2 * BlacklistedToken.objects.count()), self.error_rate)
+        with self.lock:
+            self.bloom, self.count, self.last_id = bloom, 0, 0
+            self.lru.clear()
+        self.load(BlacklistedToken.objects.all())
+
+    def load(self, queryset):
+        rows = queryset.order_by('id').values_list('id', 'token__jti')
+        for row_id, jti in rows.iterator(chunk_size=5000):
+            with self.lock:
+                self.bloom.add(jti)
+                self.count += 1
+                self.last_id = max(self.last_id, row_id)
+                if jti in self.lru:
+                    self.lru[jti] = True
+
+    def clear(self):
+        with self.lock:
+            self.bloom = None
+            self.lru.clear()
+            self.last_id = self.count = 0
+
+
+blacklist_cache = BlacklistCache()
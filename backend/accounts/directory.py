@@ -0,0 +1,95 @@
+"""
+Cached reads of the employee directory and of users' own profiles.
+
+They are cached in ``caches[settings.USER_DIRECTORY_CACHE]``, which must be a
+backend every process shares, since invalidation only reaches that cache.
+When the setting is None (the default) nothing is cached.
+
+Directory responses are cached under a version number that every user save or
+delete bumps (see accounts/signals.py), so stale pages are never looked up
+again and simply expire. Profiles are cached per user and rewritten when the
+user is saved. Bulk writes (``bulk_create``, ``queryset.update``) send no
+signals: call ``bump_directory_version()`` after them, otherwise they show up
+within ``USER_DIRECTORY_CACHE_TIMEOUT`` seconds.
+
+``?q=`` matches a prefix of the username, first or last name ("ann" or
+"ann sm" for Ann Smith). On PostgreSQL the matches come from pattern-ops
+indexes on the upper-cased columns (accounts migration 0005).
+"""
+import hashlib
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from tasks_tracker.pagination import KeysetPagination
+
+DIRECTORY_VERSION_KEY = 'accounts:directory:version'
+DIRECTORY_PARAMS = ('q', 'cursor', 'page_size')
+PREFIX_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def directory_cache():
+    """The cache named by settings.USER_DIRECTORY_CACHE, or None when caching is off."""
+    if settings.USER_DIRECTORY_CACHE is None:
+        return None
+    return caches[settings.USER_DIRECTORY_CACHE]
+
+
+def directory_version():
+    cache = directory_cache()
+    if cache is None:
+        return 0
+    version = cache.get(DIRECTORY_VERSION_KEY)
+    if version is None:
+        cache.add(DIRECTORY_VERSION_KEY, 1, None)
+        version = cache.get(DIRECTORY_VERSION_KEY, 1)
+    return version
+
+
+def bump_directory_version():
+    cache = directory_cache()
+    if cache is None:
+        return
+    try:
+        cache.incr(DIRECTORY_VERSION_KEY)
+    except ValueError:
+        cache.add(DIRECTORY_VERSION_KEY, 2, None)
+
+
+def directory_cache_key(request):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'accounts:directory:{directory_version()}:{url}'
+
+
+def profile_cache_key(user_id):
+    return f'accounts:profile:{user_id}'
+
+
+def cached_response_data(key, build):
+    cache = directory_cache()
+    if cache is None:
+        return build()
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        # add, not set: never replace a fresher profile written at commit by a save.
+        cache.add(key, data, settings.USER_DIRECTORY_CACHE_TIMEOUT)
+    return data
+
+
+def prefix_filter(query):
+    """Users whose username, first or last name starts with ``query``; two words match first and last name."""
+    words = query.split()
+    if not words:
+        return Q()
+    if len(words) == 1:
+        return reduce(or_, (Q(**{f'{field}__istartswith': words[0]}) for field in PREFIX_FIELDS))
+    return Q(first_name__istartswith=words[0], last_name__istartswith=' '.join(words[1:]))
+
+
+class DirectoryPagination(KeysetPagination):
+    """Directory pages in username order."""
+    ordering = ('username', 'id')
+    field_types = {'username': str, 'id': int}
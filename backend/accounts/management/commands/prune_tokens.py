@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from accounts.models import PasswordResetToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding and blacklisted refresh tokens and expired or used '
+        'password reset tokens, in batches. Meant to run from cron, e.g. hourly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows deleted per statement.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be deleted.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        targets = [
+            # Blacklist rows first, so deleting their outstanding tokens has nothing to cascade to.
+            ('blacklisted tokens', BlacklistedToken.objects.filter(token__expires_at__lte=now)),
+            ('outstanding tokens', OutstandingToken.objects.filter(expires_at__lte=now)),
+            ('password reset tokens', PasswordResetToken.objects.filter(Q(is_used=True) | Q(expires_at__lte=now))),
+        ]
+        for label, queryset in targets:
+            if options['dry_run']:
+                self.stdout.write(f'{label}: {queryset.count()} to delete')
+                continue
+            deleted = self.delete_in_batches(queryset, options['batch_size'])
+            self.stdout.write(f'{label}: {deleted} deleted')
+        self.stdout.write(self.style.SUCCESS('Done.'))
+
+    def delete_in_batches(self, queryset, batch_size):
+        model = queryset.model
+        deleted = 0
+        while True:
+            ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            _, per_model = model.objects.filter(pk__in=ids).delete()
+            deleted += per_model.get(model._meta.label, 0)
@@ -0,0 +1,96 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from accounts.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver queued OutboxEmail rows in batches over one SMTP connection, retrying failures '
+        'with exponential backoff. Runs until stopped, or drains the queue once with --once.'
+    )
+
+    # A claimed row is retried after this long if the worker dies before recording the result.
+    lease = timedelta(minutes=5)
+    max_backoff = timedelta(hours=1)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages sent per SMTP connection.')
+        parser.add_argument('--max-attempts', type=int, default=8, help='Give up on a message after this many tries.')
+        parser.add_argument('--backoff', type=float, default=30, help='Seconds before the first retry; doubles each time.')
+        parser.add_argument('--poll-interval', type=float, default=5, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once no message is due.')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                batch = self.claim(options['batch_size'])
+                if batch:
+                    self.send(batch, options)
+                elif options['once']:
+                    return
+                else:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
+
+    def claim(self, batch_size):
+        """Lease the next due messages so concurrent workers skip them."""
+        now = timezone.now()
+        with transaction.atomic():
+            batch = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:batch_size]
+            )
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                attempts=F('attempts') + 1, next_attempt_at=now + self.lease
+            )
+        for email in batch:
+            email.attempts += 1
+        return batch
+
+    def send(self, batch, options):
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as exc:
+            for email in batch:
+                self.failed(email, exc, options)
+            return
+
+        sent = 0
+        try:
+            for email in batch:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email or None, [email.to], connection=connection
+                )
+                try:
+                    message.send()
+                except Exception as exc:
+                    self.failed(email, exc, options)
+                else:
+                    OutboxEmail.objects.filter(pk=email.pk).update(
+                        status='sent', sent_at=timezone.now(), last_error=''
+                    )
+                    sent += 1
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        self.stdout.write(f'Sent {sent} of {len(batch)} message(s).')
+
+    def failed(self, email, exc, options):
+        error = f'{type(exc).__name__}: {exc}'
+        if email.attempts >= options['max_attempts']:
+            OutboxEmail.objects.filter(pk=email.pk).update(status='failed', last_error=error)
+            self.stderr.write(f'Giving up on outbox email {email.pk} after {email.attempts} attempts: {error}')
+            return
+        delay = min(timedelta(seconds=options['backoff'] * 2 ** (email.attempts - 1)), self.max_backoff)
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() + delay, last_error=error)
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+PREFIX_INDEXES = {
+    'accounts_user_username_prefix_idx': 'username',
+    'accounts_user_first_name_prefix_idx': 'first_name',
+    'accounts_user_last_name_prefix_idx': 'last_name',
+}
+
+
+def add_prefix_indexes(apps, schema_editor):
+    # PostgreSQL only: istartswith compiles to UPPER(col::text) LIKE UPPER(%s), which
+    # can use an index on the same expression with text_pattern_ops.
+    if schema_editor.connection.vendor == 'postgresql':
+        for name, column in PREFIX_INDEXES.items():
+            schema_editor.execute(
+                f'CREATE INDEX {name} ON accounts_user (UPPER({column}::text) text_pattern_ops)'
+            )
+
+
+def remove_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for name in PREFIX_INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_prefix_indexes, remove_prefix_indexes),
+    ]
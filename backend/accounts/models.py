@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import caches
+from django.db import models, transaction
+import secrets
 import uuid
+from datetime import timedelta
 from django.utils import timezone
 
 class User(AbstractUser):
@@ -12,7 +16,12 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='employee')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    
+    # Carried in every JWT as the "tv" claim; bumping it revokes the user's tokens.
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # Changing any of these invalidates issued tokens.
+    TOKEN_BOUND_FIELDS = ('role', 'is_active')
+
     def __str__(self):
         return f"{self.username} ({self.role})"
     
@@ -20,6 +29,60 @@ class User(AbstractUser):
     def is_manager(self):
         return self.role == 'GM'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_token_fields = {
+            field: getattr(instance, field) for field in cls.TOKEN_BOUND_FIELDS if field in field_names
+        }
+        return instance
+
+    @classmethod
+    def from_claims(cls, user_id, role, token_version, db='default'):
+        """A user built from token claims; other fields load from the database on first access."""
+        # Tokens are only issued to active users and deactivation bumps the version,
+        # so a token whose version still matches belongs to an active user.
+        claims = {'id': user_id, 'role': role, 'is_active': True, 'token_version': token_version}
+        return cls.from_db(db, list(claims), [claims[f.attname] for f in cls._meta.concrete_fields if f.attname in claims])
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            # Touching one deferred field (e.g. on a user built from claims) loads them all at once.
+            fields = list(deferred)
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        self.token_version += 1
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_token_fields', {})
+        if any(getattr(self, field) != value for field, value in loaded.items()):
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_token_fields = {field: getattr(self, field) for field in self.TOKEN_BOUND_FIELDS}
+        # Drop the cached version (accounts.tokens) now, and again at commit in case a
+        # concurrent request re-cached the old value in between.
+        cache = token_version_cache()
+        if cache is not None:
+            key = token_version_cache_key(self.pk)
+            cache.delete(key)
+            transaction.on_commit(lambda: cache.delete(key), using=kwargs.get('using'))
+
+
+def token_version_cache():
+    """The cache named by settings.TOKEN_VERSION_CACHE, or None to read versions from the database."""
+    if settings.TOKEN_VERSION_CACHE is None:
+        return None
+    return caches[settings.TOKEN_VERSION_CACHE]
+
+
+def token_version_cache_key(user_id):
+    return f'accounts:token_version:{user_id}'
+
 
 class PasswordResetToken(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='password_reset_tokens')
@@ -38,3 +101,70 @@ class PasswordResetToken(models.Model):
         if not self.expires_at:
             self.expires_at = timezone.now() + timezone.timedelta(hours=1)
         super().save(*args, **kwargs)
+
+
+def new_stream_ticket():
+    return secrets.token_urlsafe(32)
+
+
+class StreamTicketManager(models.Manager):
+    def issue(self, user):
+        self.filter(created_at__lt=timezone.now() - timedelta(seconds=settings.STREAM_TICKET_SECONDS)).delete()
+        return self.create(user=user)
+
+    def redeem(self, key):
+        """The ticket's user, or None if it is unknown, expired or already used."""
+        cutoff = timezone.now() - timedelta(seconds=settings.STREAM_TICKET_SECONDS)
+        ticket = self.select_related('user').filter(key=key, created_at__gte=cutoff).first()
+        # Only the request that deletes the row gets to use it.
+        if ticket is None or not self.filter(pk=ticket.pk).delete()[0]:
+            return None
+        return ticket.user
+
+
+class StreamTicket(models.Model):
+    """A short-lived, single-use credential for opening /api/events/ (EventSource cannot send headers)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=64, unique=True, default=new_stream_ticket)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = StreamTicketManager()
+
+    def __str__(self):
+        return f"Stream ticket for {self.user.username}"
+
+
+class OutboxEmailManager(models.Manager):
+    def enqueue(self, subject, body, to, from_email=None):
+        """Queue a message for the send_outbox worker; commits (or not) with the caller's transaction."""
+        return self.create(subject=subject, body=body, to=to, from_email=from_email or '')
+
+
+class OutboxEmail(models.Model):
+    """An email waiting for, or already through, delivery by ``manage.py send_outbox``."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to = models.EmailField()
+    from_email = models.CharField(max_length=254, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutboxEmailManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to} ({self.status})"
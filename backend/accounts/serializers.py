@@ -1,7 +1,12 @@
 from rest_framework import serializers
+from tasks_tracker.instrumentation import TimedSerializerMixin
 from django.contrib.auth import authenticate
 from django.core.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from .models import User, PasswordResetToken
+from .tokens import RoleRefreshToken, get_token_version
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -17,7 +22,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'is_manager', 'created_at')
@@ -51,3 +56,14 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         except PasswordResetToken.DoesNotExist:
             raise ValidationError("Invalid token.")
         return value
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refuses refresh tokens revoked by a role, password or activation change."""
+    token_class = RoleRefreshToken
+
+    def validate(self, attrs):
+        payload = self.token_class(attrs['refresh']).payload
+        if 'tv' in payload and get_token_version(int(payload[api_settings.USER_ID_CLAIM])) != payload['tv']:
+            raise InvalidToken('Token has been revoked')
+        return super().validate(attrs)
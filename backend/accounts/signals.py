@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .directory import bump_directory_version, directory_cache, profile_cache_key
+from .models import User
+from .serializers import UserSerializer
+
+# Saves touching only these fields leave the cached directory and profile as they are.
+UNLISTED_FIELDS = {'password', 'last_login', 'token_version', 'updated_at'}
+
+
+@receiver(post_save, sender=User)
+def refresh_user_caches(sender, instance, update_fields=None, using=None, **kwargs):
+    cache = directory_cache()
+    if cache is None or (update_fields is not None and set(update_fields) <= UNLISTED_FIELDS):
+        return
+    key = profile_cache_key(instance.pk)
+    # Invalidate now; at commit bump the directory again (pages may have been
+    # rebuilt from the old rows meanwhile) and write the profile through.
+    cache.delete(key)
+    bump_directory_version()
+
+    def on_commit():
+        bump_directory_version()
+        if update_fields is None:
+            cache.set(key, UserSerializer(instance).data, settings.USER_DIRECTORY_CACHE_TIMEOUT)
+        else:
+            # Fields outside update_fields may be stale on this instance.
+            cache.delete(key)
+    transaction.on_commit(on_commit, using=using)
+
+
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, using=None, **kwargs):
+    cache = directory_cache()
+    if cache is None:
+        return
+    key = profile_cache_key(instance.pk)
+    cache.delete(key)
+    bump_directory_version()
+
+    def on_commit():
+        cache.delete(key)
+        bump_directory_version()
+    transaction.on_commit(on_commit, using=using)
@@ -1,3 +1,495 @@
-from django.test import TestCase
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from tasks.models import Task
+from .blacklist import BloomFilter, blacklist_cache
+from .models import OutboxEmail, PasswordResetToken, User
+from .throttling import LoginUsernameThrottle
+from .tokens import RoleRefreshToken
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_cache.clear()
+        self.client = APIClient()
+        self.employee = User.objects.create_user('employee', password='secret-pass-1', first_name='Ada')
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        Task.objects.create(title='Write report', created_by=self.manager, assigned_to=self.employee)
+
+    def login(self, username):
+        response = self.client.post('/api/auth/login/', {'username': username, 'password': 'secret-pass-1'})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def get(self, url, tokens):
+        return self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def test_authenticated_request_does_not_load_user(self):
+        tokens = self.login('manager')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('/api/tasks/tasks/', tokens)
+        self.assertEqual(response.status_code, 200)
+        user_queries = [q['sql'] for q in queries.captured_queries if 'FROM "accounts_user"' in q['sql']]
+        self.assertEqual(len(user_queries), 1)
+        # Just the token version, not the row.
+        self.assertTrue(user_queries[0].startswith('SELECT "accounts_user"."token_version" AS "token_version" FROM'))
+
+    @override_settings(TOKEN_VERSION_CACHE='default')
+    def test_token_versions_from_the_cache(self):
+        tokens = self.login('employee')
+        self.get('/api/tasks/tasks/', tokens)  # warm the token version cache
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get('/api/tasks/tasks/', tokens).status_code, 200)
+        self.assertFalse([q for q in queries.captured_queries if 'FROM "accounts_user"' in q['sql']])
+
+        self.employee.role = 'GM'
+        self.employee.save()
+        self.assertEqual(self.get('/api/tasks/tasks/', tokens).status_code, 401)
+
+    def test_deferred_fields_load_together(self):
+        tokens = self.login('employee')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('/api/auth/profile/', tokens)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['first_name'], 'Ada')
+        self.assertEqual(len([q for q in queries.captured_queries if 'password' in q['sql']]), 1)
+
+    def test_role_change_revokes_tokens(self):
+        tokens = self.login('employee')
+        self.assertEqual(self.get('/api/tasks/tasks/', tokens).status_code, 200)
+
+        self.employee.role = 'GM'
+        self.employee.save()
+
+        self.assertEqual(self.get('/api/tasks/tasks/', tokens).status_code, 401)
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.get('/api/tasks/tasks/', self.login('employee')).status_code, 200)
+
+    def test_deactivation_revokes_tokens(self):
+        tokens = self.login('employee')
+        self.employee.is_active = False
+        self.employee.save(update_fields=['is_active'])
+        self.assertEqual(self.get('/api/tasks/tasks/', tokens).status_code, 401)
+
+    def test_password_reset_revokes_tokens(self):
+        tokens = self.login('employee')
+        reset = PasswordResetToken.objects.create(user=self.employee)
+
+        response = self.client.post('/api/auth/password-reset/confirm/', {
+            'token': str(reset.token), 'new_password': 'secret-pass-2', 'confirm_password': 'secret-pass-2',
+        })
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.get('/api/tasks/tasks/', tokens).status_code, 401)
+
+    def test_refresh_keeps_claims(self):
+        tokens = self.login('employee')
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get('/api/tasks/tasks/my_tasks/', response.data).status_code, 200)
+
+    def test_tokens_without_claims_still_work(self):
+        refresh = RefreshToken.for_user(self.employee)
+        self.assertEqual(self.get('/api/tasks/tasks/', {'access': str(refresh.access_token)}).status_code, 200)
+
+
+@override_settings(USER_DIRECTORY_CACHE='default')
+class UserDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_cache.clear()
+        self.client = APIClient()
+        self.manager = User.objects.create_user('manager', role='GM')
+        self.employees = [
+            User.objects.create_user(username, first_name=first, last_name=last)
+            for username, first, last in [
+                ('asmith', 'Ann', 'Smith'), ('bjones', 'Bob', 'Jones'), ('cann', 'Carl', 'Annan'),
+                ('dsmall', 'Dana', 'Small'), ('ewu', 'Eve', 'Wu'),
+            ]
+        ]
+        self.client.force_authenticate(self.manager)
+
+    def test_directory_is_cached_until_a_user_changes(self):
+        self.assertEqual(len(self.client.get('/api/auth/employees/').data), 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.client.get('/api/auth/employees/').data), 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user('fnew', first_name='Fay')
+        self.assertEqual(len(self.client.get('/api/auth/employees/').data), 6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employees[0].delete()
+        self.assertEqual(len(self.client.get('/api/auth/employees/').data), 5)
+
+    def test_login_bookkeeping_keeps_the_cache(self):
+        self.client.get('/api/auth/employees/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employees[0].set_password('another-pass-1')
+            self.employees[0].save(update_fields=['password', 'token_version'])
+        with self.assertNumQueries(0):
+            self.client.get('/api/auth/employees/')
+
+    def test_prefix_lookup(self):
+        def usernames(query):
+            response = self.client.get('/api/auth/employees/', {'q': query})
+            self.assertEqual(response.status_code, 200)
+            return [user['username'] for user in response.data['results']]
+
+        self.assertEqual(usernames('ann'), ['asmith', 'cann'])
+        self.assertEqual(usernames('SM'), ['asmith', 'dsmall'])
+        self.assertEqual(usernames('ann sm'), ['asmith'])
+        self.assertEqual(usernames('zed'), [])
+        self.assertEqual(usernames('manager'), [])
+
+    @override_settings(USER_DIRECTORY_CACHE=None)
+    def test_nothing_is_cached_without_a_directory_cache(self):
+        self.client.get('/api/auth/employees/')
+        self.client.get('/api/auth/profile/')
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.client.get('/api/auth/employees/').data), 5)
+        User.objects.filter(pk=self.manager.pk).update(first_name='Renamed')
+        self.manager.refresh_from_db()
+        self.assertEqual(self.client.get('/api/auth/profile/').data['first_name'], 'Renamed')
+
+    def test_paging(self):
+        response = self.client.get('/api/auth/employees/', {'page_size': 2})
+        self.assertEqual([user['username'] for user in response.data['results']], ['asmith', 'bjones'])
+        seen = []
+        url = '/api/auth/employees/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            seen += [user['username'] for user in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, ['asmith', 'bjones', 'cann', 'dsmall', 'ewu'])
+
+    def test_profile_is_written_through_on_save(self):
+        employee = self.employees[1]
+        self.client.force_authenticate(employee)
+        self.assertEqual(self.client.get('/api/auth/profile/').data['first_name'], 'Bob')
+        with self.assertNumQueries(0):
+            self.client.get('/api/auth/profile/')
+
+        employee.first_name = 'Robert'
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/auth/profile/').data['first_name'], 'Robert')
+
+
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('employee', password='secret-pass-1')
+
+    def login(self):
+        return self.client.post('/api/auth/login/', {'username': 'employee', 'password': 'secret-pass-1'}).data
+
+    def refresh(self, tokens):
+        return self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f'jti-{i}' for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_refresh_skips_blacklist_query(self):
+        tokens = self.login()
+        self.refresh(self.login())  # first use loads the filter
+        with CaptureQueriesContext(connection) as queries:
+            response = self.refresh(tokens)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries.captured_queries if 'token_blacklist_blacklistedtoken' in q['sql']])
+
+    def test_logout_blacklists_refresh_token(self):
+        tokens = self.login()
+        response = self.client.post(
+            '/api/auth/logout/', {'refresh': tokens['refresh']}, HTTP_AUTHORIZATION=f"Bearer {tokens['access']}"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(tokens).status_code, 401)
+
+    def test_picks_up_tokens_blacklisted_elsewhere(self):
+        tokens = self.login()
+        self.assertEqual(self.refresh(tokens).status_code, 200)
+
+        # Blacklisted by another process: visible after the next sync.
+        jti = RoleRefreshToken(tokens['refresh'])['jti']
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+        blacklist_cache.sync(force=True)
+        self.assertEqual(self.refresh(tokens).status_code, 401)
+
+    def test_prune_tokens(self):
+        tokens = self.login()
+        expired = OutstandingToken.objects.create(
+            jti='expired', token='x', expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        BlacklistedToken.objects.create(token=expired)
+        used = PasswordResetToken.objects.create(user=self.user, is_used=True)
+        live = PasswordResetToken.objects.create(user=self.user)
+        PasswordResetToken.objects.create(user=self.user, expires_at=timezone.now() - timedelta(minutes=1))
+
+        out = StringIO()
+        call_command('prune_tokens', batch_size=1, stdout=out)
+
+        self.assertIn('blacklisted tokens: 1 deleted', out.getvalue())
+        self.assertIn('outstanding tokens: 1 deleted', out.getvalue())
+        self.assertIn('password reset tokens: 2 deleted', out.getvalue())
+        self.assertQuerySetEqual(
+            OutstandingToken.objects.values_list('jti', flat=True), [RoleRefreshToken(tokens['refresh'])['jti']]
+        )
+        self.assertQuerySetEqual(PasswordResetToken.objects.all(), [live])
+        self.assertFalse(PasswordResetToken.objects.filter(pk=used.pk).exists())
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Just enough of an SMTP server to receive what the email backend sends."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            self.wfile.write(f'{line}\r\n'.encode())
+
+        def handle(self):
+            self.server.connections += 1
+            self.reply('220 localhost ready')
+            for raw in self.rfile:
+                command = raw.decode().strip().upper()
+                if command.startswith(('EHLO', 'HELO')):
+                    self.reply('250 localhost')
+                elif command == 'DATA':
+                    self.reply('354 end with .')
+                    lines = []
+                    for line in self.rfile:
+                        if line.rstrip(b'\r\n') == b'.':
+                            break
+                        lines.append(line.decode())
+                    self.server.messages.append(''.join(lines))
+                    self.reply('250 queued')
+                elif command == 'QUIT':
+                    self.reply('221 bye')
+                    return
+                else:
+                    self.reply('250 ok')
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), self.Handler)
+        self.messages = []
+        self.connections = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def smtp_settings(port):
+    return override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+        EMAIL_HOST='127.0.0.1', EMAIL_PORT=port, EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_TIMEOUT=5,
+    )
+
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('employee', email='ada@example.com', password='secret-pass-1')
+
+    def send_outbox(self, **options):
+        call_command('send_outbox', once=True, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_reset_request_queues_email_without_sending(self):
+        with LocalSMTPServer() as server, smtp_settings(server.server_address[1]):
+            response = self.client.post('/api/auth/password-reset/', {'email': 'ada@example.com'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(server.connections, 0)
+
+        email = OutboxEmail.objects.get()
+        token = PasswordResetToken.objects.get(user=self.user)
+        self.assertEqual(email.to, 'ada@example.com')
+        self.assertIn(str(token.token), email.body)
+
+    def test_worker_sends_batch_over_one_connection(self):
+        for i in range(3):
+            OutboxEmail.objects.enqueue(f'Message {i}', 'Hello', 'ada@example.com')
+
+        with LocalSMTPServer() as server, smtp_settings(server.server_address[1]):
+            self.send_outbox()
+
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(len(server.messages), 3)
+        self.assertEqual(OutboxEmail.objects.filter(status='sent', attempts=1).count(), 3)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        email = OutboxEmail.objects.enqueue('Hello', 'Hello', 'ada@example.com')
+        with LocalSMTPServer() as server:
+            port = server.server_address[1]
+        with smtp_settings(port):  # nothing listening any more
+            self.send_outbox(backoff=60)
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertTrue(email.last_error)
+
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        with LocalSMTPServer() as server, smtp_settings(server.server_address[1]):
+            self.send_outbox()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('sent', 2))
+        self.assertEqual(len(server.messages), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        email = OutboxEmail.objects.enqueue('Hello', 'Hello', 'ada@example.com')
+        OutboxEmail.objects.filter(pk=email.pk).update(attempts=2)
+        with LocalSMTPServer() as server:
+            port = server.server_address[1]
+        with smtp_settings(port):
+            self.send_outbox(max_attempts=3)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 3))
+
+
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        User.objects.create_user('employee', email='ada@example.com', password='secret-pass-1')
+
+    def login(self, username='employee', ip='10.0.0.1'):
+        return self.client.post(
+            '/api/auth/login/', {'username': username, 'password': 'wrong'}, REMOTE_ADDR=ip
+        )
+
+    @patch('accounts.throttling.TokenBucketThrottle.timer', return_value=1000.0)
+    def test_username_bucket_rejects_before_hashing(self, timer):
+        for _ in range(5):
+            self.assertEqual(self.login().status_code, 401)
+
+        with patch('accounts.views.authenticate') as authenticate:
+            response = self.login(ip='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(authenticate.called)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+        # Other accounts from the same address are unaffected.
+        self.assertEqual(self.login(username='someone-else').status_code, 401)
+
+    @patch('accounts.throttling.TokenBucketThrottle.timer', return_value=1000.0)
+    def test_ip_bucket(self, timer):
+        for i in range(20):
+            self.assertEqual(self.login(username=f'user{i}').status_code, 401)
+        self.assertEqual(self.login(username='fresh').status_code, 429)
+        self.assertEqual(self.login(username='fresh', ip='10.0.0.9').status_code, 401)
+
+    def test_bucket_refills(self):
+        with patch('accounts.throttling.TokenBucketThrottle.timer', return_value=1000.0):
+            for _ in range(5):
+                self.login()
+            self.assertEqual(self.login().status_code, 429)
+        # One token comes back every 12 seconds at 5/min.
+        with patch('accounts.throttling.TokenBucketThrottle.timer', return_value=1012.0):
+            self.assertEqual(self.login().status_code, 401)
+            self.assertEqual(self.login().status_code, 429)
+
+    @patch('accounts.throttling.TokenBucketThrottle.timer', return_value=1000.0)
+    def test_concurrent_requests_share_the_bucket(self, timer):
+        get, locked = LocMemCache.get, LoginUsernameThrottle.locked
+
+        def slow_get(*args, **kwargs):
+            # Widen the read-modify-write window so that unguarded requests would overwrite each other.
+            value = get(*args, **kwargs)
+            time.sleep(0.01)
+            return value
+
+        @contextmanager
+        def counted(throttle):
+            with locked(throttle) as got:
+                throttle.got_lock = got
+                yield got
+
+        request = SimpleNamespace(data={'username': 'employee'}, META={'REMOTE_ADDR': '10.0.0.1'})
+        barrier = threading.Barrier(10)
+        results = []
+
+        def attempt():
+            throttle = LoginUsernameThrottle()
+            barrier.wait()
+            allowed = throttle.allow_request(request, None)
+            results.append((throttle.got_lock, allowed))
+
+        with patch.object(LocMemCache, 'get', slow_get), patch.object(LoginUsernameThrottle, 'locked', counted):
+            threads = [threading.Thread(target=attempt) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        # Every lock holder that was let through took its token; the others left the bucket alone.
+        taken = sum(1 for got_lock, allowed in results if got_lock and allowed)
+        remaining = sum(LoginUsernameThrottle().allow_request(request, None) for _ in range(10))
+        self.assertEqual(remaining, 5 - taken)
+        if taken < 5:
+            # Nobody was turned away while tokens were left.
+            self.assertEqual([allowed for _, allowed in results], [True] * 10)
+
+    @patch('accounts.throttling.TokenBucketThrottle.timer', return_value=1000.0)
+    def test_a_locked_bucket_does_not_reject_or_wait(self, timer):
+        request = SimpleNamespace(data={'username': 'employee'}, META={'REMOTE_ADDR': '10.0.0.1'})
+        throttle = LoginUsernameThrottle()
+        key = throttle.get_cache_key(request, None)
+        cache.add(f'{key}:lock', 'someone-else', 60)
+
+        start = time.monotonic()
+        self.assertTrue(all(LoginUsernameThrottle().allow_request(request, None) for _ in range(10)))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+        # Nothing was taken from the bucket; once it is empty, locked or not, requests are rejected.
+        cache.delete(f'{key}:lock')
+        self.assertEqual(sum(LoginUsernameThrottle().allow_request(request, None) for _ in range(10)), 5)
+        cache.add(f'{key}:lock', 'someone-else', 60)
+        self.assertFalse(LoginUsernameThrottle().allow_request(request, None))
+
+    def test_password_reset_throttle(self):
+        for _ in range(3):
+            self.assertEqual(
+                self.client.post('/api/auth/password-reset/', {'email': 'ada@example.com'}).status_code, 200
+            )
+        response = self.client.post('/api/auth/password-reset/', {'email': 'ADA@example.com'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(OutboxEmail.objects.count(), 3)
+
+    @override_settings(METRICS_TOKEN='scrape')
+    def test_metrics_count_decisions(self):
+        for _ in range(6):
+            self.login(username='metrics-user')
+        body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape').content.decode()
+        self.assertIn('# TYPE tasks_tracker_throttle_decisions_total counter', body)
+        self.assertRegex(body, r'tasks_tracker_throttle_decisions_total\{scope="login_username",outcome="rejected"\} \d+')
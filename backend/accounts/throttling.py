@@ -0,0 +1,120 @@
+import hashlib
+import math
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+from tasks_tracker.metrics import Counter
+
+throttle_decisions = Counter(
+    'tasks_tracker_throttle_decisions_total',
+    'Requests seen by the login and password reset throttles.',
+    ['scope', 'outcome'],
+)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket throttle: a rate of ``N/period`` allows bursts of N requests,
+    refilled at N per period.
+
+    Throttles run before the view, so a rejected login never reaches the
+    password hasher. Buckets live in ``caches[settings.THROTTLE_CACHE]``: the
+    default local-memory cache limits each process on its own, a shared backend
+    (Redis, Memcached) limits all of them together.
+
+    Reading, refilling and writing a bucket is not atomic on any cache backend,
+    so it happens under a per-bucket lock taken with ``cache.add`` (which is).
+    A request that finds the lock taken does not wait for it: it is decided on
+    the bucket as it reads it and leaves the bucket alone, so contention never
+    turns away a client with tokens left, and an empty bucket still rejects.
+    """
+    lock_timeout = 2
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE]
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_value(request)
+        if not ident:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        with self.locked() as acquired:
+            capacity, refill = self.num_requests, self.num_requests / self.duration
+            now = self.timer()
+            tokens, updated = self.cache.get(self.key, (capacity, now))
+            self.tokens = min(capacity, tokens + (now - updated) * refill)
+            if acquired and self.tokens >= 1:
+                # Idle buckets expire once they would have refilled completely.
+                self.cache.set(self.key, (self.tokens - 1, now), self.duration)
+
+        if self.tokens < 1:
+            throttle_decisions.inc(scope=self.scope, outcome='rejected')
+            return False
+        throttle_decisions.inc(scope=self.scope, outcome='allowed')
+        return True
+
+    @contextmanager
+    def locked(self):
+        """Hold the bucket's lock if it is free; yields whether it was acquired."""
+        lock_key, owner = f'{self.key}:lock', uuid.uuid4().hex
+        if not self.cache.add(lock_key, owner, self.lock_timeout):
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            # Unless it expired and someone else holds it by now.
+            if self.cache.get(lock_key) == owner:
+                self.cache.delete(lock_key)
+
+    def wait(self):
+        return math.ceil((1 - self.tokens) * self.duration / self.num_requests)
+
+
+class IPThrottle(TokenBucketThrottle):
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class AccountThrottle(TokenBucketThrottle):
+    """Keyed on the username or email in the request body, whichever ``field`` names."""
+    field = None
+
+    def get_ident_value(self, request):
+        value = request.data.get(self.field) if hasattr(request.data, 'get') else None
+        if not isinstance(value, str) or not value.strip():
+            return None
+        return hashlib.sha256(value.strip().lower().encode()).hexdigest()
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(AccountThrottle):
+    scope = 'login_username'
+    field = 'username'
+
+
+class PasswordResetIPThrottle(IPThrottle):
+    scope = 'password_reset_ip'
+
+
+class PasswordResetEmailThrottle(AccountThrottle):
+    scope = 'password_reset_email'
+    field = 'email'
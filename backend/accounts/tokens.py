@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .blacklist import blacklist_cache
+from .models import User, token_version_cache, token_version_cache_key
+
+
+def get_token_version(user_id):
+    """
+    Current token version for a user; None if the user is gone.
+
+    Served from ``settings.TOKEN_VERSION_CACHE`` when one is configured, which
+    must be shared by every process: User.save drops the key there when the
+    version changes. Without it the version is read from the database.
+    """
+    cache = token_version_cache()
+    key = token_version_cache_key(user_id)
+    version = cache.get(key) if cache is not None else None
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+        if version is not None and cache is not None:
+            cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token (and derived access tokens) carrying the user's role and token version.
+
+    Blacklist checks go through ``blacklist_cache`` rather than a query per refresh.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['tv'] = user.token_version
+        return token
+
+    def check_blacklist(self):
+        if blacklist_cache.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_cache.add(self.payload[api_settings.JTI_CLAIM])
+        return result
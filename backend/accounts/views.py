@@ -1,12 +1,17 @@
 from rest_framework import status, generics
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
-from django.core.mail import send_mail
+from django.db import transaction
 from django.conf import settings
-from .models import User, PasswordResetToken
+from tasks_tracker.db import replica_reads
+from .directory import (
+    DIRECTORY_PARAMS, DirectoryPagination, cached_response_data, directory_cache_key, prefix_filter, profile_cache_key,
+)
+from .models import User, PasswordResetToken, OutboxEmail
+from .throttling import LoginIPThrottle, LoginUsernameThrottle, PasswordResetIPThrottle, PasswordResetEmailThrottle
+from .tokens import RoleRefreshToken
 from .serializers import UserRegistrationSerializer, UserSerializer, PasswordResetRequestSerializer, PasswordResetConfirmSerializer
 
 class RegisterView(generics.CreateAPIView):
@@ -19,7 +24,7 @@ class RegisterView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
-        refresh = RefreshToken.for_user(user)
+        refresh = RoleRefreshToken.for_user(user)
         return Response({
             'user': UserSerializer(user).data,
             'refresh': str(refresh),
@@ -28,13 +33,14 @@ class RegisterView(generics.CreateAPIView):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginUsernameThrottle])
 def login_view(request):
     username = request.data.get('username')
     password = request.data.get('password')
     
     user = authenticate(username=username, password=password)
     if user:
-        refresh = RefreshToken.for_user(user)
+        refresh = RoleRefreshToken.for_user(user)
         return Response({
             'user': UserSerializer(user).data,
             'refresh': str(refresh),
@@ -53,7 +59,7 @@ def logout_view(request):
     try:
         refresh_token = request.data.get('refresh')
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = RoleRefreshToken(refresh_token)
             token.blacklist()
         return Response({'message': 'Successfully logged out'}, status=status.HTTP_200_OK)
     except Exception as e:
@@ -64,21 +70,35 @@ def logout_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def profile_view(request):
-    serializer = UserSerializer(request.user)
-    return Response(serializer.data)
+    data = cached_response_data(profile_cache_key(request.user.pk), lambda: UserSerializer(request.user).data)
+    return Response(data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def employees_list(request):
-    """Get list of all employees (non-manager users) for task assignment"""
-    employees = User.objects.filter(role='employee')
-    serializer = UserSerializer(employees, many=True)
-    return Response(serializer.data)
+    """Get list of all employees (non-manager users) for task assignment.
+
+    With ?q=, ?page_size= or ?cursor= the list is paged in username order and
+    filtered by name prefix (see accounts/directory.py).
+    """
+    def build():
+        employees = User.objects.filter(role='employee')
+        if not any(param in request.query_params for param in DIRECTORY_PARAMS):
+            return UserSerializer(employees, many=True).data
+        employees = employees.filter(prefix_filter(request.query_params.get('q', '')))
+        paginator = DirectoryPagination()
+        page = paginator.paginate_queryset(employees, request)
+        return paginator.get_paginated_response(UserSerializer(page, many=True).data).data
+
+    return Response(cached_response_data(directory_cache_key(request), build))
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([PasswordResetIPThrottle, PasswordResetEmailThrottle])
 def password_reset_request(request):
     """Request password reset token via email"""
     serializer = PasswordResetRequestSerializer(data=request.data)
@@ -86,16 +106,17 @@ def password_reset_request(request):
         email = serializer.validated_data['email']
         user = User.objects.get(email=email)
         
-        # Invalidate any existing tokens for this user
-        PasswordResetToken.objects.filter(user=user, is_used=False).update(is_used=True)
-        
-        # Create new token
-        reset_token = PasswordResetToken.objects.create(user=user)
-        
-        # Send email
-        reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token.token}"
-        subject = 'Password Reset Request - Tasks Tracker'
-        message = f'''
+        with transaction.atomic():
+            # Invalidate any existing tokens for this user
+            PasswordResetToken.objects.filter(user=user, is_used=False).update(is_used=True)
+            
+            # Create new token
+            reset_token = PasswordResetToken.objects.create(user=user)
+            
+            # Queue the email; manage.py send_outbox delivers it
+            reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token.token}"
+            subject = 'Password Reset Request - Tasks Tracker'
+            message = f'''
         Hello {user.first_name or user.username},
         
         You requested a password reset for your Tasks Tracker account.
@@ -110,23 +131,11 @@ def password_reset_request(request):
         Thank you,
         Tasks Tracker Team
         '''
+            OutboxEmail.objects.enqueue(subject, message, email, settings.DEFAULT_FROM_EMAIL)
         
-        try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [email],
-                fail_silently=False,
-            )
-            return Response({
-                'message': 'Password reset instructions have been sent to your email.'
-            })
-        except Exception as e:
-            return Response(
-                {'error': 'Failed to send email. Please try again later.'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return Response({
+            'message': 'Password reset instructions have been sent to your email.'
+        })
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -145,7 +154,7 @@ def password_reset_confirm(request):
         
         # Set new password
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=['password', 'token_version'])
         
         # Mark token as used
         reset_token.is_used = True
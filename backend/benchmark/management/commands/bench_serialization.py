@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from reports.models import TaskReport
+from reports.serializers import TaskReportSerializer
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from tasks_tracker.fastpath import values_representation
+from tasks_tracker.renderers import ORJSONRenderer, orjson
+
+TARGETS = {
+    'tasks': (Task, TaskSerializer, ('created_by', 'assigned_to')),
+    'reports': (TaskReport, TaskReportSerializer, ('reported_by',)),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare DRF serializers + the stdlib JSON renderer with the .values() fast path + orjson '
+        'on one large page of tasks and reports, and check that both produce the same bytes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; the renderer falls back to json.'))
+        for name, (model, serializer_class, related) in TARGETS.items():
+            queryset = model.objects.order_by('-created_at', '-id')
+            representation = values_representation(serializer_class)
+
+            def baseline():
+                instances = queryset.select_related(*related)[:rows]
+                return JSONRenderer().render(serializer_class(instances, many=True).data)
+
+            def fast():
+                return ORJSONRenderer().render(representation.represent(representation.values(queryset)[:rows]))
+
+            slow_body, fast_body = baseline(), fast()
+            if slow_body != fast_body:
+                raise CommandError(f'{name}: the fast path output differs from the serializer output.')
+            count = len(representation.values(queryset)[:rows])
+            slow_ms, fast_ms = self.time(baseline, repeat), self.time(fast, repeat)
+            self.stdout.write(
+                f'{name}: {count} rows, {len(fast_body)} bytes; serializer+json {slow_ms:.2f} ms, '
+                f'values+orjson {fast_ms:.2f} ms ({slow_ms / fast_ms:.1f}x)'
+            )
+
+    def time(self, function, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
@@ -0,0 +1,71 @@
+import fnmatch
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from benchmark.runner import ScenarioError, compare, run
+from benchmark.scenarios import Fixture, build_scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every API endpoint against the current database (seed it with seed_benchmark first). '
+        'Write scenarios change data, so use a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--scenario', action='append', default=[],
+            help='Only run scenarios matching this glob (e.g. "tasks.*"); may be repeated.',
+        )
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Compare with the results of an earlier run.')
+        parser.add_argument(
+            '--max-regression', type=float, default=0.2,
+            help='Allowed p95 increase over the baseline, as a fraction (default 0.2).',
+        )
+        parser.add_argument('--fail-on-regression', action='store_true')
+        parser.add_argument('--list', action='store_true', help='List the scenarios and exit.')
+
+    def handle(self, *args, **options):
+        try:
+            fx = Fixture()
+        except LookupError as e:
+            raise CommandError(str(e))
+        scenarios = build_scenarios(fx)
+        if options['scenario']:
+            scenarios = [
+                scenario for scenario in scenarios
+                if any(fnmatch.fnmatch(scenario.name, pattern) for pattern in options['scenario'])
+            ]
+        if options['list']:
+            for scenario in scenarios:
+                self.stdout.write(scenario.name)
+            return
+        if not scenarios:
+            raise CommandError('No scenarios match.')
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+
+        try:
+            results = run(fx, scenarios, options['iterations'], options['warmup'], log=self.stdout.write)
+        except ScenarioError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = compare(results, baseline, options['max_regression'])
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+                return
+            for line in regressions:
+                self.stdout.write(self.style.WARNING(line))
+            if options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} regression(s) against the baseline.')
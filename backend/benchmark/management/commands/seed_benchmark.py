@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from benchmark.seeding import BENCHMARK_PASSWORD, seed
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a skewed synthetic dataset for run_benchmark. Use a scratch database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--managers', type=int, default=None, help='Defaults to one in twenty users.')
+        parser.add_argument('--tasks', type=int, default=20000)
+        parser.add_argument('--reports', type=int, default=40000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for repeatable datasets.')
+        parser.add_argument('--prefix', default='bench', help='Username prefix.')
+
+    def handle(self, *args, **options):
+        counts = seed(
+            options['users'], options['tasks'], options['reports'], managers=options['managers'],
+            seed=options['seed'], prefix=options['prefix'], log=self.stdout.write,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {counts['users']} users, {counts['tasks']} tasks and {counts['reports']} reports "
+            f"(password {BENCHMARK_PASSWORD!r})."
+        ))
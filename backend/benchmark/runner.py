@@ -0,0 +1,122 @@
+"""
+Drives the scenarios through the full Django stack (middleware, JWT
+authentication, throttles, serializers) with the test client, in process, so
+no server or network is involved.
+"""
+import json
+import math
+import platform
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+import django
+from django.db import connections
+from django.test import Client
+from tasks_tracker.instrumentation import RequestTiming
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def resolve(value, fx, i):
+    return value(fx, i) if callable(value) else value
+
+
+class ScenarioError(Exception):
+    pass
+
+
+def run_scenario(client, fx, scenario, iterations, warmup=0):
+    latencies, queries = [], []
+    for i in range(warmup + iterations):
+        path = resolve(scenario.path, fx, i)
+        data = resolve(scenario.data, fx, i)
+        extra = {}
+        if isinstance(data, dict) and '_ip' in data:
+            data = dict(data)
+            extra['REMOTE_ADDR'] = data.pop('_ip')
+        if scenario.user:
+            extra['HTTP_AUTHORIZATION'] = f'Bearer {fx.tokens[scenario.user]}'
+        if data is not None:
+            extra.update(data=json.dumps(data), content_type='application/json')
+
+        timing = RequestTiming(keep_statements=False)
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing))
+            response = getattr(client, scenario.method)(path, **extra)
+            if response.streaming:
+                # Exports are generated while the body is read.
+                b''.join(response.streaming_content)
+        elapsed = time.perf_counter() - start
+
+        if response.status_code != scenario.status:
+            raise ScenarioError(
+                f'{scenario.name}: {scenario.method.upper()} {path} returned {response.status_code}, '
+                f'expected {scenario.status}'
+            )
+        if i >= warmup:
+            latencies.append(elapsed * 1000)
+            queries.append(timing.queries)
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(total / iterations, 3),
+        'throughput_rps': round(iterations / (total / 1000), 2) if total else None,
+        'queries_per_request': round(sum(queries) / iterations, 2),
+    }
+
+
+def run(fx, scenarios, iterations, warmup=0, log=None):
+    log = log or (lambda message: None)
+    client = Client(HTTP_HOST='localhost')
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = stats = run_scenario(client, fx, scenario, iterations, warmup)
+        log(
+            f"{scenario.name:40} p50 {stats['p50_ms']:8.2f}  p95 {stats['p95_ms']:8.2f}  "
+            f"p99 {stats['p99_ms']:8.2f} ms  {stats['throughput_rps']:8.1f} req/s  "
+            f"{stats['queries_per_request']:6.1f} queries"
+        )
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'database': connections['default'].vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'iterations': iterations,
+            'warmup': warmup,
+        },
+        'scenarios': results,
+    }
+
+
+def compare(results, baseline, max_regression):
+    """
+    Regressions against a baseline run: p95 latency up by more than
+    ``max_regression`` (a fraction) or more queries per request.
+    """
+    regressions = []
+    for name, stats in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None:
+            continue
+        if before['p95_ms'] and stats['p95_ms'] > before['p95_ms'] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms")
+        if stats['queries_per_request'] > before['queries_per_request']:
+            regressions.append(
+                f"{name}: queries {before['queries_per_request']:g} -> {stats['queries_per_request']:g}"
+            )
+    return regressions
@@ -0,0 +1,155 @@
+"""
+Benchmark scenarios: one request shape per endpoint of accounts, tasks and reports.
+
+``path`` and ``data`` may be callables taking the fixture and the iteration
+number; they run before the request is timed, so per-iteration setup (fresh
+tokens, throwaway tasks) is not measured. ``user`` names the fixture user whose
+access token is sent, or None for anonymous requests.
+"""
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from accounts.models import PasswordResetToken, User
+from accounts.tokens import RoleRefreshToken
+from reports.models import TaskReport
+from tasks.models import ChangeLogEntry, Task
+from .seeding import BENCHMARK_PASSWORD
+
+Scenario = namedtuple('Scenario', ['name', 'method', 'path', 'user', 'data', 'status'], defaults=[None, None, 200])
+
+
+class Fixture:
+    """The users and rows the scenarios act on, picked from the seeded dataset."""
+
+    def __init__(self):
+        self.manager = User.objects.filter(role='GM').order_by('id').first()
+        self.employee = (
+            User.objects.filter(role='employee', assigned_tasks__isnull=False).order_by('id').first()
+        )
+        if self.manager is None or self.employee is None:
+            raise LookupError('Need a manager and an employee with tasks; run seed_benchmark first.')
+        self.other_employee = User.objects.filter(role='employee').exclude(pk=self.employee.pk).order_by('id').first() or self.employee
+        self.task = Task.objects.filter(assigned_to=self.employee).order_by('-id').first()
+        self.report = TaskReport.objects.filter(reported_by=self.employee).order_by('-id').first()
+        self.run_id = uuid.uuid4().hex[:8]
+        # A client a few hundred writes behind.
+        newest = ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        self.sync_cursor = max(0, newest - 300)
+        staff = User.objects.filter(role='employee').exclude(email='').order_by('id')
+        self.usernames = list(staff.values_list('username', flat=True)[:1000])
+        self.emails = list(staff.values_list('email', flat=True)[:1000])
+        self.reset_user, _ = User.objects.get_or_create(
+            username='benchmark_reset_target', defaults={'email': 'reset-target@example.com'}
+        )
+        self.tokens = {
+            'manager': str(RoleRefreshToken.for_user(self.manager).access_token),
+            'employee': str(RoleRefreshToken.for_user(self.employee).access_token),
+        }
+        if settings.METRICS_TOKEN:
+            self.tokens['scraper'] = settings.METRICS_TOKEN
+
+    def new_task(self, **fields):
+        return Task.objects.create(
+            title='Benchmark scratch task', created_by=self.manager, assigned_to=self.employee, **fields
+        )
+
+    def new_tasks(self, count):
+        return [self.new_task().pk for _ in range(count)]
+
+
+def client_ip(i):
+    # Login and password reset are throttled per address and per account; spread
+    # iterations over addresses and seeded accounts like real clients.
+    return f'10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}'
+
+
+def build_scenarios(fx):
+    task, report, employee = fx.task, fx.report, fx.employee
+    scenarios = [
+        # accounts
+        Scenario('auth.login', 'post', '/api/auth/login/', None, lambda fx, i: {
+            'username': fx.usernames[i % len(fx.usernames)], 'password': BENCHMARK_PASSWORD, '_ip': client_ip(i),
+        }),
+        Scenario('auth.register', 'post', '/api/auth/register/', None, lambda fx, i: {
+            'username': f'benchmark_new_{fx.run_id}_{i}', 'email': f'new{i}@example.com', 'password': BENCHMARK_PASSWORD,
+        }, 201),
+        Scenario('auth.token_refresh', 'post', '/api/token/refresh/', None, lambda fx, i: {
+            'refresh': str(RoleRefreshToken.for_user(fx.other_employee)),
+        }),
+        Scenario('auth.logout', 'post', '/api/auth/logout/', 'employee', lambda fx, i: {
+            'refresh': str(RoleRefreshToken.for_user(fx.employee)),
+        }),
+        Scenario('auth.profile', 'get', '/api/auth/profile/', 'employee'),
+        Scenario('auth.employees', 'get', '/api/auth/employees/', 'manager'),
+        Scenario('auth.employees.lookup', 'get', '/api/auth/employees/?q=re', 'manager'),
+        Scenario('auth.password_reset', 'post', '/api/auth/password-reset/', None, lambda fx, i: {
+            'email': fx.emails[i % len(fx.emails)], '_ip': client_ip(i),
+        }),
+        Scenario('auth.password_reset_confirm', 'post', '/api/auth/password-reset/confirm/', None, lambda fx, i: {
+            'token': str(PasswordResetToken.objects.create(user=fx.reset_user).token),
+            'new_password': BENCHMARK_PASSWORD, 'confirm_password': BENCHMARK_PASSWORD,
+        }),
+        # tasks
+        Scenario('tasks.list.manager', 'get', '/api/tasks/tasks/', 'manager'),
+        Scenario('tasks.list.employee', 'get', '/api/tasks/tasks/', 'employee'),
+        Scenario('tasks.list.filtered', 'get', f'/api/tasks/tasks/?status=ongoing&assigned_to={employee.pk}', 'manager'),
+        Scenario('tasks.list.compact', 'get', '/api/tasks/tasks/?compact=1&omit=created_by_name,assigned_to_name', 'manager'),
+        Scenario('tasks.list.search', 'get', '/api/tasks/tasks/?search=invoice%20review', 'manager'),
+        Scenario('tasks.retrieve', 'get', f'/api/tasks/tasks/{task.pk}/', 'employee'),
+        Scenario('tasks.changes.manager', 'get', f'/api/tasks/tasks/changes/?since={fx.sync_cursor}', 'manager'),
+        Scenario('tasks.changes.employee', 'get', f'/api/tasks/tasks/changes/?since={fx.sync_cursor}', 'employee'),
+        Scenario('tasks.my_tasks', 'get', '/api/tasks/tasks/my_tasks/', 'employee'),
+        Scenario('tasks.dashboard_stats.manager', 'get', '/api/tasks/tasks/dashboard_stats/', 'manager'),
+        Scenario('tasks.dashboard_stats.employee', 'get', '/api/tasks/tasks/dashboard_stats/', 'employee'),
+        Scenario('tasks.burndown', 'get', '/api/tasks/tasks/burndown/', 'manager'),
+        Scenario('tasks.throughput', 'get', '/api/tasks/tasks/throughput/', 'employee'),
+        Scenario('tasks.export', 'get', f'/api/tasks/tasks/export/?assigned_to={employee.pk}', 'manager'),
+        Scenario('tasks.create', 'post', '/api/tasks/tasks/', 'manager', {
+            'title': 'Benchmark task', 'description': 'Created by run_benchmark', 'assigned_to': employee.pk,
+        }, 201),
+        Scenario('tasks.update', 'patch', f'/api/tasks/tasks/{task.pk}/', 'manager', lambda fx, i: {
+            'description': f'Edited {i}',
+        }),
+        Scenario('tasks.update_status', 'patch', f'/api/tasks/tasks/{task.pk}/update_status/', 'employee', lambda fx, i: {
+            'status': ('ongoing', 'assigned')[i % 2],
+        }),
+        Scenario(
+            'tasks.update_completion_percentage', 'patch', f'/api/tasks/tasks/{task.pk}/update_completion_percentage/',
+            'employee', lambda fx, i: {'completion_percentage': i % 100},
+        ),
+        Scenario('tasks.destroy', 'delete', lambda fx, i: f'/api/tasks/tasks/{fx.new_task().pk}/', 'manager', None, 204),
+        Scenario('tasks.bulk_create', 'post', '/api/tasks/tasks/bulk_create/', 'manager', [
+            {'title': f'Benchmark bulk {n}', 'assigned_to': employee.pk} for n in range(20)
+        ], 201),
+        Scenario('tasks.bulk_assign', 'post', '/api/tasks/tasks/bulk_assign/', 'manager', lambda fx, i: {
+            'ids': fx.new_tasks(20), 'assigned_to': fx.other_employee.pk,
+        }),
+        Scenario('tasks.bulk_status', 'post', '/api/tasks/tasks/bulk_status/', 'manager', lambda fx, i: {
+            'ids': fx.new_tasks(20), 'status': 'completed',
+        }),
+        Scenario('tasks.bulk_delete', 'post', '/api/tasks/tasks/bulk_delete/', 'manager', lambda fx, i: {
+            'ids': fx.new_tasks(20),
+        }),
+        # reports
+        Scenario('reports.list.manager', 'get', '/api/reports/reports/', 'manager'),
+        Scenario('reports.list.employee', 'get', '/api/reports/reports/', 'employee'),
+        Scenario('reports.list.compact', 'get', '/api/reports/reports/?compact=1', 'manager'),
+        Scenario('reports.list.search', 'get', '/api/reports/reports/?search=budget', 'manager'),
+        Scenario('reports.retrieve', 'get', f'/api/reports/reports/{report.pk}/', 'employee') if report else None,
+        Scenario('reports.changes', 'get', f'/api/reports/reports/changes/?since={fx.sync_cursor}', 'manager'),
+        Scenario('reports.my_reports', 'get', '/api/reports/reports/my_reports/', 'employee'),
+        Scenario('reports.task_reports', 'get', f'/api/reports/reports/task_reports/?task_id={task.pk}', 'manager'),
+        Scenario('reports.employee_reports', 'get', f'/api/reports/reports/employee_reports/?employee_id={employee.pk}', 'manager'),
+        Scenario('reports.manager_dashboard', 'get', '/api/reports/reports/manager_dashboard/', 'manager'),
+        Scenario('reports.export', 'get', f'/api/reports/reports/export/?export_format=ndjson&reported_by={employee.pk}', 'manager'),
+        Scenario('reports.create', 'post', '/api/reports/reports/', 'employee', {
+            'task': task.pk, 'content': 'Benchmark progress report',
+        }, 201),
+        Scenario('reports.update', 'patch', f'/api/reports/reports/{report.pk}/', 'employee', lambda fx, i: {
+            'content': f'Benchmark report edit {i}',
+        }) if report else None,
+        # monitoring (only reachable with METRICS_TOKEN set)
+        Scenario('metrics', 'get', '/metrics', 'scraper') if 'scraper' in fx.tokens else None,
+    ]
+    return [scenario for scenario in scenarios if scenario is not None]
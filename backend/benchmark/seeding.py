@@ -0,0 +1,96 @@
+"""
+Synthetic datasets for benchmarking, written with bulk_create.
+
+Work is skewed the way real teams are: a few employees hold most of the
+tasks (Zipf-distributed), most tasks are finished, and a minority of tasks
+collect most of the reports. Every user's password is ``BENCHMARK_PASSWORD``.
+"""
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from accounts.directory import bump_directory_version
+from accounts.models import User
+from reports.models import TaskReport
+from tasks.models import Task
+
+BENCHMARK_PASSWORD = 'benchmark-pass-1'
+STATUS_WEIGHTS = {'created': 10, 'assigned': 20, 'ongoing': 25, 'completed': 45}
+WORDS = (
+    'invoice report client server deploy review budget meeting design audit release migration '
+    'onboarding backlog customer dashboard database security training schedule vendor contract '
+    'inventory quarterly analysis support outage roadmap hiring payroll marketing'
+).split()
+
+
+def zipf_weights(n, exponent=1.1):
+    return [1 / (rank ** exponent) for rank in range(1, n + 1)]
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def seed(users, tasks, reports, managers=None, seed=0, prefix='bench', batch_size=2000, log=None):
+    """Create the dataset and return the number of rows written per model."""
+    rng = random.Random(seed)
+    managers = managers or max(1, users // 20)
+    log = log or (lambda message: None)
+    password = make_password(BENCHMARK_PASSWORD)
+    start = User.objects.count()
+
+    with transaction.atomic():
+        staff = User.objects.bulk_create(
+            (
+                User(
+                    username=f'{prefix}_{start + i}',
+                    email=f'{prefix}_{start + i}@example.com',
+                    first_name=rng.choice(WORDS).capitalize(),
+                    last_name=rng.choice(WORDS).capitalize(),
+                    password=password,
+                    role='GM' if i < managers else 'employee',
+                )
+                for i in range(users)
+            ),
+            batch_size=batch_size,
+        )
+    # bulk_create sends no signals.
+    bump_directory_version()
+    bosses, employees = staff[:managers], staff[managers:] or staff[:1]
+    log(f'{len(staff)} users ({len(bosses)} managers)')
+
+    statuses, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    assignee_weights = zipf_weights(len(employees))
+    created = []
+    for offset in range(0, tasks, batch_size):
+        count = min(batch_size, tasks - offset)
+        assignees = rng.choices(employees, assignee_weights, k=count)
+        batch = []
+        for assignee, status in zip(assignees, rng.choices(statuses, status_weights, k=count)):
+            batch.append(Task(
+                title=sentence(rng, rng.randint(3, 7)),
+                description=sentence(rng, rng.randint(10, 60)),
+                status=status,
+                completion_percentage=100 if status == 'completed' else rng.randint(0, 95),
+                created_by=rng.choice(bosses),
+                assigned_to=None if status == 'created' else assignee,
+            ))
+        created.extend(task.pk for task in Task.objects.bulk_create(batch))
+        log(f'{len(created)} tasks')
+
+    report_tasks = Task.objects.filter(pk__in=created, assigned_to__isnull=False).values_list('pk', 'assigned_to_id')
+    report_tasks = list(report_tasks)
+    written = 0
+    if report_tasks:
+        rng.shuffle(report_tasks)
+        task_weights = zipf_weights(len(report_tasks), exponent=0.8)
+        while written < reports:
+            count = min(batch_size, reports - written)
+            TaskReport.objects.bulk_create(
+                TaskReport(task_id=task_id, reported_by_id=user_id, content=sentence(rng, rng.randint(15, 120)))
+                for task_id, user_id in rng.choices(report_tasks, task_weights, k=count)
+            )
+            written += count
+            log(f'{written} reports')
+
+    return {'users': len(staff), 'tasks': len(created), 'reports': written}
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.test import TestCase, override_settings
+from accounts.blacklist import blacklist_cache
+from accounts.models import User
+from reports.models import TaskReport
+from tasks.models import Task
+from .runner import compare, percentile
+from .seeding import seed
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_cache.clear()
+
+    def test_seed_is_skewed_and_repeatable(self):
+        counts = seed(users=20, tasks=400, reports=300, seed=1)
+        self.assertEqual(counts, {'users': 20, 'tasks': 400, 'reports': 300})
+        self.assertEqual(User.objects.filter(role='GM').count(), 1)
+        self.assertFalse(Task.objects.filter(status='created', assigned_to__isnull=False).exists())
+        self.assertFalse(TaskReport.objects.exclude(reported_by=F('task__assigned_to')).exists())
+
+        per_assignee = sorted(
+            Task.objects.filter(assigned_to__isnull=False).values_list('assigned_to', flat=True)
+        )
+        busiest = max(per_assignee.count(user_id) for user_id in set(per_assignee))
+        # Zipf: the busiest employee holds several times their even share.
+        self.assertGreater(busiest, 3 * len(per_assignee) / 19)
+
+    @override_settings(METRICS_TOKEN='scrape')
+    def test_every_scenario_runs(self):
+        seed(users=8, tasks=60, reports=60, seed=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'results.json')
+            call_command('run_benchmark', iterations=1, warmup=0, output=output, stdout=StringIO())
+            with open(output) as f:
+                results = json.load(f)
+            self.assertIn('tasks.list.manager', results['scenarios'])
+            self.assertIn('auth.login', results['scenarios'])
+            self.assertIn('metrics', results['scenarios'])
+            stats = results['scenarios']['tasks.retrieve']
+            # Two for the retrieve itself, one for the token version (TOKEN_VERSION_CACHE is unset).
+            self.assertEqual(stats['queries_per_request'], 3)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+
+            # Against itself with a tightened query count, the run reports a regression.
+            results['scenarios']['tasks.retrieve']['queries_per_request'] = 1
+            with open(output, 'w') as f:
+                json.dump(results, f)
+            with self.assertRaisesMessage(CommandError, 'regression'):
+                call_command(
+                    'run_benchmark', iterations=1, warmup=0, scenario=['tasks.retrieve'],
+                    baseline=output, fail_on_regression=True, max_regression=100, stdout=StringIO(),
+                )
+
+    def test_serialization_benchmark_checks_identical_output(self):
+        seed(users=6, tasks=80, reports=80, seed=3)
+        out = StringIO()
+        call_command('bench_serialization', rows=50, repeat=1, stdout=out)
+        self.assertIn('tasks: 50 rows', out.getvalue())
+        self.assertIn('reports: 50 rows', out.getvalue())
+
+    def test_requires_seeded_data(self):
+        with self.assertRaisesMessage(CommandError, 'seed_benchmark'):
+            call_command('run_benchmark', stdout=StringIO())
+
+    def test_percentile_and_compare(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+        baseline = {'scenarios': {'a': {'p95_ms': 10.0, 'queries_per_request': 2}}}
+        current = {'scenarios': {
+            'a': {'p95_ms': 11.0, 'queries_per_request': 2},
+            'b': {'p95_ms': 99.0, 'queries_per_request': 9},
+        }}
+        self.assertEqual(compare(current, baseline, 0.2), [])
+        current['scenarios']['a']['p95_ms'] = 13.0
+        self.assertEqual(compare(current, baseline, 0.2), ['a: p95 10.00 -> 13.00 ms'])
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        ('tasks', '0004_access_pattern_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(fields=['-created_at', '-id'], name='report_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(fields=['task', '-created_at'], name='report_task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(fields=['reported_by', '-created_at'], name='report_reporter_created_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:57
+
+import django.db.models.functions.text
+import django.db.models.lookups
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_taskreport_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskreport',
+            name='content_snippet',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(django.db.models.lookups.GreaterThan(django.db.models.functions.text.Length(models.F('content')), 160), then=django.db.models.functions.text.Concat(django.db.models.functions.text.Substr(models.F('content'), 1, 159), models.Value('…'))), default=models.F('content'), output_field=models.TextField()), output_field=models.TextField()),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_taskreport_content_snippet'),
+        ('tasks', '0011_archived_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='taskreport',
+            name='report_task_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskreport',
+            name='report_reporter_created_idx',
+        ),
+        migrations.AddField(
+            model_name='taskreport',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['task', '-created_at'], name='report_task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['reported_by', '-created_at'], name='report_reporter_created_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:23
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# Long rows are compressed, and moved out of line, until they fit in this many bytes.
+TOAST_TUPLE_TARGET = 256
+
+
+def compress_content(apps, schema_editor):
+    # PostgreSQL only: squeeze report rows much further than the default 2 kB
+    # target, so long bodies live compressed in the TOAST table and the heap
+    # pages that list queries scan hold the snippet and metadata. lz4 where the
+    # server has it.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'ALTER TABLE reports_taskreport SET (toast_tuple_target = {TOAST_TUPLE_TARGET})')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_settings WHERE name = 'default_toast_compression' AND 'lz4' = ANY(enumvals)"
+        )
+        has_lz4 = cursor.fetchone() is not None
+    if has_lz4:
+        schema_editor.execute('ALTER TABLE reports_taskreport ALTER COLUMN content SET COMPRESSION lz4')
+
+
+def reset_content_storage(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE reports_taskreport RESET (toast_tuple_target)')
+    if schema_editor.connection.pg_version >= 140000:
+        schema_editor.execute('ALTER TABLE reports_taskreport ALTER COLUMN content SET COMPRESSION DEFAULT')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0005_archived_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(compress_content, reset_content_storage),
+        migrations.AddField(
+            model_name='taskreport',
+            name='content_length',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Length('content'), output_field=models.IntegerField()),
+        ),
+    ]
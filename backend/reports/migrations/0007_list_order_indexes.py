@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_content_length'),
+        ('tasks', '0012_list_order_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='taskreport',
+            name='report_task_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskreport',
+            name='report_reporter_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['task', '-created_at', '-id'], name='report_task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['reported_by', '-created_at', '-id'], name='report_reporter_created_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0007_list_order_indexes'),
+        ('tasks', '0013_hot_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='taskreport',
+            name='report_created_at_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='taskreport',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['-created_at', '-id'], name='report_created_at_id_idx'),
+        ),
+    ]
@@ -1,15 +1,33 @@
 from django.db import models
 from django.conf import settings
+from django.db.models.functions import Length
+from tasks.models import HOT
+from tasks_tracker.snippets import snippet_expression
 
 class TaskReport(models.Model):
     task = models.ForeignKey('tasks.Task', on_delete=models.CASCADE, related_name='reports')
     reported_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     content = models.TextField()
+    # Maintained by the database; see tasks_tracker/snippets.py
+    content_snippet = models.GeneratedField(
+        expression=snippet_expression('content'), output_field=models.TextField(), db_persist=True,
+    )
+    # Lists carry the snippet and this instead of the content (see reports/views.py)
+    content_length = models.GeneratedField(
+        expression=Length('content'), output_field=models.IntegerField(), db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set with the task's by archive_tasks
+    archived_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], condition=HOT, name='report_created_at_id_idx'),
+            models.Index(fields=['task', '-created_at', '-id'], condition=HOT, name='report_task_created_idx'),
+            models.Index(fields=['reported_by', '-created_at', '-id'], condition=HOT, name='report_reporter_created_idx'),
+        ]
 
     def __str__(self):
         return f"Report for {self.task.title} by {self.reported_by.username}"
@@ -1,11 +1,22 @@
 from rest_framework import serializers
+from tasks_tracker.fastpath import related_full_name, related_value
+from tasks_tracker.instrumentation import TimedSerializerMixin
 from .models import TaskReport
 
-class TaskReportSerializer(serializers.ModelSerializer):
+class TaskReportSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     reported_by_name = serializers.CharField(source='reported_by.get_full_name', read_only=True)
     reported_by_username = serializers.CharField(source='reported_by.username', read_only=True)
+    content_length = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = TaskReport
-        fields = ['id', 'task', 'reported_by', 'reported_by_name', 'reported_by_username', 'content', 'created_at', 'updated_at']
-        read_only_fields = ['reported_by', 'created_at', 'updated_at']
+        fields = ['id', 'task', 'reported_by', 'reported_by_name', 'reported_by_username', 'content', 'content_length', 'created_at', 'updated_at', 'archived_at']
+        read_only_fields = ['reported_by', 'created_at', 'updated_at', 'archived_at']
+
+    # Read-only fast path for lists (tasks_tracker/fastpath.py)
+    values_fields = {
+        'reported_by_name': (['reported_by__first_name', 'reported_by__last_name'], related_full_name),
+        'reported_by_username': (['reported_by__username'], related_value),
+    }
+    # Compact lists (all report lists; see TaskReportViewSet) carry the stored snippet instead of the full text
+    compact_fields = {'content': 'content_snippet'}
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from tasks.models import ChangeLogEntry, ChangeVersion
+from tasks_tracker.events import publish_on_commit
+from .models import TaskReport
+
+
+@receiver(post_save, sender=TaskReport)
+@receiver(post_delete, sender=TaskReport)
+def bump_report_versions(sender, instance, **kwargs):
+    ChangeVersion.objects.bump_on_commit('reports', f'reports:user:{instance.reported_by_id}')
+
+
+@receiver(post_save, sender=TaskReport)
+@receiver(post_delete, sender=TaskReport)
+def log_report_change(sender, instance, **kwargs):
+    ChangeLogEntry.objects.record('report', [(instance.pk, {None, instance.reported_by_id})])
+
+
+@receiver(post_save, sender=TaskReport)
+def publish_report_created(sender, instance, created, **kwargs):
+    if created:
+        publish_on_commit('report.created', {
+            'id': instance.pk,
+            'task': instance.task_id,
+            'reported_by': instance.reported_by_id,
+            'created_at': instance.created_at,
+        }, [instance.reported_by_id])
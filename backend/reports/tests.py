@@ -1,3 +1,129 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from tasks.models import Task
+from tasks.tests import QueryBudgetMixin
+from .models import TaskReport
+from .serializers import TaskReportSerializer
+
+
+class TaskReportQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed()
+        TaskReport.objects.bulk_create(
+            TaskReport(task=task, reported_by=task.assigned_to, content=f'Progress on {task.title}')
+            for task in Task.objects.all()
+            for _ in range(2)
+        )
+        cls.task = Task.objects.filter(assigned_to=cls.employee).first()
+        cls.report = TaskReport.objects.filter(reported_by=cls.employee).first()
+        # Bulk-created rows skip signals; save one to set up the ETag versions.
+        cls.report.save()
+
+    def test_list_is_independent_of_page_size(self):
+        for user in (self.manager, self.employee):
+            for page_size in (2, 10, 25):
+                response = self.assertQueryBudget(2, 'get', f'/api/reports/reports/?page_size={page_size}', user)
+                self.assertTrue(response.data['results'])
+
+    def test_retrieve(self):
+        self.assertQueryBudget(2, 'get', f'/api/reports/reports/{self.report.id}/', self.employee)
+
+    def test_my_reports(self):
+        response = self.assertQueryBudget(1, 'get', '/api/reports/reports/my_reports/?page_size=50', self.employee)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_task_reports(self):
+        self.assertQueryBudget(1, 'get', f'/api/reports/reports/task_reports/?task_id={self.task.id}', self.manager)
+
+    def test_employee_reports(self):
+        self.assertQueryBudget(1, 'get', '/api/reports/reports/employee_reports/?page_size=50', self.manager)
+        self.assertQueryBudget(
+            1, 'get', f'/api/reports/reports/employee_reports/?employee_id={self.employee.id}', self.manager
+        )
+
+    def test_manager_dashboard(self):
+        self.assertQueryBudget(1, 'get', '/api/reports/reports/manager_dashboard/?page_size=50', self.manager)
+
+    def test_create(self):
+        self.assertQueryBudget(
+            4, 'post', '/api/reports/reports/', self.employee,
+            data={'task': self.task.id, 'content': 'Done for today'}, format='json'
+        )
+
+    def test_export_streams_the_scoped_rows(self):
+        self.client.force_authenticate(self.employee)
+        response = self.client.get('/api/reports/reports/export/?export_format=ndjson')
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 20)
+        self.assertEqual({row['reported_by'] for row in rows}, {self.employee.id})
+
+        listed = self.client.get(f'/api/reports/reports/{rows[0]["id"]}/').data
+        self.assertEqual(rows[0], json.loads(json.dumps(listed)))
+
+    def test_search(self):
+        TaskReport.objects.create(task=self.task, reported_by=self.employee, content='Blocked on the vendor contract')
+        self.client.force_authenticate(self.employee)
+        response = self.client.get('/api/reports/reports/', {'search': 'contr vend'})
+        self.assertEqual([r['content_snippet'] for r in response.data['results']], ['Blocked on the vendor contract'])
+        self.client.force_authenticate(self.employees[1])
+        response = self.client.get('/api/reports/reports/', {'search': 'vendor'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_list_output_is_byte_identical(self):
+        self.client.force_authenticate(self.manager)
+        for url, queryset in [
+            ('/api/reports/reports/?page_size=100', TaskReport.objects.all()),
+            (f'/api/reports/reports/task_reports/?task_id={self.task.id}', TaskReport.objects.filter(task=self.task)),
+        ]:
+            response = self.client.get(url)
+            reports = queryset.select_related('reported_by').order_by('-created_at', '-id')[:len(response.data['results'])]
+            # Lists are compact: the snippet stands where the content would be.
+            results = [
+                {('content_snippet' if key == 'content' else key): (report.content_snippet if key == 'content' else value)
+                 for key, value in data.items()}
+                for report, data in zip(reports, TaskReportSerializer(reports, many=True).data)
+            ]
+            expected = JSONRenderer().render({
+                'next': response.data['next'],
+                'previous': response.data['previous'],
+                'results': results,
+            })
+            self.assertEqual(response.content, expected)
+
+    def test_lists_are_compact_and_retrieve_is_full(self):
+        report = TaskReport.objects.create(task=self.task, reported_by=self.employee, content='Details ' * 40)
+        self.client.force_authenticate(self.employee)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/reports/reports/my_reports/?compact=0&omit=reported_by_name,reported_by_username')
+        row = response.data['results'][0]
+        self.assertEqual(
+            list(row), ['id', 'task', 'reported_by', 'content_snippet', 'content_length', 'created_at', 'updated_at', 'archived_at']
+        )
+        self.assertEqual(len(row['content_snippet']), 160)
+        self.assertEqual(row['content_length'], 320)
+        self.assertNotIn('JOIN', queries.captured_queries[-1]['sql'])
+        self.assertNotIn('"content"', queries.captured_queries[-1]['sql'])
+
+        response = self.client.get(f'/api/reports/reports/{report.id}/?fields=content,content_length')
+        self.assertEqual(response.data, {'content': 'Details ' * 40, 'content_length': 320})
+
+    @override_settings(SYNC_SETTLE_SECONDS=0)
+    def test_changes_since_a_cursor(self):
+        self.client.force_authenticate(self.employee)
+        cursor = self.client.get('/api/reports/reports/changes/').data['cursor']
+        created = TaskReport.objects.create(task=self.task, reported_by=self.employee, content='Halfway')
+        TaskReport.objects.create(task=self.task, reported_by=self.employees[1], content='Not yours')
+        report_id = self.report.id
+        self.report.delete()
+
+        response = self.client.get(f'/api/reports/reports/changes/?since={cursor}')
+        self.assertEqual([row['content_snippet'] for row in response.data['changes']], ['Halfway'])
+        self.assertEqual(response.data['changes'][0]['id'], created.id)
+        self.assertEqual(response.data['deleted'], [report_id])
@@ -1,4 +1,4 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -6,26 +6,60 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import TaskReport
 from .serializers import TaskReportSerializer
 from django.db.models import Q
+from tasks_tracker.archive import ArchiveMixin
+from tasks_tracker.conditional import ConditionalReadMixin
+from tasks_tracker.db import ReplicaReadMixin
+from tasks_tracker.export import ExportMixin, full_name
+from tasks_tracker.fastpath import ValuesListMixin
+from tasks_tracker.search import FullTextSearchFilter
+from tasks_tracker.sync import DeltaSyncMixin
 
-class TaskReportViewSet(viewsets.ModelViewSet):
+class TaskReportViewSet(ReplicaReadMixin, ConditionalReadMixin, ValuesListMixin, DeltaSyncMixin, ExportMixin, ArchiveMixin, viewsets.ModelViewSet):
     queryset = TaskReport.objects.all()
     serializer_class = TaskReportSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['task', 'reported_by']
+    export_fields = TaskReportSerializer.Meta.fields
+    export_filename = 'reports'
+    change_log_kind = 'report'
+    # Report bodies can be long: lists carry content_snippet and content_length,
+    # the full content comes from retrieve (and export).
+    compact_lists = True
 
     def get_queryset(self):
         user = self.request.user
+        queryset = self.visible(TaskReport.objects.select_related('reported_by'))
         if user.is_manager:
-            return TaskReport.objects.all()
+            return queryset
         else:
-            return TaskReport.objects.filter(reported_by=user)
+            return queryset.filter(reported_by=user)
+
+    def get_etag_scopes(self):
+        user = self.request.user
+        return ['reports' if user.is_manager else f'reports:user:{user.id}', 'users']
+
+    def get_export_rows(self, queryset):
+        values = queryset.values(
+            'id', 'task', 'reported_by', 'reported_by__first_name', 'reported_by__last_name',
+            'reported_by__username', 'content', 'content_length', 'created_at', 'updated_at', 'archived_at',
+        )
+        for row in values.iterator(chunk_size=self.export_chunk_size):
+            row['reported_by_name'] = full_name(row.pop('reported_by__first_name'), row.pop('reported_by__last_name'))
+            row['reported_by_username'] = row.pop('reported_by__username')
+            row['created_at'] = self.format_datetime(row['created_at'])
+            row['updated_at'] = self.format_datetime(row['updated_at'])
+            row['archived_at'] = self.format_datetime(row['archived_at'])
+            yield row
 
     def perform_create(self, serializer):
         task = serializer.validated_data['task']
+
+        if task.archived_at is not None:
+            raise serializers.ValidationError("This task is archived.")
         
         # Check if user can submit report for this task
-        if task.assigned_to != self.request.user and not self.request.user.is_manager:
+        if task.assigned_to_id != self.request.user.id and not self.request.user.is_manager:
             raise serializers.ValidationError("You can only submit reports for tasks assigned to you.")
         
         serializer.save(reported_by=self.request.user)
@@ -33,9 +67,8 @@ class TaskReportViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_reports(self, request):
         """Get reports submitted by the current user"""
-        reports = TaskReport.objects.filter(reported_by=request.user)
-        serializer = self.get_serializer(reports, many=True)
-        return Response(serializer.data)
+        reports = self.visible(TaskReport.objects.filter(reported_by=request.user))
+        return self.list_response(reports)
 
     @action(detail=False, methods=['get'])
     def task_reports(self, request):
@@ -47,9 +80,8 @@ class TaskReportViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        reports = TaskReport.objects.filter(task_id=task_id)
-        serializer = self.get_serializer(reports, many=True)
-        return Response(serializer.data)
+        reports = self.visible(TaskReport.objects.filter(task_id=task_id))
+        return self.list_response(reports)
 
     @action(detail=False, methods=['get'])
     def employee_reports(self, request):
@@ -69,8 +101,7 @@ class TaskReportViewSet(viewsets.ModelViewSet):
             # Get all reports for all employees
             reports = TaskReport.objects.all()
         
-        serializer = self.get_serializer(reports, many=True)
-        return Response(serializer.data)
+        return self.list_response(self.visible(reports))
 
     @action(detail=False, methods=['get'])
     def manager_dashboard(self, request):
@@ -81,7 +112,6 @@ class TaskReportViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Get all reports with related task and user info
-        reports = TaskReport.objects.select_related('task', 'reported_by').all()
-        serializer = self.get_serializer(reports, many=True)
-        return Response(serializer.data)
+        # values() joins in the reporting user's columns
+        reports = self.visible(TaskReport.objects.all())
+        return self.list_response(reports)
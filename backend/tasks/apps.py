@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from tasks_tracker.search import install_sqlite_search_indexes
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(install_sqlite_search_indexes, sender=self)
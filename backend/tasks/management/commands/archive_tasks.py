@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tasks_tracker.archive import archive_completed_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Archive tasks completed (and untouched) more than --days ago, with their reports. '
+        'Archived rows drop out of lists unless ?include_archived=1.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        tasks, reports = archive_completed_tasks(before, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {tasks} task(s) and {reports} report(s).'))
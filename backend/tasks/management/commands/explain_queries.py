@@ -0,0 +1,158 @@
+import random
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from accounts.models import User
+from reports.models import TaskReport
+from tasks.models import Task, TaskCounter
+
+# Plan lines that mean a whole table (or a whole index of it) is read: PostgreSQL
+# and SQLite wording. SQLite's SEARCH lines are index lookups; every SCAN of a
+# table, with or without "USING [COVERING] INDEX", walks all of it.
+SEQ_SCAN_PATTERNS = [
+    re.compile(r'Seq Scan on (\w+)'),
+    re.compile(r'^\s*SCAN (?!CONSTANT ROW)(\w+)(?!.*VIRTUAL TABLE)'),
+]
+# Plan lines that mean rows are sorted rather than read in index order.
+SORT_PATTERNS = [
+    re.compile(r'^\s*(?:->\s*)?(Sort|Incremental Sort)\b'),
+    re.compile(r'^\s*(USE TEMP B-TREE FOR (?:ORDER BY|RIGHT PART OF ORDER BY))'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN on the SQL behind each task and report read endpoint and list full scans and sorts. '
+        'Works in a scratch test database (like manage.py test) that it creates, seeds and drops.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed-tasks', type=int, default=20000,
+            help='Synthetic tasks (and two reports per task) to seed the scratch database with.',
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan', action='store_true',
+            help='Exit with an error if any query plan contains a full scan.',
+        )
+
+    def handle(self, *args, **options):
+        if options['seed_tasks'] < 1:
+            raise CommandError('--seed-tasks must be at least 1.')
+        # Never the configured database: a test database next to it, read without replicas.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(DATABASE_REPLICAS=[]):
+                self.seed(options['seed_tasks'])
+                self.explain_endpoints(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def explain_endpoints(self, options):
+        manager = User.objects.filter(role='GM').first()
+        employee = User.objects.filter(role='employee', assigned_tasks__isnull=False).first()
+        if manager is None or employee is None:
+            raise CommandError('Need at least one manager and one employee with tasks; raise --seed-tasks.')
+
+        task = Task.objects.filter(assigned_to=employee).first()
+        endpoints = [
+            (manager, '/api/tasks/tasks/'),
+            (manager, '/api/tasks/tasks/?status=ongoing'),
+            (manager, f'/api/tasks/tasks/?assigned_to={employee.id}&status=assigned'),
+            (manager, f'/api/tasks/tasks/?created_by={manager.id}'),
+            (employee, '/api/tasks/tasks/'),
+            (employee, '/api/tasks/tasks/?status=ongoing'),
+            (employee, '/api/tasks/tasks/?search=seed'),
+            (employee, f'/api/tasks/tasks/{task.id}/'),
+            (employee, '/api/tasks/tasks/my_tasks/'),
+            (employee, '/api/tasks/tasks/dashboard_stats/'),
+            (manager, '/api/tasks/tasks/dashboard_stats/'),
+            (manager, '/api/tasks/tasks/burndown/'),
+            (employee, '/api/tasks/tasks/throughput/'),
+            (manager, '/api/reports/reports/'),
+            (employee, '/api/reports/reports/'),
+            (employee, '/api/reports/reports/my_reports/'),
+            (manager, '/api/reports/reports/?search=report'),
+            (manager, f'/api/reports/reports/task_reports/?task_id={task.id}'),
+            (manager, f'/api/reports/reports/employee_reports/?employee_id={employee.id}'),
+            (manager, '/api/reports/reports/employee_reports/'),
+            (manager, '/api/reports/reports/manager_dashboard/'),
+        ]
+
+        client = APIClient()
+        seq_scans = sorts = 0
+        for user, url in endpoints:
+            client.force_authenticate(user)
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url, HTTP_HOST='localhost')
+            if response.status_code >= 400:
+                raise CommandError(f'GET {url} returned {response.status_code}')
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'GET {url} ({user.role})'))
+            for query in queries.captured_queries:
+                if not query['sql'].lstrip().upper().startswith('SELECT'):
+                    continue
+                plan = self.explain(query['sql'])
+                scanned = self.matches(plan, SEQ_SCAN_PATTERNS)
+                sorted_ = self.matches(plan, SORT_PATTERNS)
+                seq_scans += len(scanned)
+                sorts += len(sorted_)
+                if scanned:
+                    status = self.style.ERROR(f"full scan of {', '.join(scanned)}")
+                elif sorted_:
+                    status = self.style.WARNING('sort')
+                else:
+                    status = self.style.SUCCESS('ok')
+                self.stdout.write(f'  {status}: {query["sql"][:120]}')
+                if scanned or sorted_ or options['verbosity'] > 1:
+                    for line in plan:
+                        self.stdout.write(f'      {line}')
+
+        summary = f'{seq_scans} full scan(s) and {sorts} sort(s) found.'
+        if seq_scans and options['fail_on_seq_scan']:
+            raise CommandError(summary)
+        self.stdout.write(summary)
+
+    def matches(self, plan, patterns):
+        return [m.group(1) for line in plan for p in patterns for m in [p.search(line)] if m]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            return [str(row[-1]) for row in cursor.fetchall()]
+
+    def seed(self, count):
+        statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+        suffix = User.objects.count()
+        managers = User.objects.bulk_create(
+            User(username=f'seed_manager_{suffix}_{i}', role='GM') for i in range(max(1, count // 10000))
+        )
+        employees = User.objects.bulk_create(
+            User(username=f'seed_employee_{suffix}_{i}') for i in range(max(1, count // 100))
+        )
+        tasks = Task.objects.bulk_create(
+            (Task(
+                title=f'Seed task {i}',
+                status=random.choice(statuses),
+                created_by=random.choice(managers),
+                assigned_to=random.choice(employees),
+            ) for i in range(count)),
+            batch_size=5000,
+        )
+        TaskReport.objects.bulk_create(
+            (TaskReport(task=task, reported_by=task.assigned_to, content=f'Report on {task.title}')
+             for task in tasks for _ in range(2)),
+            batch_size=5000,
+        )
+        TaskCounter.objects.rebuild()
+        if connection.vendor == 'postgresql':
+            # SQLite's ANALYZE keeps only the average rows per key, which on skewed
+            # columns (a few managers create every task) steers its planner away
+            # from indexes PostgreSQL's per-value statistics would pick; leave it
+            # on its default estimates.
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        self.stdout.write(f'Seeded {count} tasks and {count * 2} reports.')
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tasks.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete change log entries older than --days. Clients holding a cursor from before '
+        'then get 410 from changes/ and reload their lists.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CHANGE_LOG_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        cutoff = ChangeLogEntry.objects.settled_cursor(timezone.now() - timedelta(days=options['days']))
+        newest = ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        # Keep the newest entry: it is what tells an old cursor from an up-to-date one.
+        last = min(cutoff, newest - 1)
+        first = ChangeLogEntry.objects.oldest_id() or 0
+        deleted = 0
+        while first <= last:
+            upper = min(first + options['batch_size'] - 1, last)
+            deleted += ChangeLogEntry.objects.filter(id__gte=first, id__lte=upper).delete()[0]
+            first = upper + 1
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} change log entries.'))
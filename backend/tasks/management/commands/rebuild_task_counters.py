@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from tasks.models import TaskCounter, TaskCounterManager
+
+
+class Command(BaseCommand):
+    help = 'Recount the dashboard task counters from the Task table, or check them with --check.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only compare stored counters with a fresh count and fail on any mismatch.',
+        )
+
+    def handle(self, *args, **options):
+        fields = TaskCounterManager.STATUS_FIELDS + ['my_tasks']
+        expected = TaskCounter.objects.tally()
+        stored = {row.user_id: row for row in TaskCounter.objects.all()}
+
+        mismatches = []
+        for user_id in set(expected) | set(stored):
+            counts = expected.get(user_id, {})
+            row = stored.get(user_id)
+            for field in fields:
+                want = counts.get(field, 0)
+                have = getattr(row, field) if row else 0
+                if want != have:
+                    mismatches.append(f"{'global' if user_id is None else f'user {user_id}'}: {field} is {have}, expected {want}")
+
+        for line in mismatches:
+            self.stdout.write(line)
+
+        if options['check']:
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} task counter(s) out of date.')
+            self.stdout.write(self.style.SUCCESS('Task counters are up to date.'))
+            return
+
+        TaskCounter.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt task counters ({len(mismatches)} fixed).'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from tasks.models import TaskDailyRollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily task rollups (burndown/throughput) from the task progress event log.'
+
+    def handle(self, *args, **options):
+        rows = TaskDailyRollup.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(rows)} daily rollup row(s).'))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:02
+
+import django.db.models.deletion
+from django.conf import settings
+from collections import Counter
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskCounter = apps.get_model('tasks', 'TaskCounter')
+    statuses = {'created', 'assigned', 'ongoing', 'completed'}
+    rows = {None: Counter()}
+    grouped = Task.objects.values('status', 'assigned_to_id', 'created_by_id').annotate(n=models.Count('id')).order_by()
+    for values in grouped:
+        status, n = values['status'], values['n']
+        if status not in statuses:
+            continue
+        rows[None][status] += n
+        if values['assigned_to_id']:
+            rows.setdefault(values['assigned_to_id'], Counter()).update({status: n, 'my_tasks': n})
+        if values['created_by_id'] != values['assigned_to_id']:
+            rows.setdefault(values['created_by_id'], Counter())[status] += n
+    TaskCounter.objects.bulk_create(TaskCounter(user_id=user_id, **counts) for user_id, counts in rows.items())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_completion_percentage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.IntegerField(default=0)),
+                ('assigned', models.IntegerField(default=0)),
+                ('ongoing', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('my_tasks', models.IntegerField(default=0)),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_counter', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
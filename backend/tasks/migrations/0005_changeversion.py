@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
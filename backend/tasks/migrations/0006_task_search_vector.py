@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from tasks_tracker.search import postgres_search_column_sql
+
+
+def add_search_vector(apps, schema_editor):
+    # PostgreSQL only; the SQLite FTS5 fallback is installed after migrate.
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in postgres_search_column_sql('tasks_task'):
+            schema_editor.execute(statement)
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE tasks_task DROP COLUMN search_vector')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_changeversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, remove_search_vector),
+    ]
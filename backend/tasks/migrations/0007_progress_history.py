@@ -0,0 +1,90 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from collections import Counter
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_history(apps, schema_editor):
+    # Existing tasks get one "created" event at their creation time, in their current state.
+    Task = apps.get_model('tasks', 'Task')
+    TaskProgressEvent = apps.get_model('tasks', 'TaskProgressEvent')
+    TaskDailyRollup = apps.get_model('tasks', 'TaskDailyRollup')
+    statuses = ['created', 'assigned', 'ongoing', 'completed']
+
+    events = []
+    deltas = {}
+    tasks = Task.objects.values_list('id', 'status', 'completion_percentage', 'assigned_to_id', 'created_at')
+    for task_id, status, percentage, assigned_to_id, created_at in tasks.iterator():
+        events.append(TaskProgressEvent(
+            task_id=task_id, kind='created', status=status, completion_percentage=percentage,
+            assigned_to_id=assigned_to_id, created_at=created_at,
+        ))
+        day = timezone.localdate(created_at)
+        for user_id in {None, assigned_to_id}:
+            deltas.setdefault((user_id, day), Counter()).update(
+                [status, 'opened'] + (['closed'] if status == 'completed' else [])
+            )
+    TaskProgressEvent.objects.bulk_create(events, batch_size=5000)
+
+    rows = []
+    totals = {}
+    for user_id, day in sorted(deltas, key=lambda key: (key[0] is not None, key[0] or 0, key[1])):
+        delta = deltas[user_id, day]
+        stock = totals.setdefault(user_id, Counter())
+        stock.update({status: delta[status] for status in statuses})
+        rows.append(TaskDailyRollup(
+            day=day, user_id=user_id, opened=delta['opened'], closed=delta['closed'],
+            **{status: stock[status] for status in statuses},
+        ))
+    TaskDailyRollup.objects.bulk_create(rows, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('opened', models.IntegerField(default=0)),
+                ('closed', models.IntegerField(default=0)),
+                ('reopened', models.IntegerField(default=0)),
+                ('created', models.IntegerField(default=0)),
+                ('assigned', models.IntegerField(default=0)),
+                ('ongoing', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='task_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='rollup_user_day_uniq'), models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('day',), name='rollup_global_day_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskProgressEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('status', models.CharField(choices=[('created', 'Created'), ('assigned', 'Assigned'), ('ongoing', 'On-going'), ('completed', 'Completed')], max_length=20)),
+                ('completion_percentage', models.IntegerField()),
+                ('previous_status', models.CharField(blank=True, choices=[('created', 'Created'), ('assigned', 'Assigned'), ('ongoing', 'On-going'), ('completed', 'Completed')], max_length=20, null=True)),
+                ('previous_percentage', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('assigned_to', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='progress_events', to='tasks.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', 'created_at'], name='progress_task_created_idx'), models.Index(fields=['created_at', 'id'], name='progress_created_id_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_change_log(apps, schema_editor):
+    # One entry per existing row and audience, in update order, so that a sync
+    # from cursor 0 returns everything a client can see.
+    Task = apps.get_model('tasks', 'Task')
+    TaskReport = apps.get_model('reports', 'TaskReport')
+    ChangeLogEntry = apps.get_model('tasks', 'ChangeLogEntry')
+
+    entries = []
+    tasks = Task.objects.order_by('updated_at', 'id').values_list('id', 'assigned_to_id', 'created_by_id', 'updated_at')
+    for task_id, assigned_to_id, created_by_id, updated_at in tasks.iterator():
+        for user_id in dict.fromkeys([None, assigned_to_id, created_by_id]):
+            entries.append(ChangeLogEntry(kind='task', object_id=task_id, user_id=user_id, created_at=updated_at))
+    reports = TaskReport.objects.order_by('updated_at', 'id').values_list('id', 'reported_by_id', 'updated_at')
+    for report_id, reported_by_id, updated_at in reports.iterator():
+        for user_id in (None, reported_by_id):
+            entries.append(ChangeLogEntry(kind='report', object_id=report_id, user_id=user_id, created_at=updated_at))
+    ChangeLogEntry.objects.bulk_create(entries, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_description_snippet'),
+        ('reports', '0004_taskreport_content_snippet'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('task', 'Task'), ('report', 'Report')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'user', 'id'], name='changelog_kind_user_id_idx'), models.Index(fields=['created_at'], name='changelog_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_change_log, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_status_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_assignee_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_creator_status_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['status', '-created_at'], name='task_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['assigned_to', 'status', '-created_at'], name='task_assignee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['created_by', 'status', '-created_at'], name='task_creator_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True), ('status', 'completed')), fields=['updated_at'], name='task_archivable_idx'),
+        ),
+    ]
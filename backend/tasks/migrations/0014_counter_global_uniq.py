@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 03:00
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+STATUS_FIELDS = ['created', 'assigned', 'ongoing', 'completed']
+
+
+def merge_global_counters(apps, schema_editor):
+    # Two first writers could each have created a global row; recount it from the tasks.
+    TaskCounter = apps.get_model('tasks', 'TaskCounter')
+    Task = apps.get_model('tasks', 'Task')
+    rows = TaskCounter.objects.filter(user__isnull=True)
+    if rows.count() > 1:
+        counts = dict(Task.objects.values_list('status').annotate(n=models.Count('id')).order_by())
+        rows.delete()
+        TaskCounter.objects.create(user=None, **{status: counts.get(status, 0) for status in STATUS_FIELDS})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_hot_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_global_counters, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='taskcounter',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('user', models.Value(0), output_field=models.IntegerField()), condition=models.Q(('user__isnull', True)), name='counter_global_uniq'),
+        ),
+    ]
@@ -1,8 +1,96 @@
-from django.db import models
+from collections import Counter, namedtuple
+from datetime import timedelta
+
+from django.db import models, router, transaction, IntegrityError
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from tasks_tracker.snippets import snippet_expression
 
 User = get_user_model()
 
+# The fields of a task that derived data (counters, etc.) depends on.
+TaskState = namedtuple('TaskState', ['status', 'assigned_to_id', 'created_by_id', 'completion_percentage'])
+
+# Rows not archived yet: the working set, which the partial indexes cover.
+HOT = models.Q(archived_at__isnull=True)
+
+# Sent inside the writing transaction whenever tasks are created, changed or
+# deleted. ``changes`` is a list of (task, before, after) where before/after
+# are TaskState tuples, None on create/delete.
+task_changed = Signal()
+
+
+class TaskManager(models.Manager):
+    """Bulk writes that still keep derived data in step, like Task.save() does."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            changes = [(task, None, task.state()) for task in objs]
+            task_changed.send(sender=self.model, changes=changes)
+        for task, _, after in changes:
+            task._loaded_state = after
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        written = {self.model._meta.get_field(f).attname for f in fields}
+        # Bumped in the database, so a concurrent update_if_current() is never overwritten.
+        for task in objs:
+            task.version = F('version') + 1
+        fields = [*fields, 'version']
+        with transaction.atomic(using=self.db):
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            versions = dict(self.filter(pk__in=[task.pk for task in objs]).values_list('pk', 'version'))
+            for task in objs:
+                task.version = versions[task.pk]
+            changes = []
+            for task in objs:
+                before, current = task.loaded_state(), task.state()
+                if before is None:
+                    continue
+                after = TaskState(*(new if field in written else old
+                                    for field, old, new in zip(TaskState._fields, before, current)))
+                changes.append((task, before, after))
+            task_changed.send(sender=self.model, changes=changes)
+        for task, _, after in changes:
+            task._loaded_state = after
+        return rows
+
+    def update_if_current(self, task, version=None, **values):
+        """
+        Write ``values`` to ``task`` with one ``UPDATE ... WHERE id = %s AND
+        version = %s`` that also bumps the version, and update ``task`` to
+        match. Values may be expressions over the row (see
+        ``Task.status_for_progress()``). ``version`` defaults to the one
+        ``task`` was read at. Returns None, writing nothing, when the row is no
+        longer at that version.
+        """
+        if version is not None and version != task.version:
+            return None
+        before = task.loaded_state()
+        values = {**values, 'version': F('version') + 1, 'updated_at': timezone.now()}
+        using = router.db_for_write(self.model, instance=task)
+        with transaction.atomic(using=using):
+            # Pinning the version pins the whole row to ``before``.
+            if not self.using(using).filter(pk=task.pk, version=task.version).update(**values):
+                return None
+            for name, value in values.items():
+                setattr(task, name, value)
+            computed = [name for name, value in values.items() if hasattr(value, 'resolve_expression')]
+            # The UPDATE holds the row lock until commit, so this reads back what it wrote.
+            row = self.using(using).filter(pk=task.pk).values_list(*computed).get()
+            for name, value in zip(computed, row):
+                setattr(task, self.model._meta.get_field(name).attname, value)
+            after = task.state()
+            task_changed.send(sender=self.model, changes=[(task, before, after)])
+        task._loaded_state = after
+        return task
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('created', 'Created'),
@@ -10,9 +98,13 @@ class Task(models.Model):
         ('ongoing', 'On-going'),
         ('completed', 'Completed'),
     ]
-    
+
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
+    # Maintained by the database; see tasks_tracker/snippets.py
+    description_snippet = models.GeneratedField(
+        expression=snippet_expression('description'), output_field=models.TextField(), db_persist=True,
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='created')
     completion_percentage = models.IntegerField(default=0, help_text="Task completion percentage (0-100)")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_tasks')
@@ -20,9 +112,498 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     due_date = models.DateTimeField(null=True, blank=True)
-    
+    # Bumped on every write; conditional updates compare it (optimistic concurrency).
+    version = models.PositiveIntegerField(default=1)
+    # Set by archive_tasks; archived tasks are left out of reads unless asked for (tasks_tracker/archive.py)
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TaskManager()
+
     class Meta:
         ordering = ['-created_at']
-    
+        indexes = [
+            # Newest-first listing and keyset pagination for managers.
+            models.Index(fields=['-created_at', '-id'], condition=HOT, name='task_created_at_id_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], condition=HOT, name='task_status_created_idx'),
+            # Employees see tasks assigned to or created by them (my_tasks: assigned only), newest first.
+            models.Index(fields=['assigned_to', '-created_at', '-id'], condition=HOT, name='task_assignee_created_idx'),
+            models.Index(fields=['created_by', '-created_at', '-id'], condition=HOT, name='task_creator_created_idx'),
+            models.Index(fields=['assigned_to', 'status', '-created_at', '-id'], condition=HOT, name='task_assignee_status_idx'),
+            models.Index(fields=['created_by', 'status', '-created_at', '-id'], condition=HOT, name='task_creator_status_idx'),
+            # Open work by deadline.
+            models.Index(fields=['due_date'], condition=~models.Q(status='completed'), name='task_open_due_date_idx'),
+            # Completed tasks waiting to be archived.
+            models.Index(fields=['updated_at'], condition=HOT & models.Q(status='completed'), name='task_archivable_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.status}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(f in field_names for f in ('status', 'assigned_to_id', 'created_by_id', 'completion_percentage')):
+            instance._loaded_state = instance.state()
+        return instance
+
+    @staticmethod
+    def progress_transition(percentage):
+        """(statuses it applies to, None for all; new status) when completion is set to ``percentage``, or None."""
+        if percentage == 100:
+            return None, 'completed'
+        if percentage > 0:
+            return ['created', 'assigned'], 'ongoing'
+        return None
+
+    @classmethod
+    def status_for_progress(cls, percentage):
+        """The status a task moves to when its completion is set to ``percentage``, as SQL over its current status."""
+        transition = cls.progress_transition(percentage)
+        if transition is None:
+            return F('status')
+        statuses, new_status = transition
+        if statuses is None:
+            return Value(new_status)
+        return Case(When(status__in=statuses, then=Value(new_status)), default=F('status'))
+
+    @classmethod
+    def progress_status(cls, status, percentage):
+        """status_for_progress() for a status in hand."""
+        transition = cls.progress_transition(percentage)
+        if transition is None or (transition[0] is not None and status not in transition[0]):
+            return status
+        return transition[1]
+
+    def state(self):
+        return TaskState(self.status, self.assigned_to_id, self.created_by_id, self.completion_percentage)
+
+    def loaded_state(self):
+        """State of the row as last read from or written to the database."""
+        if self._state.adding:
+            return None
+        if getattr(self, '_loaded_state', None) is None:
+            row = Task.objects.filter(pk=self.pk).values_list(*TaskState._fields).first()
+            self._loaded_state = TaskState(*row) if row else None
+        return self._loaded_state
+
+    def save(self, *args, **kwargs):
+        before = self.loaded_state()
+        if before is not None:
+            # Bumped in the database (see TaskManager.bulk_update) and read back below.
+            self.version = F('version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = [*kwargs['update_fields'], 'version']
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if before is not None:
+                self.refresh_from_db(fields=['version'])
+            after = self.state()
+            update_fields = kwargs.get('update_fields')
+            if before and update_fields is not None:
+                # Fields outside update_fields were not written.
+                written = {self._meta.get_field(f).attname for f in update_fields}
+                after = TaskState(*(new if field in written else old for field, old, new in zip(TaskState._fields, before, after)))
+            task_changed.send(sender=Task, changes=[(self, before, after)])
+        self._loaded_state = after
+
+
+class TaskCounterManager(models.Manager):
+    STATUS_FIELDS = [choice for choice, _ in Task.STATUS_CHOICES]
+
+    @classmethod
+    def contributions(cls, state):
+        """How much one task adds to each counter row, keyed by user id (None is global)."""
+        rows = {}
+        if state is None or state.status not in cls.STATUS_FIELDS:
+            return rows
+        rows[None] = Counter({state.status: 1})
+        if state.assigned_to_id:
+            rows[state.assigned_to_id] = Counter({state.status: 1, 'my_tasks': 1})
+        if state.created_by_id and state.created_by_id != state.assigned_to_id:
+            rows[state.created_by_id] = Counter({state.status: 1})
+        return rows
+
+    def apply_changes(self, changes):
+        """Apply a batch of (before, after) task states as one update per counter row."""
+        deltas = {}
+        for before, after in changes:
+            for user_id, counts in self.contributions(before).items():
+                deltas.setdefault(user_id, Counter()).subtract(counts)
+            for user_id, counts in self.contributions(after).items():
+                deltas.setdefault(user_id, Counter()).update(counts)
+        for user_id, delta in deltas.items():
+            delta = {field: n for field, n in delta.items() if n}
+            if delta:
+                self._bump(user_id, delta)
+
+    def _bump(self, user_id, delta):
+        rows = self.filter(user__isnull=True) if user_id is None else self.filter(user_id=user_id)
+        if rows.update(**{field: F(field) + n for field, n in delta.items()}):
+            return
+        if not any(n > 0 for n in delta.values()):
+            # Nothing to take away from; the row went with its user.
+            return
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, **{field: max(n, 0) for field, n in delta.items()})
+        except IntegrityError:
+            rows.update(**{field: F(field) + n for field, n in delta.items()})
+
+    def for_user(self, user):
+        """Counter row for a user, or the global row when ``user`` is None."""
+        rows = self.filter(user__isnull=True) if user is None else self.filter(user=user)
+        return rows.first() or self.model(user=user)
+
+    def tally(self):
+        """Recount every row from the Task table, keyed like contributions()."""
+        rows = {None: Counter()}
+        grouped = Task.objects.values('status', 'assigned_to_id', 'created_by_id').annotate(n=models.Count('id')).order_by()
+        for values in grouped:
+            n = values.pop('n')
+            state = TaskState(completion_percentage=None, **values)
+            for user_id, counts in self.contributions(state).items():
+                rows.setdefault(user_id, Counter()).update({field: c * n for field, c in counts.items()})
+        return rows
+
+    def rebuild(self):
+        with transaction.atomic():
+            rows = self.tally()
+            self.all().delete()
+            self.bulk_create(self.model(user_id=user_id, **counts) for user_id, counts in rows.items())
+        return rows
+
+
+class TaskCounter(models.Model):
+    """Per-status task totals, kept up to date on every Task write.
+
+    The row without a user holds the global totals shown to managers; each
+    user row counts the tasks that user can see (assigned to or created by them).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True, related_name='task_counter')
+    created = models.IntegerField(default=0)
+    assigned = models.IntegerField(default=0)
+    ongoing = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    my_tasks = models.IntegerField(default=0)
+
+    objects = TaskCounterManager()
+
+    class Meta:
+        constraints = [
+            # NULLs are distinct in unique indexes, so the one-to-one alone allows two global rows.
+            models.UniqueConstraint(
+                Coalesce('user', Value(0), output_field=models.IntegerField()),
+                condition=models.Q(user__isnull=True), name='counter_global_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Task counter for {self.user or 'all tasks'}"
+
+    def as_stats(self):
+        stats = {field: getattr(self, field) for field in TaskCounterManager.STATUS_FIELDS}
+        return {'total': sum(stats.values()), **stats}
+
+
+class ChangeVersionManager(models.Manager):
+    def bump(self, *scopes):
+        """Increment each scope's version, creating rows on first use."""
+        scopes = set(scopes)
+        if self.filter(scope__in=scopes).update(version=F('version') + 1) == len(scopes):
+            return
+        existing = set(self.filter(scope__in=scopes).values_list('scope', flat=True))
+        for scope in scopes - existing:
+            try:
+                with transaction.atomic():
+                    self.create(scope=scope, version=1)
+            except IntegrityError:
+                self.filter(scope=scope).update(version=F('version') + 1)
+
+    def bump_on_commit(self, *scopes, using=None):
+        """
+        ``bump()`` once the current transaction commits. Inside it the shared
+        ``tasks``/``reports`` rows would stay locked until commit, queueing every
+        writer behind the others; afterwards each bump is one short UPDATE. A
+        read between the commit and the bump may still get a 304 for the old
+        version; a process that dies in between leaves it until the next write.
+        """
+        transaction.on_commit(lambda: self.bump(*scopes), using=using)
+
+    def get_many(self, scopes):
+        versions = dict(self.filter(scope__in=scopes).values_list('scope', 'version'))
+        return [versions.get(scope, 0) for scope in scopes]
+
+
+class ChangeVersion(models.Model):
+    """A counter bumped on every write to some slice of data, used to build ETags.
+
+    Scopes are ``tasks``/``reports`` for everything a manager sees,
+    ``tasks:user:<id>``/``reports:user:<id>`` for one employee's slice and
+    ``users`` for names shown alongside tasks and reports.
+    """
+    scope = models.CharField(max_length=64, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    objects = ChangeVersionManager()
+
+    def __str__(self):
+        return f"{self.scope} @ {self.version}"
+
+
+class ChangeLogEntryManager(models.Manager):
+    def record(self, kind, entries, at=None):
+        """Append one entry per (object id, audience user id); the ``None`` audience is what managers see."""
+        at = at or timezone.now()
+        rows = [
+            self.model(kind=kind, object_id=object_id, user_id=user_id, created_at=at)
+            for object_id, audience in entries
+            for user_id in audience
+        ]
+        if rows:
+            self.bulk_create(rows)
+        return rows
+
+    def after(self, kind, user_id, cursor, limit):
+        """(id, object_id, created_at) of up to ``limit`` entries past ``cursor``, oldest first."""
+        entries = self.filter(kind=kind, user_id=user_id, id__gt=cursor).order_by('id')
+        return list(entries.values_list('id', 'object_id', 'created_at')[:limit])
+
+    def oldest_id(self):
+        return self.order_by('id').values_list('id', flat=True).first()
+
+    def settled_cursor(self, settled_before):
+        """The newest entry written before ``settled_before``, or 0."""
+        entries = self.filter(created_at__lte=settled_before).order_by('-id')
+        return entries.values_list('id', flat=True).first() or 0
+
+
+class ChangeLogEntry(models.Model):
+    """Append-only log of writes to tasks and reports, read by the delta-sync endpoints.
+
+    Each write adds one entry per audience: ``user=None`` for managers, who see
+    everything, and one per employee who could see the row before or after the
+    write (so a task reassigned away is announced to its old assignee too). The
+    id is the sync cursor. Entries keep their ids after the rows are deleted.
+    """
+    KIND_CHOICES = [
+        ('task', 'Task'),
+        ('report', 'Report'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = ChangeLogEntryManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'user', 'id'], name='changelog_kind_user_id_idx'),
+            models.Index(fields=['created_at'], name='changelog_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} {self.object_id} for {self.user_id or 'managers'}"
+
+
+class TaskProgressEventManager(models.Manager):
+    def record(self, changes, at=None):
+        """Append one event per task whose status, progress or assignee changed (or that came or went)."""
+        at = at or timezone.now()
+        events = []
+        for task, before, after in changes:
+            if before is not None and after is not None and all(
+                getattr(before, field) == getattr(after, field) for field in self.model.TRACKED_FIELDS
+            ):
+                continue
+            state = after or before
+            events.append(self.model(
+                task_id=task.pk,
+                kind='created' if before is None else 'deleted' if after is None else 'updated',
+                status=state.status,
+                completion_percentage=state.completion_percentage,
+                assigned_to_id=state.assigned_to_id,
+                previous_status=before.status if before else None,
+                previous_percentage=before.completion_percentage if before else None,
+                created_at=at,
+            ))
+        if events:
+            self.bulk_create(events)
+        return events
+
+
+class TaskProgressEvent(models.Model):
+    """Append-only history of task status, completion percentage and assignee.
+
+    For ``deleted`` events the fields hold the task's last state. Events keep
+    their task and user ids after those rows are deleted.
+    """
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    ]
+    TRACKED_FIELDS = ('status', 'completion_percentage', 'assigned_to_id')
+
+    task = models.ForeignKey(Task, on_delete=models.DO_NOTHING, db_constraint=False, related_name='progress_events')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    completion_percentage = models.IntegerField()
+    assigned_to = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    previous_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, null=True, blank=True)
+    previous_percentage = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = TaskProgressEventManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='progress_task_created_idx'),
+            models.Index(fields=['created_at', 'id'], name='progress_created_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} {self.kind}: {self.status} {self.completion_percentage}%"
+
+    def state(self):
+        return None if self.kind == 'deleted' else TaskState(
+            self.status, self.assigned_to_id, None, self.completion_percentage
+        )
+
+
+class TaskDailyRollupManager(models.Manager):
+    STOCK_FIELDS = TaskCounterManager.STATUS_FIELDS
+    FLOW_FIELDS = ['opened', 'closed', 'reopened']
+
+    @classmethod
+    def contributions(cls, before, after):
+        """How one task change moves each rollup row, keyed by assignee id (None is all tasks)."""
+        rows = {}
+        for state, sign in ((before, -1), (after, 1)):
+            if state is not None and state.status in cls.STOCK_FIELDS:
+                for user_id in {None, state.assigned_to_id}:
+                    rows.setdefault(user_id, Counter())[state.status] += sign
+
+        if after is not None:
+            was_completed = before is not None and before.status == 'completed'
+            flows = []
+            if before is None:
+                flows.append('opened')
+            if after.status == 'completed' and not was_completed:
+                flows.append('closed')
+            if was_completed and after.status != 'completed':
+                flows.append('reopened')
+            for user_id in {None, after.assigned_to_id}:
+                rows.setdefault(user_id, Counter()).update(flows)
+        return rows
+
+    def apply_changes(self, changes, day=None):
+        """Apply a batch of (before, after) task states to the rows for ``day`` (today)."""
+        day = day or timezone.localdate()
+        deltas = {}
+        for before, after in changes:
+            for user_id, counts in self.contributions(before, after).items():
+                deltas.setdefault(user_id, Counter()).update(counts)
+        for user_id, delta in deltas.items():
+            delta = {field: n for field, n in delta.items() if n}
+            if delta:
+                self._bump(day, user_id, delta)
+
+    def _rows(self, user_id):
+        return self.filter(user__isnull=True) if user_id is None else self.filter(user_id=user_id)
+
+    def _bump(self, day, user_id, delta):
+        rows = self._rows(user_id).filter(day=day)
+        if rows.update(**{field: F(field) + n for field, n in delta.items()}):
+            return
+        # First change of the day: carry the totals over from the last active day.
+        previous = self._rows(user_id).filter(day__lt=day).order_by('-day').values(*self.STOCK_FIELDS).first() or {}
+        values = {field: previous.get(field, 0) + delta.get(field, 0) for field in self.STOCK_FIELDS}
+        values.update({field: delta.get(field, 0) for field in self.FLOW_FIELDS})
+        try:
+            with transaction.atomic():
+                self.create(day=day, user_id=user_id, **values)
+        except IntegrityError:
+            rows.update(**{field: F(field) + n for field, n in delta.items()})
+
+    def series(self, user_id, start, end):
+        """Rows for every day from ``start`` to ``end``, filling days without activity."""
+        rows = self._rows(user_id)
+        stored = {row['day']: row for row in rows.filter(day__range=(start, end)).values('day', *self.STOCK_FIELDS, *self.FLOW_FIELDS)}
+        carried = {field: 0 for field in self.STOCK_FIELDS}
+        if start not in stored:
+            carried.update(rows.filter(day__lt=start).order_by('-day').values(*self.STOCK_FIELDS).first() or {})
+
+        day = start
+        while day <= end:
+            row = stored.get(day)
+            if row:
+                carried = {field: row[field] for field in self.STOCK_FIELDS}
+                yield row
+            else:
+                yield {'day': day, **carried, **{field: 0 for field in self.FLOW_FIELDS}}
+            day += timedelta(days=1)
+
+    def rebuild(self):
+        """Recompute every row by replaying the progress event log."""
+        states = {}
+        deltas = {}
+        for event in TaskProgressEvent.objects.order_by('created_at', 'id').iterator(chunk_size=5000):
+            day = timezone.localdate(event.created_at)
+            after = event.state()
+            for user_id, counts in self.contributions(states.get(event.task_id), after).items():
+                deltas.setdefault((user_id, day), Counter()).update(counts)
+            states[event.task_id] = after
+
+        rows = []
+        totals = {}
+        for user_id, day in sorted(deltas, key=lambda key: (key[0] is not None, key[0] or 0, key[1])):
+            delta = deltas[user_id, day]
+            stock = totals.setdefault(user_id, Counter())
+            stock.update({field: delta[field] for field in self.STOCK_FIELDS})
+            rows.append(self.model(
+                day=day, user_id=user_id,
+                **{field: stock[field] for field in self.STOCK_FIELDS},
+                **{field: delta[field] for field in self.FLOW_FIELDS},
+            ))
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(rows, batch_size=5000)
+        return rows
+
+
+class TaskDailyRollup(models.Model):
+    """Per-day task totals, kept up to date from task_changed like TaskCounter.
+
+    ``opened``/``closed``/``reopened`` count that day's transitions; the status
+    fields hold the totals at the end of the day. Rows only exist for days with
+    activity. The row without a user covers all tasks, user rows the tasks
+    assigned to that user; like the event log, they outlive deleted users.
+    """
+    day = models.DateField()
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='task_rollups'
+    )
+    opened = models.IntegerField(default=0)
+    closed = models.IntegerField(default=0)
+    reopened = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    assigned = models.IntegerField(default=0)
+    ongoing = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    objects = TaskDailyRollupManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='rollup_user_day_uniq'),
+            models.UniqueConstraint(fields=['day'], condition=models.Q(user__isnull=True), name='rollup_global_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Task rollup for {self.user_id or 'all tasks'} on {self.day}"
@@ -1,10 +1,14 @@
+from datetime import timedelta
 from rest_framework import serializers
+from tasks_tracker.fastpath import related_full_name
+from tasks_tracker.instrumentation import TimedSerializerMixin
 from .models import Task
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
     
@@ -12,9 +16,18 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = [
             'id', 'title', 'description', 'status', 'completion_percentage', 'created_by', 'assigned_to',
-            'created_by_name', 'assigned_to_name', 'created_at', 'updated_at', 'due_date'
+            'created_by_name', 'assigned_to_name', 'created_at', 'updated_at', 'due_date', 'version',
+            'archived_at'
         ]
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at', 'version', 'archived_at']
+
+    # Read-only fast path for lists (tasks_tracker/fastpath.py)
+    values_fields = {
+        'created_by_name': (['created_by__first_name', 'created_by__last_name'], related_full_name),
+        'assigned_to_name': (['assigned_to__first_name', 'assigned_to__last_name'], related_full_name),
+    }
+    # ?compact=1 lists carry the stored snippet instead of the full text
+    compact_fields = {'description': 'description_snippet'}
         
     def validate_assigned_to(self, value):
         if value and value.is_manager:
@@ -26,7 +39,31 @@ class TaskSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Completion percentage must be between 0 and 100.")
         return value
 
-class UserSerializer(serializers.ModelSerializer):
+class TaskIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
+
+    def validate_ids(self, value):
+        # Keep the caller's order but act on each task once.
+        return list(dict.fromkeys(value))
+
+class ProgressRangeSerializer(serializers.Serializer):
+    """Query parameters of the burndown and throughput series."""
+    MAX_DAYS = 731
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    assigned_to = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        end = attrs.setdefault('end', timezone.localdate())
+        start = attrs.setdefault('start', end - timedelta(days=29))
+        if start > end:
+            raise serializers.ValidationError({'start': 'start must not be after end.'})
+        if (end - start).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'start': f'At most {self.MAX_DAYS} days per request.'})
+        return attrs
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role']
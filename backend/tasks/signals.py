@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from accounts.signals import UNLISTED_FIELDS
+from tasks_tracker.events import publish_on_commit
+from .models import Task, TaskCounter, TaskDailyRollup, TaskProgressEvent, ChangeLogEntry, ChangeVersion, task_changed
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    # Cascaded deletes run inside the collector's transaction too.
+    before = instance.loaded_state() or instance.state()
+    task_changed.send(sender=Task, changes=[(instance, before, None)])
+
+
+@receiver(task_changed, sender=Task)
+def update_task_counters(sender, changes, **kwargs):
+    TaskCounter.objects.apply_changes((before, after) for _, before, after in changes)
+
+
+@receiver(task_changed, sender=Task)
+def record_task_progress(sender, changes, **kwargs):
+    TaskProgressEvent.objects.record(changes)
+    TaskDailyRollup.objects.apply_changes((before, after) for _, before, after in changes)
+
+
+@receiver(task_changed, sender=Task)
+def bump_task_versions(sender, changes, **kwargs):
+    scopes = {'tasks'}
+    for _, before, after in changes:
+        for state in (before, after):
+            if state is not None:
+                scopes.update(f'tasks:user:{user_id}' for user_id in (state.assigned_to_id, state.created_by_id) if user_id)
+    ChangeVersion.objects.bump_on_commit(*scopes)
+
+
+@receiver(task_changed, sender=Task)
+def log_task_changes(sender, changes, **kwargs):
+    # Managers, plus everyone who could see the task before or after the write.
+    entries = []
+    for task, before, after in changes:
+        audience = {None}
+        for state in (before, after):
+            if state is not None:
+                audience.update(user_id for user_id in (state.assigned_to_id, state.created_by_id) if user_id)
+        entries.append((task.pk, audience))
+    ChangeLogEntry.objects.record('task', entries)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def bump_user_versions(sender, instance, update_fields=None, **kwargs):
+    # Only names and roles show up next to tasks and reports; logins and password changes don't.
+    if update_fields is not None and set(update_fields) <= UNLISTED_FIELDS:
+        return
+    ChangeVersion.objects.bump_on_commit('users')
+
+
+@receiver(task_changed, sender=Task)
+def publish_task_events(sender, changes, **kwargs):
+    for task, before, after in changes:
+        before_users = {before.assigned_to_id, before.created_by_id} if before else set()
+        if after is None:
+            publish_on_commit('task.deleted', {'id': task.pk}, before_users)
+            continue
+
+        after_users = {after.assigned_to_id, after.created_by_id}
+        data = {
+            'id': task.pk,
+            'title': task.title,
+            'status': after.status,
+            'completion_percentage': after.completion_percentage,
+            'assigned_to': after.assigned_to_id,
+            'created_by': after.created_by_id,
+            'updated_at': task.updated_at,
+        }
+        publish_on_commit('task.created' if before is None else 'task.updated', data, after_users)
+        if before_users - after_users:
+            # Reassigned away: the old assignee can no longer see the task.
+            publish_on_commit('task.removed', {'id': task.pk}, before_users - after_users, managers=False)
@@ -1,3 +1,1081 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import threading
+import uuid
+from base64 import urlsafe_b64encode
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import StreamTicket, User
+from reports.models import TaskReport
+from tasks_tracker.db import ReplicaPool, replica_pool
+from tasks_tracker.events import InProcessBroker, get_broker
+from tasks_tracker.metrics import Histogram, registry
+from tasks_tracker.renderers import ORJSONParser, ORJSONRenderer
+from .models import ChangeLogEntry, Task, TaskCounter, TaskDailyRollup, TaskProgressEvent, TaskState
+from .serializers import TaskSerializer
+from .views import TaskViewSet
+from .write_behind import CompletionBuffer
+
+
+class QueryBudgetMixin:
+    """Seeds a few users and tasks; asserts query budgets and counter consistency."""
+
+    @classmethod
+    def seed(cls, tasks=30):
+        cls.manager = User.objects.create_user('manager', password='pass12345', role='GM', first_name='Grace')
+        cls.employees = [
+            User.objects.create_user(f'employee{i}', password='pass12345', first_name=f'Emp{i}')
+            for i in range(3)
+        ]
+        cls.employee = cls.employees[0]
+        statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+        Task.objects.bulk_create(
+            Task(
+                title=f'Task {i}',
+                description='x' * 50,
+                status=statuses[i % len(statuses)],
+                created_by=cls.manager,
+                assigned_to=cls.employees[i % len(cls.employees)],
+            )
+            for i in range(tasks)
+        )
+        TaskCounter.objects.rebuild()
+
+    def assertQueryBudget(self, budget, method, url, user, **kwargs):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400, response.content)
+        self.assertLessEqual(
+            len(queries), budget,
+            f'{method.upper()} {url} ran {len(queries)} queries (budget {budget}):\n'
+            + '\n'.join(q['sql'] for q in queries.captured_queries)
+        )
+        return response
+
+    def assertCountersMatch(self):
+        expected = TaskCounter.objects.tally()
+        for row in TaskCounter.objects.all():
+            counts = expected.get(row.user_id, {})
+            for field in ('created', 'assigned', 'ongoing', 'completed', 'my_tasks'):
+                self.assertEqual(getattr(row, field), counts.get(field, 0), f'{row} {field}')
+
+
+class TaskQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed()
+
+    def setUp(self):
+        self.task = Task.objects.filter(assigned_to=self.employee).first()
+
+    def test_list_is_independent_of_page_size(self):
+        for user in (self.manager, self.employee):
+            for page_size in (2, 10, 25):
+                response = self.assertQueryBudget(2, 'get', f'/api/tasks/tasks/?page_size={page_size}', user)
+                self.assertTrue(response.data['results'])
+
+    def test_invalid_page_sizes_fall_back_to_the_default(self):
+        self.client.force_authenticate(self.manager)
+        for page_size, expected in (('5', 5), ('0', 20), ('-3', 20), ('many', 20)):
+            response = self.client.get('/api/tasks/tasks/', {'page_size': page_size})
+            self.assertEqual(len(response.data['results']), expected)
+
+    def test_malformed_cursors_are_not_found(self):
+        self.client.force_authenticate(self.manager)
+        now = {'dt': timezone.now().isoformat()}
+        for cursor in ([['abc', 1], False], [[now, 'x'], False], [[[1], 2], False], [[{'dt': 'yesterday'}, 1], False],
+                       [[now, True], False], [[now, 1], 'no'], [[now], False], 'garbage'):
+            encoded = urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+            response = self.client.get('/api/tasks/tasks/', {'cursor': encoded})
+            self.assertEqual(response.status_code, 404, cursor)
+        self.assertEqual(self.client.get('/api/tasks/tasks/', {'cursor': '%%%'}).status_code, 404)
+
+        response = self.client.get('/api/tasks/tasks/', {'page_size': 2})
+        self.assertEqual(self.client.get(response.data['next']).status_code, 200)
+
+    def test_list_with_filters(self):
+        self.assertQueryBudget(3, 'get', f'/api/tasks/tasks/?status=assigned&assigned_to={self.employee.id}', self.manager)
+
+    def test_retrieve(self):
+        self.assertQueryBudget(2, 'get', f'/api/tasks/tasks/{self.task.id}/', self.employee)
+
+    def test_my_tasks(self):
+        response = self.assertQueryBudget(1, 'get', '/api/tasks/tasks/my_tasks/?page_size=50', self.employee)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_dashboard_stats(self):
+        response = self.assertQueryBudget(2, 'get', '/api/tasks/tasks/dashboard_stats/', self.manager)
+        self.assertEqual(response.data['total'], 30)
+        response = self.assertQueryBudget(2, 'get', '/api/tasks/tasks/dashboard_stats/', self.employee)
+        self.assertEqual(response.data['my_tasks'], 10)
+
+    def test_update_status(self):
+        self.assertQueryBudget(
+            12, 'patch', f'/api/tasks/tasks/{self.task.id}/update_status/', self.employee,
+            data={'status': 'ongoing'}, format='json'
+        )
+
+    def test_update_completion_percentage(self):
+        self.assertQueryBudget(
+            12, 'patch', f'/api/tasks/tasks/{self.task.id}/update_completion_percentage/', self.employee,
+            data={'completion_percentage': 40}, format='json'
+        )
+
+    def test_create(self):
+        self.assertQueryBudget(
+            12, 'post', '/api/tasks/tasks/', self.manager,
+            data={'title': 'New task', 'assigned_to': self.employee.id}, format='json'
+        )
+
+
+class TaskConcurrencyTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1')
+        self.task = Task.objects.create(
+            title='Write report', description='First draft', status='assigned', created_by=self.manager,
+            assigned_to=self.employee,
+        )
+
+    def patch(self, user, url, data):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/tasks/tasks/{self.task.id}/{url}', data, format='json')
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        return response, updates
+
+    def test_stale_version_is_a_conflict(self):
+        response, _ = self.patch(self.manager, '', {'title': 'Manager edit', 'version': self.task.version})
+        self.assertEqual(response.data['version'], self.task.version + 1)
+
+        response, updates = self.patch(self.employee, 'update_status/', {'status': 'ongoing', 'version': self.task.version})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(updates, [])
+        self.assertEqual(response.data['task']['title'], 'Manager edit')
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, self.task.status)
+
+        response, _ = self.patch(self.employee, 'update_status/', {'status': 'ongoing', 'version': response.data['task']['version']})
+        self.assertEqual((response.status_code, response.data['title']), (200, 'Manager edit'))
+
+    def test_updates_write_only_the_changed_columns(self):
+        response, updates = self.patch(self.manager, '', {'title': 'Renamed'})
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"version" = ', updates[0])
+        self.assertNotIn('"description"', updates[0])
+        self.assertEqual(response.data, TaskSerializer(Task.objects.get(pk=self.task.pk)).data)
+
+    def test_a_write_between_read_and_update_is_not_lost(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        Task.objects.update_if_current(Task.objects.get(pk=self.task.pk), title='First')
+        self.assertIsNone(Task.objects.update_if_current(stale, title='Second'))
+        self.assertEqual(Task.objects.get(pk=self.task.pk).title, 'First')
+
+    def test_saves_and_bulk_updates_bump_the_stored_version(self):
+        version = self.task.version
+        stale = Task.objects.get(pk=self.task.pk)
+        Task.objects.update_if_current(Task.objects.get(pk=self.task.pk), title='First')
+        stale.description = 'Second'
+        stale.save()
+        # Counted on top of the concurrent write, not back to the same number.
+        self.assertEqual((stale.version, Task.objects.get(pk=self.task.pk).version), (version + 2, version + 2))
+
+        stale = Task.objects.get(pk=self.task.pk)
+        Task.objects.update_if_current(Task.objects.get(pk=self.task.pk), title='Third')
+        stale.description = 'Fourth'
+        Task.objects.bulk_update([stale], ['description'])
+        self.assertEqual((stale.version, Task.objects.get(pk=self.task.pk).version), (version + 4, version + 4))
+
+    def test_completion_sets_status_in_the_same_update(self):
+        for percentage, expected in [(0, 'assigned'), (40, 'ongoing'), (100, 'completed'), (60, 'completed')]:
+            response, updates = self.patch(
+                self.employee, 'update_completion_percentage/', {'completion_percentage': percentage}
+            )
+            self.assertEqual(len(updates), 1)
+            self.assertEqual((response.data['completion_percentage'], response.data['status']), (percentage, expected))
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, 'completed')
+        self.assertCountersMatch()
+
+
+@override_settings(COMPLETION_WRITE_BEHIND=True)
+class TaskWriteBehindTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1')
+        self.task = Task.objects.create(
+            title='Write report', status='assigned', created_by=self.manager, assigned_to=self.employee
+        )
+        self.buffer = CompletionBuffer(autoflush=False)
+        patcher = mock.patch('tasks.views.completion_buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_authenticate(self.employee)
+
+    def set_completion(self, percentage, **data):
+        return self.client.patch(
+            f'/api/tasks/tasks/{self.task.id}/update_completion_percentage/',
+            {'completion_percentage': percentage, **data}, format='json'
+        )
+
+    def test_updates_are_coalesced_and_read_back(self):
+        with CaptureQueriesContext(connection) as queries:
+            for percentage in (10, 25, 45):
+                response = self.set_completion(percentage)
+                self.assertEqual(response.status_code, 202)
+        self.assertFalse([q for q in queries.captured_queries if not q['sql'].startswith('SELECT')])
+        self.assertEqual(
+            (response.data['completion_percentage'], response.data['status'], response.data['version']),
+            (45, 'ongoing', self.task.version + 1)
+        )
+        self.assertEqual(Task.objects.get(pk=self.task.pk).completion_percentage, 0)
+
+        detail = self.client.get(f'/api/tasks/tasks/{self.task.id}/')
+        self.assertEqual(detail.data, response.data)
+        listed = self.client.get('/api/tasks/tasks/my_tasks/').data['results']
+        self.assertEqual([row['completion_percentage'] for row in listed], [45])
+        # A stale version is refused while the value is pending too.
+        self.assertEqual(self.set_completion(50, version=self.task.version).status_code, 409)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual((task.completion_percentage, task.status, task.version), (45, 'ongoing', self.task.version + 1))
+        self.assertEqual(TaskProgressEvent.objects.filter(task=task, kind='updated').count(), 1)
+        self.assertCountersMatch()
+        stored = self.client.get(f'/api/tasks/tasks/{self.task.id}/').data
+        self.assertEqual({**stored, 'updated_at': None}, {**response.data, 'updated_at': None})
+
+    def test_flush_skips_tasks_written_since_the_value_was_accepted(self):
+        self.assertEqual(self.set_completion(45).status_code, 202)
+        self.client.force_authenticate(self.manager)
+        response = self.client.put(f'/api/tasks/tasks/{self.task.id}/', {
+            'title': 'Rescoped', 'description': 'New scope', 'assigned_to': self.employee.id, 'completion_percentage': 10,
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+        with self.assertLogs('tasks.write_behind', 'WARNING'):
+            self.assertEqual(self.buffer.flush(), 0)
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual((task.title, task.completion_percentage, task.version), ('Rescoped', 10, self.task.version + 1))
+        self.assertEqual(self.client.get(f'/api/tasks/tasks/{self.task.id}/').data['completion_percentage'], 10)
+
+    def test_values_accepted_during_a_flush_are_written(self):
+        # Accepted against the version the previous flush was replacing.
+        self.buffer.add(self.task.pk, 30, self.task.version)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.buffer.add(self.task.pk, 60, self.task.version)
+        self.assertEqual(self.client.get(f'/api/tasks/tasks/{self.task.id}/').data['version'], self.task.version + 2)
+        self.assertEqual(self.buffer.flush(), 1)
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual((task.completion_percentage, task.version), (60, self.task.version + 2))
+
+    def test_stop_flushes_pending_values(self):
+        with mock.patch('tasks.write_behind.threading.Thread') as thread, \
+                mock.patch('tasks.write_behind.atexit.register') as register:
+            buffer = CompletionBuffer()
+            buffer.add(self.task.pk, 100, self.task.version)
+        thread.return_value.start.assert_called_once_with()
+        register.assert_called_once_with(buffer.stop)
+        buffer.stop()
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual((task.completion_percentage, task.status), (100, 'completed'))
+
+
+class TaskExportTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1', first_name='Ada', last_name='Lovelace')
+        other = User.objects.create_user('other', password='secret-pass-1')
+        for title, status, assignee in [('Draft', 'created', self.employee), ('Review', 'ongoing', self.employee),
+                                        ('Ship', 'ongoing', other), ('Announce', 'completed', other)]:
+            Task.objects.create(title=title, status=status, created_by=self.manager, assigned_to=assignee)
+
+    def export(self, user, query=''):
+        self.client.force_authenticate(user)
+        response = self.client.get(f'/api/tasks/tasks/export/{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_export_matches_list_scope_and_filters(self):
+        self.assertEqual(len(self.export(self.manager)), 4)
+        self.assertEqual(len(self.export(self.manager, '?status=ongoing')), 2)
+        rows = self.export(self.employee)
+        self.assertEqual([row['assigned_to'] for row in rows], [str(self.employee.id)] * 2)
+        self.assertEqual(rows[0]['assigned_to_name'], 'Ada Lovelace')
+
+    async def test_export_streams_in_chunks_over_asgi(self):
+        token = AccessToken.for_user(self.manager)
+        with mock.patch.object(TaskViewSet, 'export_chunk_size', 2):
+            response = await self.async_client.get('/api/tasks/tasks/export/', headers={'Authorization': f'Bearer {token}'})
+            self.assertEqual(response.status_code, 200)
+            chunks = [chunk async for chunk in response.streaming_content]
+        # The header line and 4 rows, two lines at a time.
+        self.assertEqual([chunk.count(b'\n') for chunk in chunks], [2, 2, 1])
+        self.assertEqual(len(list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))), 4)
+
+    def test_export_rejects_unknown_format(self):
+        self.client.force_authenticate(self.manager)
+        response = self.client.get('/api/tasks/tasks/export/?export_format=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskCounterTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed(tasks=12)
+
+    def test_counters_follow_every_write(self):
+        task = Task.objects.create(title='Extra', created_by=self.manager, assigned_to=self.employee)
+        self.assertCountersMatch()
+        task.status = 'ongoing'
+        task.save()
+        self.assertCountersMatch()
+        task.assigned_to = self.employees[1]
+        task.save()
+        self.assertCountersMatch()
+        task.delete()
+        self.assertCountersMatch()
+        self.employees[2].delete()
+        self.assertCountersMatch()
+
+    def test_dashboard_stats_read_the_counters(self):
+        stats = self.assertQueryBudget(2, 'get', '/api/tasks/tasks/dashboard_stats/', self.manager).data
+        self.assertEqual(stats, TaskCounter.objects.for_user(None).as_stats())
+        self.assertEqual(stats['total'], 12)
+
+    def test_there_is_one_global_row(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TaskCounter.objects.create(user=None)
+
+        ongoing = TaskCounter.objects.for_user(None).ongoing
+        update = QuerySet.update
+        calls = []
+
+        def update_before_the_insert(queryset, **kwargs):
+            # The first UPDATE ran before another writer's INSERT of the row committed.
+            calls.append(kwargs)
+            return 0 if len(calls) == 1 else update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', update_before_the_insert):
+            TaskCounter.objects.apply_changes([(None, TaskState('ongoing', None, None, 0))])
+        self.assertEqual(list(TaskCounter.objects.filter(user__isnull=True).values_list('ongoing', flat=True)), [ongoing + 1])
+
+
+class TaskBulkActionTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1', first_name='Ada')
+        self.other = User.objects.create_user('other', password='secret-pass-1')
+        tasks = Task.objects.bulk_create(
+            Task(title=f'Task {i}', created_by=self.manager, assigned_to=self.employee) for i in range(6)
+        )
+        self.ids = [task.id for task in tasks[:5]]
+        # Their counter rows already exist, as they would for anyone with work.
+        Task.objects.create(title='Theirs', created_by=self.manager, assigned_to=self.other)
+        self.client.force_authenticate(self.manager)
+
+    def test_bulk_create(self):
+        response = self.client.post('/api/tasks/tasks/bulk_create/', [
+            {'title': 'One', 'assigned_to': self.employee.id},
+            {'title': 'Two', 'completion_percentage': 20},
+        ], format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual([r['result'] for r in response.data['results']], ['created', 'created'])
+        self.assertEqual(response.data['results'][0]['task']['assigned_to_name'], self.employee.get_full_name())
+        self.assertEqual(TaskCounter.objects.for_user(None).as_stats()['total'], 9)
+
+    def test_bulk_create_rejects_whole_batch(self):
+        response = self.client.post('/api/tasks/tasks/bulk_create/', [
+            {'title': 'One'},
+            {'title': 'Two', 'assigned_to': self.manager.id},
+            {'title': 'Three', 'completion_percentage': 150},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([r['result'] for r in response.data['results']], ['valid', 'error', 'error'])
+        self.assertEqual(Task.objects.count(), 7)
+
+    def test_bulk_assign_and_status(self):
+        response = self.assertQueryBudget(
+            16, 'post', '/api/tasks/tasks/bulk_assign/', self.manager,
+            data={'ids': self.ids, 'assigned_to': self.other.id}, format='json'
+        )
+        self.assertEqual([r['id'] for r in response.data['results']], self.ids)
+        self.assertEqual(Task.objects.filter(pk__in=self.ids, assigned_to=self.other).count(), 5)
+
+        self.client.post('/api/tasks/tasks/bulk_status/', {'ids': self.ids, 'status': 'completed'}, format='json')
+        self.assertEqual(Task.objects.filter(pk__in=self.ids, status='completed').count(), 5)
+        self.assertCountersMatch()
+
+    def test_bulk_update_validates_rows(self):
+        statuses = dict(Task.objects.values_list('id', 'status'))
+        response = self.client.post(
+            '/api/tasks/tasks/bulk_assign/', {'ids': self.ids, 'assigned_to': self.manager.id}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            '/api/tasks/tasks/bulk_status/', {'ids': self.ids + [999999], 'status': 'completed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['results'][-1]['result'], 'error')
+        self.assertEqual(dict(Task.objects.values_list('id', 'status')), statuses)
+
+    def test_bulk_delete(self):
+        response = self.client.post('/api/tasks/tasks/bulk_delete/', {'ids': self.ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(TaskCounter.objects.for_user(None).as_stats()['total'], 2)
+
+    def test_employees_cannot_bulk_update(self):
+        self.client.force_authenticate(self.employee)
+        response = self.client.post('/api/tasks/tasks/bulk_status/', {'ids': self.ids, 'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class TaskConditionalReadTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1')
+        self.other = User.objects.create_user('other', password='secret-pass-1')
+        self.task = Task.objects.create(title='Write report', created_by=self.manager, assigned_to=self.employee)
+        Task.objects.create(title='Review report', created_by=self.manager, assigned_to=self.other)
+
+    def test_unchanged_list_returns_304_without_reading_tasks(self):
+        for url in ('/api/tasks/tasks/', '/api/tasks/tasks/dashboard_stats/'):
+            etag = self.assertQueryBudget(2, 'get', url, self.employee)['ETag']
+            response = self.assertQueryBudget(1, 'get', url, self.employee, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+    def test_writes_change_the_etag_of_affected_users_only(self):
+        url = '/api/tasks/tasks/'
+        self.client.force_authenticate(self.employee)
+        mine = self.client.get(url)['ETag']
+        self.client.force_authenticate(self.other)
+        theirs = self.client.get(url)['ETag']
+
+        self.task.status = 'completed'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.task.save()
+        # Versions move once the write commits, not under its transaction.
+        self.client.force_authenticate(self.employee)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=mine).status_code, 304)
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=mine).status_code, 200)
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=theirs).status_code, 304)
+
+    def test_only_visible_user_changes_change_the_etag(self):
+        url = '/api/tasks/tasks/'
+        self.client.force_authenticate(self.employee)
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.employee)
+            self.employee.set_password('another-pass-1')
+            self.employee.save(update_fields=['password', 'token_version'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.first_name = 'Renamed'
+            self.employee.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_query(self):
+        self.client.force_authenticate(self.manager)
+        etag = self.client.get('/api/tasks/tasks/')['ETag']
+        response = self.client.get('/api/tasks/tasks/?status=ongoing', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class TaskEventTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1')
+        self.colleague = User.objects.create_user('colleague', password='secret-pass-1')
+        bystander = User.objects.create_user('bystander', password='secret-pass-1')
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.broker = get_broker()
+        self.subscriptions = {
+            user.username: self.broker.subscribe(user, loop=self.loop)
+            for user in [self.manager, self.employee, self.colleague, bystander]
+        }
+        for subscription in self.subscriptions.values():
+            self.addCleanup(self.broker.unsubscribe, subscription)
+
+    def received(self, username):
+        self.loop.run_until_complete(asyncio.sleep(0))
+        queue = self.subscriptions[username].queue
+        events = []
+        while not queue.empty():
+            event = queue.get_nowait()
+            events.append((event['type'], event['data']['id']))
+        return events
+
+    def test_broker_is_configurable(self):
+        self.assertIsInstance(self.broker, InProcessBroker)
+
+    def test_events_reach_only_users_who_can_see_the_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(title='Pushed', created_by=self.manager, assigned_to=self.employee)
+        self.assertEqual(self.received('manager'), [('task.created', task.id)])
+        self.assertEqual(self.received('employee'), [('task.created', task.id)])
+        self.assertEqual(self.received('colleague'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assigned_to = self.colleague
+            task.save()
+        self.assertEqual(self.received('manager'), [('task.updated', task.id)])
+        self.assertEqual(self.received('employee'), [('task.removed', task.id)])
+        self.assertEqual(self.received('colleague'), [('task.updated', task.id)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.force_authenticate(self.colleague)
+            self.client.post('/api/reports/reports/', {'task': task.id, 'content': 'Started'}, format='json')
+            task.delete()
+        self.assertEqual([kind for kind, _ in self.received('manager')], ['report.created', 'task.deleted'])
+        self.assertEqual([kind for kind, _ in self.received('colleague')], ['report.created', 'task.deleted'])
+        self.assertEqual(self.received('bystander'), [])
+
+    def test_nothing_is_published_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Task.objects.create(title='Draft', created_by=self.manager, assigned_to=self.employee)
+        # The event and the ETag version bump.
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(self.received('employee'), [])
+
+    def test_stream_requires_authentication(self):
+        self.assertEqual(self.client.get('/api/events/').status_code, 401)
+        self.assertEqual(self.client.get('/api/events/?ticket=not-a-ticket').status_code, 401)
+        self.assertEqual(self.client.post('/api/events/ticket/').status_code, 401)
+
+    def test_tickets_work_once(self):
+        self.client.force_authenticate(self.employee)
+        ticket = self.client.post('/api/events/ticket/').data['ticket']
+        self.client.force_authenticate(None)
+        self.assertEqual(StreamTicket.objects.redeem(ticket), self.employee)
+        self.assertIsNone(StreamTicket.objects.redeem(ticket))
+
+        expired = StreamTicket.objects.issue(self.employee)
+        StreamTicket.objects.filter(pk=expired.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertIsNone(StreamTicket.objects.redeem(expired.key))
+
+    async def test_stream_delivers_events(self):
+        ticket = await StreamTicket.objects.acreate(user=self.employee)
+        response = await self.async_client.get(f'/api/events/?ticket={ticket.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b': connected\n\n')
+
+        get_broker().publish({'type': 'task.updated', 'data': {'id': 7}, 'user_ids': {self.colleague.pk}, 'managers': True})
+        get_broker().publish({'type': 'task.created', 'data': {'id': 8}, 'user_ids': {self.employee.pk}, 'managers': True})
+        self.assertEqual(await anext(chunks), b'event: task.created\ndata: {"id": 8}\n\n')
+        await response.streaming_content.aclose()
+
+        # The ticket has been used.
+        response = await self.async_client.get(f'/api/events/?ticket={ticket.key}')
+        self.assertEqual(response.status_code, 401)
+
+
+class TaskSearchTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1')
+        other = User.objects.create_user('other', password='secret-pass-1')
+        self.invoice = Task.objects.create(
+            title='Prepare quarterly invoices', description='Collect receipts', created_by=self.manager,
+            assigned_to=self.employee,
+        )
+        self.receipts = Task.objects.create(
+            title='Archive receipts', description='Scan invoices from the last quarter', created_by=self.manager,
+            assigned_to=other,
+        )
+        Task.objects.create(title='Plan the offsite', description='Book a venue', created_by=self.manager, assigned_to=other)
+
+    def search(self, user, query):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/tasks/tasks/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [task['id'] for task in response.data['results']]
+
+    def test_prefix_match_ranks_title_hits_first(self):
+        self.assertEqual(self.search(self.manager, 'invoic'), [self.invoice.id, self.receipts.id])
+        self.assertEqual(self.search(self.manager, 'receipt'), [self.receipts.id, self.invoice.id])
+        self.assertEqual(self.search(self.manager, 'quarter archive'), [self.receipts.id])
+
+    def test_search_respects_scope_and_sees_updates(self):
+        self.assertEqual(self.search(self.employee, 'receipts'), [self.invoice.id])
+        Task.objects.filter(pk=self.invoice.pk).update(description='Nothing here')
+        self.assertEqual(self.search(self.employee, 'receipts'), [])
+
+    def test_search_results_page_by_rank(self):
+        self.client.force_authenticate(self.manager)
+        first = self.client.get('/api/tasks/tasks/', {'search': 'invoices', 'page_size': 1}).data
+        second = self.client.get(first['next']).data
+        self.assertEqual([t['id'] for t in first['results'] + second['results']], [self.invoice.id, self.receipts.id])
+        self.assertIsNone(second['next'])
+
+
+class TaskProgressTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1')
+        self.other = User.objects.create_user('other', password='secret-pass-1')
+        self.task = Task.objects.create(title='Draft', created_by=self.manager, assigned_to=self.employee)
+        for title, status, assignee in [('Publish', 'completed', self.employee), ('Review', 'assigned', self.other),
+                                        ('Edit', 'ongoing', self.other)]:
+            Task.objects.create(title=title, status=status, created_by=self.manager, assigned_to=assignee)
+        self.today = timezone.localdate()
+
+    def series(self, name, user, **params):
+        self.client.force_authenticate(user)
+        return self.client.get(f'/api/tasks/tasks/{name}/', params)
+
+    def test_changes_are_logged(self):
+        self.client.force_authenticate(self.employee)
+        self.client.patch(f'/api/tasks/tasks/{self.task.id}/update_status/', {'status': 'ongoing'}, format='json')
+        self.client.patch(
+            f'/api/tasks/tasks/{self.task.id}/update_completion_percentage/', {'completion_percentage': 40}, format='json'
+        )
+        self.client.force_authenticate(self.manager)
+        self.client.patch(f'/api/tasks/tasks/{self.task.id}/', {'title': 'Renamed'}, format='json')
+
+        events = TaskProgressEvent.objects.filter(task=self.task).order_by('id')
+        self.assertEqual(
+            [(e.kind, e.previous_status, e.status, e.previous_percentage, e.completion_percentage) for e in events],
+            [('created', None, 'created', None, 0), ('updated', 'created', 'ongoing', 0, 0), ('updated', 'ongoing', 'ongoing', 0, 40)]
+        )
+
+    def test_burndown_and_throughput(self):
+        response = self.series('burndown', self.manager, start=self.today - timedelta(days=2), end=self.today)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[0]['open'], 0)
+        self.assertEqual((response.data[-1]['open'], response.data[-1]['completed']), (3, 1))
+
+        self.client.force_authenticate(self.employee)
+        self.client.patch(f'/api/tasks/tasks/{self.task.id}/update_status/', {'status': 'completed'}, format='json')
+
+        response = self.series('burndown', self.manager, start=self.today, end=self.today)
+        self.assertEqual((response.data[0]['open'], response.data[0]['completed']), (2, 2))
+        response = self.series('throughput', self.manager, start=self.today, end=self.today)
+        self.assertEqual(response.data[0], {'date': self.today, 'opened': 4, 'closed': 2, 'reopened': 0})
+
+    def test_employee_sees_own_series(self):
+        response = self.series('burndown', self.employee, start=self.today, end=self.today)
+        self.assertEqual(response.data[0]['open'] + response.data[0]['completed'], 2)
+        response = self.series('burndown', self.employee, assigned_to=self.other.id)
+        self.assertEqual(response.status_code, 403)
+        response = self.series('throughput', self.manager, assigned_to=self.other.id)
+        self.assertEqual(len(response.data), 30)
+        self.assertEqual(response.data[-1]['opened'], 2)
+
+    def test_series_carries_totals_over_quiet_days(self):
+        day = date(2020, 1, 6)
+        TaskDailyRollup.objects.apply_changes([(None, TaskState('created', None, None, 0))] * 2, day=day)
+        TaskDailyRollup.objects.apply_changes(
+            [(TaskState('created', None, None, 0), TaskState('completed', None, None, 100))], day=day + timedelta(days=2)
+        )
+        rows = list(TaskDailyRollup.objects.series(None, day + timedelta(days=1), day + timedelta(days=3)))
+        self.assertEqual(
+            [(row['created'], row['completed'], row['opened'], row['closed']) for row in rows],
+            [(2, 0, 0, 0), (1, 1, 0, 1), (1, 1, 0, 0)]
+        )
+
+    def test_rejects_bad_ranges(self):
+        self.assertEqual(self.series('burndown', self.manager, start='2024-02-01', end='2024-01-01').status_code, 400)
+        self.assertEqual(self.series('burndown', self.manager, start='2020-01-01', end='2024-01-01').status_code, 400)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.client.force_authenticate(self.manager)
+        self.client.post('/api/tasks/tasks/bulk_assign/', {'ids': [self.task.id], 'assigned_to': self.other.id}, format='json')
+        self.client.post('/api/tasks/tasks/bulk_status/', {'ids': [self.task.id], 'status': 'completed'}, format='json')
+        self.client.post('/api/tasks/tasks/bulk_status/', {'ids': [self.task.id], 'status': 'ongoing'}, format='json')
+        Task.objects.filter(status='assigned').first().delete()
+
+        fields = ['day', 'user_id', 'opened', 'closed', 'reopened', 'created', 'assigned', 'ongoing', 'completed']
+        incremental = sorted(TaskDailyRollup.objects.values_list(*fields), key=str)
+        TaskDailyRollup.objects.rebuild()
+        self.assertEqual(sorted(TaskDailyRollup.objects.values_list(*fields), key=str), incremental)
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class TaskDeltaSyncTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1')
+        self.other = User.objects.create_user('other', password='secret-pass-1')
+        for i, assignee in enumerate([self.employee, self.other] * 2 + [self.employee]):
+            Task.objects.create(title=f'Task {i}', created_by=self.manager, assigned_to=assignee)
+
+    def sync(self, user, query=''):
+        self.client.force_authenticate(user)
+        return self.client.get(f'/api/tasks/tasks/changes/{query}')
+
+    def test_changes_and_tombstones_since_a_cursor(self):
+        cursors = {user: self.sync(user).data['cursor'] for user in (self.manager, self.employee)}
+        updated, reassigned, deleted = Task.objects.filter(assigned_to=self.employee).order_by('id')
+        updated.title = 'Renamed'
+        updated.save()
+        reassigned.assigned_to = self.other
+        reassigned.save()
+        deleted_id = deleted.id
+        deleted.delete()
+        created = Task.objects.create(title='Not yours', created_by=self.manager, assigned_to=self.other)
+
+        response = self.assertQueryBudget(
+            3, 'get', f'/api/tasks/tasks/changes/?since={cursors[self.employee]}', self.employee
+        )
+        self.assertEqual([(row['id'], row['title']) for row in response.data['changes']], [(updated.id, 'Renamed')])
+        self.assertEqual(response.data['changes'][0], TaskSerializer(updated).data)
+        self.assertEqual(response.data['deleted'], [reassigned.id, deleted_id])
+        self.assertFalse(response.data['more'])
+        response = self.sync(self.employee, f"?since={response.data['cursor']}")
+        self.assertEqual((response.data['changes'], response.data['deleted']), ([], []))
+
+        response = self.sync(self.manager, f'?since={cursors[self.manager]}&fields=id,assigned_to')
+        self.assertEqual(response.data['changes'], [
+            {'id': updated.id, 'assigned_to': self.employee.id},
+            {'id': reassigned.id, 'assigned_to': self.other.id},
+            {'id': created.id, 'assigned_to': self.other.id},
+        ])
+        self.assertEqual(response.data['deleted'], [deleted_id])
+
+    def test_cursor_pages_and_waits_for_recent_entries(self):
+        with self.settings(SYNC_PAGE_SIZE=3):
+            first = self.sync(self.manager, '?since=0').data
+            self.assertEqual(len(first['changes']), 3)
+            self.assertTrue(first['more'])
+            rest = self.sync(self.manager, f"?since={first['cursor']}").data
+            self.assertEqual(len(rest['changes']), 2)
+            self.assertFalse(rest['more'])
+        with self.settings(SYNC_SETTLE_SECONDS=60):
+            # Entries this new may still be joined by earlier ids committing late.
+            response = self.sync(self.manager, '?since=0').data
+            self.assertEqual((len(response['changes']), response['cursor']), (5, 0))
+            self.assertEqual(self.sync(self.manager).data['cursor'], 0)
+
+    def test_pruned_cursors_are_gone(self):
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(days=40))
+        newest = ChangeLogEntry.objects.order_by('-id').first().id
+        call_command('prune_change_log', days=30, stdout=io.StringIO())
+        self.assertEqual(list(ChangeLogEntry.objects.values_list('id', flat=True)), [newest])
+
+        self.assertEqual(self.sync(self.manager, '?since=0').status_code, 410)
+        self.assertEqual(self.sync(self.manager, f'?since={newest - 1}').status_code, 200)
+        self.assertEqual(self.sync(self.manager, '?since=abc').status_code, 400)
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class TaskArchiveTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        employee = User.objects.create_user('employee', password='secret-pass-1')
+        for title, status in [('Old', 'completed'), ('Older', 'completed'), ('Stalled', 'ongoing'), ('Done', 'completed')]:
+            task = Task.objects.create(title=title, status=status, created_by=self.manager, assigned_to=employee)
+            TaskReport.objects.create(task=task, reported_by=employee, content=f'On {task.title}')
+        # Finished long ago, and open but just as quiet.
+        Task.objects.exclude(title='Done').update(updated_at=timezone.now() - timedelta(days=100))
+        self.old = list(Task.objects.filter(title__startswith='Old').order_by('id'))
+
+    def get(self, url, user=None):
+        self.client.force_authenticate(user or self.manager)
+        return self.client.get(url)
+
+    def test_archived_rows_leave_default_reads(self):
+        cursor = self.get('/api/tasks/tasks/changes/').data['cursor']
+        out = io.StringIO()
+        call_command('archive_tasks', days=90, batch_size=1, stdout=out)
+        self.assertIn('Archived 2 task(s) and 2 report(s)', out.getvalue())
+        old_ids = {task.id for task in self.old}
+
+        listed = {row['id'] for row in self.get('/api/tasks/tasks/?page_size=50').data['results']}
+        self.assertEqual(len(listed), 2)
+        self.assertFalse(listed & old_ids)
+        everything = self.get('/api/tasks/tasks/?page_size=50&include_archived=1').data['results']
+        self.assertEqual({row['id'] for row in everything if row['archived_at']}, old_ids)
+
+        self.assertEqual(self.get(f'/api/tasks/tasks/{self.old[0].id}/').status_code, 404)
+        self.assertEqual(self.get(f'/api/tasks/tasks/{self.old[0].id}/?include_archived=1').status_code, 200)
+        self.client.force_authenticate(self.manager)
+        response = self.client.patch(
+            f'/api/tasks/tasks/{self.old[0].id}/update_status/?include_archived=1', {'status': 'ongoing'}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+        reports = self.get('/api/reports/reports/manager_dashboard/?page_size=50').data['results']
+        self.assertFalse({row['task'] for row in reports} & old_ids)
+        reports = self.get('/api/reports/reports/manager_dashboard/?page_size=50&include_archived=1').data['results']
+        self.assertEqual(len(reports), 4)
+        response = self.client.post('/api/reports/reports/', {'task': self.old[0].id, 'content': 'Late'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        # Still counted, and gone from synced lists.
+        self.assertEqual(self.get('/api/tasks/tasks/dashboard_stats/').data['total'], 4)
+        self.assertCountersMatch()
+        self.assertEqual(set(self.get(f'/api/tasks/tasks/changes/?since={cursor}').data['deleted']), old_ids)
+
+    def test_recent_and_open_tasks_stay(self):
+        Task.objects.filter(pk=self.old[0].pk).update(updated_at=timezone.now())
+        call_command('archive_tasks', days=90, stdout=io.StringIO())
+        self.assertEqual(list(Task.objects.filter(archived_at__isnull=False)), [self.old[1]])
+
+
+@override_settings(DATABASE_REPLICAS=['replica0', 'replica1'], REPLICA_MAX_LAG_SECONDS=5)
+class ReplicaPoolTests(SimpleTestCase):
+    def test_round_robin_over_healthy_replicas(self):
+        pool = ReplicaPool()
+        with mock.patch('tasks_tracker.db.replica_lag', return_value=0):
+            pool.check()
+            self.assertEqual([pool.choose() for _ in range(4)], ['replica0', 'replica1', 'replica0', 'replica1'])
+
+    def test_lagging_or_unreachable_replicas_are_left_out(self):
+        pool = ReplicaPool()
+        lags = {'replica0': 30.0, 'replica1': 0.5}
+        with mock.patch('tasks_tracker.db.replica_lag', side_effect=lags.get), self.assertLogs('tasks_tracker.db'):
+            pool.check()
+            self.assertEqual({pool.choose() for _ in range(4)}, {'replica1'})
+
+        with mock.patch('tasks_tracker.db.replica_lag', side_effect=ConnectionError), self.assertLogs('tasks_tracker.db'):
+            pool.check()
+            self.assertIsNone(pool.choose())
+
+    def test_checks_run_in_the_background_one_at_a_time(self):
+        pool = ReplicaPool()
+        release = threading.Event()
+
+        def slow_lag(alias):
+            release.wait(5)
+            return 0
+
+        with mock.patch('tasks_tracker.db.replica_lag', side_effect=slow_lag) as lag:
+            # Requests don't wait for the check; they read from the primary until it is done.
+            self.assertEqual([pool.choose() for _ in range(5)], [None] * 5)
+            release.set()
+            pool.probe.join()
+            self.assertEqual(lag.call_count, 2)
+            self.assertIn(pool.choose(), {'replica0', 'replica1'})
+
+    @override_settings(REPLICA_CHECK_INTERVAL=60)
+    def test_checks_are_rate_limited(self):
+        pool = ReplicaPool()
+        with mock.patch('tasks_tracker.db.replica_lag', return_value=0) as lag:
+            pool.choose()
+            pool.probe.join()
+            for _ in range(5):
+                pool.choose()
+        self.assertEqual(lag.call_count, 2)
+
+
+@skipUnless(len(settings.DATABASE_REPLICAS) >= 2, 'needs two replica aliases, e.g. DB_REPLICA_HOSTS=localhost,localhost')
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        replica_pool.reset()
+        replica_pool.check()
+        self.client = APIClient()
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1')
+        self.task = Task.objects.create(title='Write report', created_by=self.manager, assigned_to=self.employee)
+
+    def read_aliases(self, method, url, user, **kwargs):
+        self.client.force_authenticate(user)
+        contexts = {alias: CaptureQueriesContext(connections[alias]) for alias in ['default', *settings.DATABASE_REPLICAS]}
+        for context in contexts.values():
+            context.__enter__()
+        try:
+            response = getattr(self.client, method)(url, **kwargs)
+        finally:
+            for context in contexts.values():
+                context.__exit__(None, None, None)
+        self.assertLess(response.status_code, 400)
+        return {alias for alias, context in contexts.items() if context.captured_queries}
+
+    def test_reads_go_to_replicas_until_the_user_writes(self):
+        self.assertNotIn('default', self.read_aliases('get', '/api/tasks/tasks/', self.manager))
+        self.assertNotIn('default', self.read_aliases('get', '/api/auth/employees/', self.manager))
+
+        self.read_aliases('patch', f'/api/tasks/tasks/{self.task.id}/update_status/', self.employee, data={'status': 'ongoing'})
+
+        # The writer reads from the primary for a while; everyone else stays on replicas.
+        self.assertEqual(self.read_aliases('get', f'/api/tasks/tasks/{self.task.id}/', self.employee), {'default'})
+        self.assertNotIn('default', self.read_aliases('get', '/api/reports/reports/', self.manager))
+
+    def test_lagging_replicas_fall_back_to_primary(self):
+        with mock.patch('tasks_tracker.db.replica_lag', return_value=60), self.assertLogs('tasks_tracker.db'):
+            replica_pool.check()
+            self.assertEqual(self.read_aliases('get', '/api/tasks/tasks/', self.manager), {'default'})
+
+
+class RequestTimingTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM')
+        Task.objects.create(title='Write report', created_by=self.manager)
+
+    @override_settings(METRICS_TOKEN='scrape')
+    def test_server_timing_and_metrics(self):
+        self.client.force_authenticate(self.manager)
+        response = self.client.get('/api/tasks/tasks/dashboard_stats/')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", serializer;dur=[\d.]+, total;dur=[\d.]+$')
+
+        response = self.client.get('/api/tasks/tasks/')
+        serializer_ms = float(response['Server-Timing'].split('serializer;dur=')[1].split(',')[0])
+        self.assertGreater(serializer_ms, 0)
+
+        body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape').content.decode()
+        self.assertIn('tasks_tracker_request_duration_seconds_count{view="TaskViewSet.dashboard_stats",method="GET"}', body)
+        self.assertIn('tasks_tracker_request_queries_bucket{view="TaskViewSet.list",method="GET",le="+Inf"}', body)
+
+    def test_histogram_sums_keep_full_precision(self):
+        histogram = Histogram('test_request_seconds', 'Test.', ['view'])
+        self.addCleanup(registry.metrics.remove, histogram)
+        histogram.observe(1234567.0, view='a')
+        histogram.observe(0.125, view='a')
+        self.assertIn('test_request_seconds_sum{view="a"} 1234567.125\n', histogram.render())
+
+    async def test_async_requests_are_timed(self):
+        token = AccessToken.for_user(self.manager)
+        response = await self.async_client.get('/api/tasks/tasks/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        queries = int(response['Server-Timing'].split('desc="')[1].split(' ')[0])
+        self.assertGreater(queries, 0)
+
+    def test_metrics_need_a_token_outside_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+        with override_settings(METRICS_TOKEN='scrape'):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape').status_code, 200)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_request_log(self):
+        self.client.force_authenticate(self.manager)
+        with self.assertLogs('tasks_tracker.slow_requests', 'WARNING') as logs:
+            self.client.get('/api/reports/reports/manager_dashboard/')
+        self.assertIn('(TaskReportViewSet.manager_dashboard)', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    @override_settings(REQUEST_TIMING=False)
+    def test_can_be_disabled(self):
+        self.client.force_authenticate(self.manager)
+        self.assertNotIn('Server-Timing', self.client.get('/api/tasks/tasks/dashboard_stats/'))
+
+
+class TaskFastPathTests(APITestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', password='secret-pass-1', role='GM', first_name='Grace')
+        self.employee = User.objects.create_user('employee', password='secret-pass-1', first_name='Ada')
+        solo = User.objects.create_user('solo', password='secret-pass-1', last_name='Solo')
+        for title, status, assignee in [('Draft', 'created', self.employee), ('Review', 'ongoing', self.employee),
+                                        ('Ship', 'completed', solo)]:
+            Task.objects.create(title=title, status=status, description='x' * 50, created_by=self.manager, assigned_to=assignee)
+        Task.objects.create(
+            title='Unassigned   café \U0001f680', description='"quoted" \\ <b>', created_by=self.manager,
+            due_date=timezone.now().replace(microsecond=123456),
+        )
+
+    def expected(self, response, queryset):
+        data = TaskSerializer(queryset.select_related('created_by', 'assigned_to')[:100], many=True).data
+        return JSONRenderer().render(
+            {'next': response.data['next'], 'previous': response.data['previous'], 'results': data}
+        )
+
+    def test_list_output_is_byte_identical(self):
+        ordered = Task.objects.order_by('-created_at', '-id')
+        self.client.force_authenticate(self.manager)
+        response = self.client.get('/api/tasks/tasks/?page_size=100')
+        self.assertEqual(response.content, self.expected(response, ordered))
+        self.assertNotIn('assigned_to_name', response.data['results'][0])
+
+        self.client.force_authenticate(self.employee)
+        response = self.client.get('/api/tasks/tasks/my_tasks/?page_size=100')
+        self.assertEqual(response.content, self.expected(response, ordered.filter(assigned_to=self.employee)))
+
+    def test_renderer_matches_stdlib_json(self):
+        data = {
+            'when': timezone.now().replace(microsecond=123456),
+            'day': date(2024, 2, 29),
+            'amount': Decimal('12.50'),
+            'id': uuid.UUID(int=7),
+            'error': ErrorDetail('Invalid   input', code='invalid'),
+            'lazy': gettext_lazy('Not found.'),
+            1: ['é\u2028', None, True, 1.5],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        # orjson refuses integers past 64 bits; those go through the stdlib renderer.
+        self.assertEqual(ORJSONRenderer().render([2 ** 70]), JSONRenderer().render([2 ** 70]))
+        self.assertEqual(
+            ORJSONRenderer().render(data, 'application/json; indent=2'),
+            JSONRenderer().render(data, 'application/json; indent=2'),
+        )
+
+    def test_parser(self):
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"a": [1, "é"]}'.encode())), {'a': [1, 'é']})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"a": NaN}'))
+
+    def test_sparse_fieldsets_narrow_the_query(self):
+        self.client.force_authenticate(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/tasks/?fields=title,id,status')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title', 'status'])
+        select = next(q['sql'] for q in queries.captured_queries if 'FROM "tasks_task"' in q['sql'])
+        self.assertNotIn('JOIN', select)
+        self.assertNotIn('"description"', select)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/tasks/?omit=description,assigned_to_name')
+        row = response.data['results'][0]
+        self.assertNotIn('description', row)
+        self.assertIn('created_by_name', row)
+        select = next(q['sql'] for q in queries.captured_queries if 'FROM "tasks_task"' in q['sql'])
+        self.assertEqual(select.count('JOIN'), 1)
+
+        # Paging still works without the ordering columns in the output.
+        response = self.client.get('/api/tasks/tasks/?fields=title&page_size=2')
+        second = self.client.get(response.data['next'])
+        self.assertEqual(len(second.data['results']), 2)
+
+        task = Task.objects.first()
+        response = self.client.get(f'/api/tasks/tasks/{task.id}/?fields=id,status')
+        self.assertEqual(response.data, {'id': task.id, 'status': task.status})
+
+        response = self.client.get('/api/tasks/tasks/?fields=title,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', str(response.data['fields']))
+
+    def test_compact_mode_uses_stored_snippets(self):
+        task = Task.objects.create(title='Long one', description='word ' * 100, created_by=self.manager)
+        self.client.force_authenticate(self.manager)
+        response = self.client.get('/api/tasks/tasks/?compact=1&fields=id,description')
+        row = response.data['results'][0]
+        self.assertEqual(list(row), ['id', 'description_snippet'])
+        self.assertEqual(len(row['description_snippet']), 160)
+        self.assertTrue(row['description_snippet'].endswith('…'))
+
+        Task.objects.filter(pk=task.pk).update(description='Short now')
+        response = self.client.get(f'/api/tasks/tasks/{task.id}/?compact=1')
+        self.assertEqual(response.data['description_snippet'], 'Short now')
@@ -4,27 +4,74 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import serializers
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from .models import Task
-from .serializers import TaskSerializer
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Task, TaskCounter, TaskDailyRollup
+from .serializers import TaskSerializer, TaskIdsSerializer, ProgressRangeSerializer
 from .permissions import IsManagerOrReadOnly
+from .write_behind import completion_buffer
+from tasks_tracker.archive import ArchiveMixin
+from tasks_tracker.conditional import ConditionalReadMixin
+from tasks_tracker.db import ReplicaReadMixin
+from tasks_tracker.export import ExportMixin, full_name
+from tasks_tracker.fastpath import ValuesListMixin
+from tasks_tracker.search import FullTextSearchFilter
+from tasks_tracker.sync import DeltaSyncMixin
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ReplicaReadMixin, ConditionalReadMixin, ValuesListMixin, DeltaSyncMixin, ExportMixin, ArchiveMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsManagerOrReadOnly]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['status', 'assigned_to', 'created_by']
+    export_fields = TaskSerializer.Meta.fields
+    export_filename = 'tasks'
+    change_log_kind = 'task'
     
     def get_queryset(self):
         user = self.request.user
+        # The serializer reads both user names, so join them in up front.
+        queryset = self.visible(Task.objects.select_related('created_by', 'assigned_to'))
         if user.is_manager:
-            return Task.objects.all()
+            return queryset
         else:
-            return Task.objects.filter(
-                Q(assigned_to=user) | Q(created_by=user)
-            )
+            # Assigned to or created by them, as a union of ids: one search of each
+            # (assignee/creator, -created_at, -id) index and a sort of this user's rows,
+            # where the OR would walk the whole newest-first index filtering rows.
+            base = self.visible(Task.objects.order_by())
+            mine = base.filter(assigned_to=user).values('pk').union(base.filter(created_by=user).values('pk'))
+            return queryset.filter(pk__in=mine)
     
+    def get_etag_scopes(self):
+        user = self.request.user
+        return ['tasks' if user.is_manager else f'tasks:user:{user.id}', 'users']
+
+    def get_etag(self, request):
+        etag = super().get_etag(request)
+        if settings.COMPLETION_WRITE_BEHIND:
+            # Buffered completion values change responses before ChangeVersion does.
+            etag = f'{etag[:-1]}.{completion_buffer.generation}"'
+        return etag
+
+    def prepare_rows(self, rows):
+        if settings.COMPLETION_WRITE_BEHIND:
+            return completion_buffer.overlay_rows(rows)
+        return rows
+
+    def get_export_rows(self, queryset):
+        values = queryset.values(
+            'id', 'title', 'description', 'status', 'completion_percentage', 'created_by', 'assigned_to',
+            'created_by__first_name', 'created_by__last_name', 'assigned_to__first_name', 'assigned_to__last_name',
+            'created_at', 'updated_at', 'due_date', 'version', 'archived_at',
+        )
+        for row in values.iterator(chunk_size=self.export_chunk_size):
+            row['created_by_name'] = full_name(row.pop('created_by__first_name'), row.pop('created_by__last_name'))
+            row['assigned_to_name'] = full_name(row.pop('assigned_to__first_name'), row.pop('assigned_to__last_name'))
+            for field in ('created_at', 'updated_at', 'due_date', 'archived_at'):
+                row[field] = self.format_datetime(row[field])
+            yield row
+
     def perform_create(self, serializer):
         if not self.request.user.is_manager:
             raise serializers.ValidationError("Only managers can create tasks.")
@@ -47,10 +94,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        task.status = new_status
-        task.save()
-        serializer = self.get_serializer(task)
-        return Response(serializer.data)
+        return self._update_if_current(task, status=new_status)
     
     @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated])
     def update_completion_percentage(self, request, pk=None):
@@ -82,38 +126,210 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        task.completion_percentage = completion_percentage
-        
-        # Auto-update status based on completion percentage
-        if completion_percentage == 100 and task.status != 'completed':
-            task.status = 'completed'
-        elif completion_percentage > 0 and task.status in ['created', 'assigned']:
-            task.status = 'ongoing'
-        
-        task.save()
-        serializer = self.get_serializer(task)
-        return Response(serializer.data)
+        if settings.COMPLETION_WRITE_BEHIND:
+            return self._buffer_completion(task, completion_percentage)
+
+        # Auto-update status based on completion percentage, in the same UPDATE
+        return self._update_if_current(
+            task,
+            completion_percentage=completion_percentage,
+            status=Task.status_for_progress(completion_percentage),
+        )
+
+    def update(self, request, *args, **kwargs):
+        # PUT and PATCH write only the fields sent, in one conditional UPDATE.
+        partial = kwargs.pop('partial', False)
+        task = self.get_object()
+        serializer = self.get_serializer(task, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        return self._update_if_current(task, **serializer.validated_data)
+
+    def _update_if_current(self, task, **values):
+        """
+        Apply ``values`` unless the task changed since the ``version`` the client
+        sent (or, without one, since it was read here); 409 with the current task otherwise.
+        """
+        if Task.objects.update_if_current(task, self._requested_version(), **values) is None:
+            current = self.get_queryset().filter(pk=task.pk).first()
+            if current is None:
+                return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+            return self._conflict(current)
+        return Response(self.get_serializer(task).data)
+
+    def _buffer_completion(self, task, completion_percentage):
+        """Accept the value into the write-behind buffer (tasks/write_behind.py) and answer with the task as it will be."""
+        version = self._requested_version()
+        if version is not None and version != completion_buffer.version(task):
+            return self._conflict(completion_buffer.overlay(task))
+        completion_buffer.add(task.pk, completion_percentage, task.version)
+        return Response(self.get_serializer(completion_buffer.overlay(task)).data, status=status.HTTP_202_ACCEPTED)
+
+    def _requested_version(self):
+        version = self.request.data.get('version')
+        if version is None:
+            return None
+        try:
+            return int(version)
+        except (ValueError, TypeError):
+            raise serializers.ValidationError({'version': 'Version must be a valid number'})
+
+    def _conflict(self, current):
+        return Response(
+            {'error': 'The task was changed by someone else; review it and retry', 'task': self.get_serializer(current).data},
+            status=status.HTTP_409_CONFLICT
+        )
     
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Create many tasks in one transaction; nothing is saved unless every row is valid"""
+        if not isinstance(request.data, list) or not 0 < len(request.data) <= 500:
+            return Response(
+                {'error': 'Expected a list of 1 to 500 tasks'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response({'results': [
+                {'index': index, 'result': 'error', 'errors': errors} if errors
+                else {'index': index, 'result': 'valid'}
+                for index, errors in enumerate(serializer.errors)
+            ]}, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = Task.objects.bulk_create(
+            Task(created_by=request.user, **attrs) for attrs in serializer.validated_data
+        )
+        return Response({'results': [
+            {'index': index, 'id': task.id, 'result': 'created', 'task': self.get_serializer(task).data}
+            for index, task in enumerate(tasks)
+        ]}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def bulk_assign(self, request):
+        """Assign the tasks in ``ids`` to ``assigned_to`` (null to unassign)"""
+        if 'assigned_to' not in request.data:
+            return Response({'error': 'assigned_to is required'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._bulk_update(request, {'assigned_to': request.data.get('assigned_to')})
+
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """Set the status of the tasks in ``ids``"""
+        if not request.data.get('status'):
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._bulk_update(request, {'status': request.data.get('status')})
+
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        """Delete the tasks in ``ids``"""
+        ids = self._bulk_ids(request)
+        with transaction.atomic():
+            tasks = self.get_queryset().select_for_update(of=('self',)).filter(pk__in=ids).in_bulk()
+            missing = [pk for pk in ids if pk not in tasks]
+            if missing:
+                return self._bulk_not_found(ids, missing)
+            Task.objects.filter(pk__in=ids).delete()
+        return Response({'results': [{'id': pk, 'result': 'deleted'} for pk in ids]})
+
+    def _bulk_ids(self, request):
+        id_serializer = TaskIdsSerializer(data=request.data)
+        id_serializer.is_valid(raise_exception=True)
+        return id_serializer.validated_data['ids']
+
+    def _bulk_not_found(self, ids, missing):
+        return Response({'results': [
+            {'id': pk, 'result': 'error', 'errors': {'detail': 'Not found.'}} if pk in missing
+            else {'id': pk, 'result': 'valid'}
+            for pk in ids
+        ]}, status=status.HTTP_400_BAD_REQUEST)
+
+    def _bulk_update(self, request, data):
+        ids = self._bulk_ids(request)
+
+        # Field rules (choices, validate_assigned_to, ...) are the same for
+        # every row, so validate the new values once.
+        serializer = self.get_serializer(data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        changes = serializer.validated_data
+
+        with transaction.atomic():
+            tasks = self.get_queryset().select_for_update(of=('self',)).filter(pk__in=ids).in_bulk()
+            missing = [pk for pk in ids if pk not in tasks]
+            if missing:
+                return self._bulk_not_found(ids, missing)
+
+            now = timezone.now()
+            for task in tasks.values():
+                for field, value in changes.items():
+                    setattr(task, field, value)
+                task.updated_at = now
+            Task.objects.bulk_update(tasks.values(), [*changes, 'updated_at'])
+
+        return Response({'results': [
+            {'id': pk, 'result': 'updated', 'task': self.get_serializer(tasks[pk]).data}
+            for pk in ids
+        ]})
+
     @action(detail=False, methods=['get'])
     def my_tasks(self, request):
-        tasks = Task.objects.filter(assigned_to=request.user)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        tasks = self.visible(Task.objects.filter(assigned_to=request.user))
+        return self.list_response(tasks)
     
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
+        return self.conditional_response(request, self._dashboard_stats)
+
+    def _dashboard_stats(self, request):
         user = request.user
-        queryset = self.get_queryset()
-        
-        stats = {
-            'total': queryset.count(),
-            'created': queryset.filter(status='created').count(),
-            'assigned': queryset.filter(status='assigned').count(),
-            'ongoing': queryset.filter(status='ongoing').count(),
-            'completed': queryset.filter(status='completed').count(),
-        }
-        
+        # One row read from the maintained counters instead of counting tasks.
+        counter = TaskCounter.objects.for_user(None if user.is_manager else user)
+        stats = counter.as_stats()
+
         if not user.is_manager:
-            stats['my_tasks'] = queryset.filter(assigned_to=user).count()
-        
+            stats['my_tasks'] = counter.my_tasks
+
         return Response(stats)
+
+    @action(detail=False, methods=['get'])
+    def burndown(self, request):
+        """Open and completed task totals at the end of each day, from the daily rollups."""
+        rows, error = self._progress_series(request)
+        if error:
+            return error
+        return Response([
+            {
+                'date': row['day'],
+                'open': row['created'] + row['assigned'] + row['ongoing'],
+                'completed': row['completed'],
+                **{status: row[status] for status in ('created', 'assigned', 'ongoing')},
+            }
+            for row in rows
+        ])
+
+    @action(detail=False, methods=['get'])
+    def throughput(self, request):
+        """Tasks opened, completed and reopened on each day, from the daily rollups."""
+        rows, error = self._progress_series(request)
+        if error:
+            return error
+        return Response([
+            {'date': row['day'], 'opened': row['opened'], 'closed': row['closed'], 'reopened': row['reopened']}
+            for row in rows
+        ])
+
+    def _progress_series(self, request):
+        params = ProgressRangeSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        user = request.user
+        assigned_to = params.validated_data.get('assigned_to')
+        # Managers see everything or one assignee; employees only their own tasks.
+        if not user.is_manager:
+            if assigned_to not in (None, user.pk):
+                return None, Response(
+                    {'error': 'You can only view your own progress'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            assigned_to = user.pk
+        rows = TaskDailyRollup.objects.series(
+            assigned_to, params.validated_data['start'], params.validated_data['end']
+        )
+        return list(rows), None
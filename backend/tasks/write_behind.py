@@ -0,0 +1,161 @@
+"""
+Coalescing write-behind for completion percentage updates.
+
+With ``COMPLETION_WRITE_BEHIND`` on, ``update_completion_percentage`` checks
+the request as usual, then records the value in ``completion_buffer`` and
+answers ``202`` at once with the task as it will be stored. A background thread
+writes the latest value per task every ``COMPLETION_FLUSH_INTERVAL_MS`` with one
+``bulk_update`` (so counters, rollups and the change log follow as for any
+write); the positions a slider passed through in between never reach the
+database. The auto-status rule is applied once, to the last value. A value is
+only written if the task is still at the version it was accepted against (or
+one this buffer's own previous flush produced from it); otherwise someone else
+wrote the task in between and the buffered value is dropped with a warning, as
+a conditional update would have refused it.
+
+Reads served by this process see pending values (``overlay_row()``), so a GET
+right after the PATCH shows it. The buffer is per process: with several server
+processes, other ones show the stored value until the flush, a few hundred
+milliseconds later. Pending values are flushed at interpreter exit, which
+gunicorn and uvicorn reach on SIGTERM; a killed process loses them.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+
+class CompletionBuffer:
+    def __init__(self, autoflush=True):
+        self.autoflush = autoflush
+        self.lock = threading.Lock()
+        # task id -> (completion percentage, version of the row it was accepted against)
+        self.pending = {}
+        # Taken out of ``pending`` by a flush that has not committed yet; still overlaid.
+        self.flushing = {}
+        # task id -> (version before, version after) for the tasks the last flush wrote.
+        self.written = {}
+        # Changes with every accepted value and flush; part of the task ETags.
+        self.generation = 0
+        self.thread = None
+        self.stopping = threading.Event()
+
+    def add(self, task_id, percentage, version):
+        """Buffer ``percentage`` for the task, whose stored row is at ``version``."""
+        with self.lock:
+            self.pending[task_id] = (percentage, version)
+            self.generation += 1
+            if self.autoflush and self.thread is None:
+                self.start()
+
+    def entry(self, task_id):
+        with self.lock:
+            return self.pending.get(task_id) or self.flushing.get(task_id)
+
+    def overlay_row(self, row):
+        """Apply the pending value for the task to a values() row (or an instance's __dict__)."""
+        entry = self.entry(row['id'])
+        if entry is None:
+            return row
+        percentage, base_version = entry
+        if 'status' in row:
+            row['status'] = Task.progress_status(row['status'], percentage)
+        if 'completion_percentage' in row:
+            row['completion_percentage'] = percentage
+        if 'version' in row and self.is_current(row['id'], base_version, row['version']):
+            # The flush will bump it once.
+            row['version'] += 1
+        return row
+
+    def version(self, task):
+        """The version reads show for ``task``, read from the database at ``task.version``."""
+        entry = self.entry(task.pk)
+        return task.version + 1 if entry and self.is_current(task.pk, entry[1], task.version) else task.version
+
+    def overlay_rows(self, rows):
+        if self.pending or self.flushing:
+            for row in rows:
+                self.overlay_row(row)
+        return rows
+
+    def overlay(self, task):
+        self.overlay_row(task.__dict__)
+        return task
+
+    def flush(self):
+        """Write the pending values; returns how many tasks were updated."""
+        with self.lock:
+            batch, self.pending = self.pending, {}
+            self.flushing.update(batch)
+        if not batch:
+            return 0
+        try:
+            now = timezone.now()
+            with transaction.atomic():
+                tasks = Task.objects.select_for_update().filter(pk__in=batch).order_by('pk').in_bulk()
+                stale = [
+                    task_id for task_id, task in tasks.items()
+                    if not self.is_current(task_id, batch[task_id][1], task.version)
+                ]
+                if stale:
+                    logger.warning('Dropped buffered completion percentages for tasks changed since: %s', stale)
+                    for task_id in stale:
+                        del tasks[task_id]
+                base_versions = {task_id: task.version for task_id, task in tasks.items()}
+                for task_id, task in tasks.items():
+                    percentage = batch[task_id][0]
+                    task.status = Task.progress_status(task.status, percentage)
+                    task.completion_percentage = percentage
+                    task.updated_at = now
+                if tasks:
+                    Task.objects.bulk_update(tasks.values(), ['completion_percentage', 'status', 'updated_at'])
+                written = {task_id: (base_versions[task_id], task.version) for task_id, task in tasks.items()}
+        except Exception:
+            with self.lock:
+                # Keep values for the next flush unless newer ones arrived meanwhile.
+                for task_id, entry in batch.items():
+                    self.pending.setdefault(task_id, entry)
+            raise
+        else:
+            self.written = written
+        finally:
+            with self.lock:
+                for task_id in batch:
+                    self.flushing.pop(task_id, None)
+                self.generation += 1
+        return len(tasks)
+
+    def is_current(self, task_id, base_version, version):
+        """Whether a task stored at ``version`` is unchanged, but for our own flush, since a value was accepted at ``base_version``."""
+        return version == base_version or self.written.get(task_id) == (base_version, version)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='completion-write-behind', daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def run(self):
+        interval = settings.COMPLETION_FLUSH_INTERVAL_MS / 1000
+        while not self.stopping.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing buffered completion percentages failed; retrying')
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        """Stop the flush thread and write whatever is pending."""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+
+
+completion_buffer = CompletionBuffer()
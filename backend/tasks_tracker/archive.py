@@ -0,0 +1,81 @@
+"""
+Archival of completed tasks and their reports.
+
+``archive_tasks`` (run it from cron, like ``prune_change_log``) stamps
+``archived_at`` on tasks completed and untouched for
+``TASK_ARCHIVE_AFTER_DAYS`` and on their reports, a batch per transaction.
+The list and lookup indexes are partial on ``archived_at IS NULL``, so
+they cover only the working set, and the viewsets filter on it. Everything
+built from those indexes then stays the size of the active work, however much
+history piles up. ``?include_archived=1`` reads archived rows too, without
+those indexes, so such reads are slower. Archived rows cannot be written
+through the API. They still count in dashboard stats and in the burndown
+history.
+"""
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+
+from reports.models import TaskReport
+from tasks.models import ChangeLogEntry, ChangeVersion, Task
+
+
+class ArchiveMixin:
+    """``visible()`` leaves archived rows out of a queryset unless the read asks for them."""
+    include_archived_param = 'include_archived'
+
+    def include_archived(self):
+        return (
+            self.request.method in SAFE_METHODS
+            and self.request.query_params.get(self.include_archived_param, '').lower() in ('1', 'true', 'yes')
+        )
+
+    def visible(self, queryset):
+        if self.include_archived():
+            return queryset
+        return queryset.filter(archived_at__isnull=True)
+
+
+def archivable_tasks(before):
+    return Task.objects.filter(status='completed', archived_at__isnull=True, updated_at__lt=before)
+
+
+def archive_batch(before, batch_size):
+    """Archive up to ``batch_size`` tasks completed before ``before``, with their reports; returns (tasks, reports)."""
+    now = timezone.now()
+    with transaction.atomic():
+        # Rows locked by a write in progress are left for the next run.
+        tasks = list(
+            archivable_tasks(before).select_for_update(skip_locked=True).order_by('updated_at', 'id')
+            .values_list('id', 'assigned_to_id', 'created_by_id')[:batch_size]
+        )
+        if not tasks:
+            return 0, 0
+        ids = [task_id for task_id, _, _ in tasks]
+        Task.objects.filter(pk__in=ids).update(archived_at=now)
+        reports = TaskReport.objects.filter(task_id__in=ids, archived_at__isnull=True)
+        report_rows = list(reports.values_list('id', 'reported_by_id'))
+        reports.update(archived_at=now)
+
+        # Counters and rollups are unchanged: the tasks still exist. Lists and
+        # delta sync see them leave.
+        ChangeLogEntry.objects.record('task', [
+            (task_id, {None, assigned_to_id, created_by_id}) for task_id, assigned_to_id, created_by_id in tasks
+        ])
+        ChangeLogEntry.objects.record('report', [(report_id, {None, user_id}) for report_id, user_id in report_rows])
+        users = {user_id for _, *user_ids in tasks for user_id in user_ids if user_id}
+        ChangeVersion.objects.bump_on_commit(
+            'tasks', 'reports',
+            *(f'tasks:user:{user_id}' for user_id in users),
+            *{f'reports:user:{user_id}' for _, user_id in report_rows},
+        )
+    return len(ids), len(report_rows)
+
+
+def archive_completed_tasks(before, batch_size=1000):
+    tasks = reports = 0
+    while True:
+        archived = archive_batch(before, batch_size)
+        tasks, reports = tasks + archived[0], reports + archived[1]
+        if archived[0] < batch_size:
+            return tasks, reports
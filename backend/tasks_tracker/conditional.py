@@ -0,0 +1,44 @@
+import hashlib
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from tasks.models import ChangeVersion
+
+
+class ConditionalReadMixin:
+    """
+    Weak ETags for viewset reads, built from ChangeVersion counters.
+
+    The tag covers the request URL, the user and the versions returned by
+    ``get_etag_scopes()``, so a matching If-None-Match is answered with 304
+    after one indexed lookup, without running the read or serializing.
+    """
+    def get_etag_scopes(self):
+        raise NotImplementedError
+
+    def get_etag(self, request):
+        scopes = self.get_etag_scopes()
+        versions = ChangeVersion.objects.get_many(scopes)
+        key = '|'.join([request.get_full_path(), str(request.user.pk), *map(str, versions)])
+        return 'W/"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        etag = self.get_etag(request)
+        # Weak comparison: ignore the W/ prefix on either side.
+        candidates = {tag.strip().removeprefix('W/') for tag in request.headers.get('If-None-Match', '').split(',')}
+        if etag.removeprefix('W/') in candidates:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
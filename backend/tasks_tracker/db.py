@@ -0,0 +1,179 @@
+"""
+Read-replica routing.
+
+Reads go to the primary (``default``) unless a view opts in with
+``ReplicaReadMixin`` or ``@replica_reads``; then the ORM reads of a safe-method
+request go to a healthy replica from ``settings.DATABASE_REPLICAS``. Writes
+always go to the primary, and so does everything inside a transaction.
+
+After any write request, a user's reads stay on the primary for
+``REPLICA_STICKY_SECONDS`` so they see their own changes. The marker lives in
+the default cache; use a shared cache backend when running several processes.
+
+Each process checks its replicas' lag at most every
+``REPLICA_CHECK_INTERVAL`` seconds and leaves out any that are unreachable or
+more than ``REPLICA_MAX_LAG_SECONDS`` behind. The check runs in a background
+thread, one at a time, so requests never wait on it: they use the last result,
+and read from the primary until the first check has finished.
+"""
+import contextvars
+import functools
+import itertools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_lag(alias):
+    """Seconds ``alias`` is behind the primary. Raises if it cannot be reached."""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_LAG_SQL if connection.vendor == 'postgresql' else 'SELECT 0')
+        return float(cursor.fetchone()[0])
+
+
+class ReplicaPool:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.probing = threading.Lock()
+        self.probe = None
+        self.healthy = []
+        self.checked_at = None
+        self.counter = itertools.count()
+
+    def check(self):
+        healthy = []
+        for alias in settings.DATABASE_REPLICAS:
+            try:
+                lag = replica_lag(alias)
+            except Exception:
+                logger.warning('Replica %s is unreachable; reading from the primary instead.', alias, exc_info=True)
+                continue
+            if lag > settings.REPLICA_MAX_LAG_SECONDS:
+                logger.warning('Replica %s is %.1fs behind; reading from the primary instead.', alias, lag)
+                continue
+            healthy.append(alias)
+        with self.lock:
+            self.healthy = healthy
+            self.checked_at = time.monotonic()
+        return healthy
+
+    def refresh(self):
+        """Start a check in the background unless one is already running."""
+        if not self.probing.acquire(blocking=False):
+            return
+        self.probe = threading.Thread(target=self.run_probe, name='replica-probe', daemon=True)
+        self.probe.start()
+
+    def run_probe(self):
+        try:
+            self.check()
+        finally:
+            connections.close_all()
+            self.probing.release()
+
+    def choose(self):
+        """A healthy replica alias in rotation, or None."""
+        checked_at = self.checked_at
+        if checked_at is None or time.monotonic() - checked_at >= settings.REPLICA_CHECK_INTERVAL:
+            self.refresh()
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self.counter) % len(healthy)]
+
+    def reset(self):
+        with self.lock:
+            self.healthy = []
+            self.checked_at = None
+
+
+replica_pool = ReplicaPool()
+
+
+def sticky_key(user_id):
+    return f'db:sticky:{user_id}'
+
+
+def mark_sticky(user):
+    if user is not None and user.is_authenticated:
+        cache.set(sticky_key(user.pk), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def read_alias_for(request):
+    """The replica this request may read from, or None for the primary."""
+    if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+        return None
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and cache.get(sticky_key(user.pk)):
+        return None
+    return replica_pool.choose()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Inside a transaction reads must see its own writes.
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """Route a viewset's safe-method reads to a replica; write requests make the user sticky."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # After authentication, so the sticky window can be looked up.
+        self._read_alias_token = _read_alias.set(read_alias_for(request))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_read_alias_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._read_alias_token = None
+        if request.method not in SAFE_METHODS:
+            mark_sticky(getattr(request, 'user', None))
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+def replica_reads(view):
+    """``ReplicaReadMixin`` for function views; apply below ``@api_view``."""
+    @functools.wraps(view)
+    def wrapped(request, *args, **kwargs):
+        token = _read_alias.set(read_alias_for(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+            if request.method not in SAFE_METHODS:
+                mark_sticky(request.user)
+    return wrapped
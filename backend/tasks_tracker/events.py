@@ -0,0 +1,166 @@
+"""
+Server-sent events for task and report changes.
+
+Writes publish small events to a broker once their transaction commits; each
+open ``/api/events/`` stream subscribes to the broker and receives the events
+its user may see (managers: all of them, employees: those naming them). The
+broker class comes from ``settings.EVENT_BROKER`` so the in-process one can be
+swapped for a shared implementation when running several server processes.
+
+Browsers' EventSource cannot send an Authorization header, so clients first
+``POST /api/events/ticket/`` (with the usual Bearer token) and open the stream
+with ``?ticket=``; a ticket works once, within ``STREAM_TICKET_SECONDS``, and
+keeps access tokens out of URLs and access logs.
+
+Streams are long-lived, so the app is served through ASGI (uvicorn workers under
+gunicorn; see the Procfile); under WSGI each one would tie up a worker.
+"""
+import asyncio
+import json
+import threading
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from accounts.authentication import ClaimsJWTAuthentication
+from accounts.models import StreamTicket
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+HEARTBEAT_SECONDS = 15
+
+
+class Subscription:
+    max_pending = 100
+
+    def __init__(self, user, loop):
+        self.user_id = user.pk
+        self.is_manager = user.is_manager
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    def wants(self, event):
+        return (self.is_manager and event['managers']) or self.user_id in event['user_ids']
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop.
+        if self.closed:
+            return
+        if self.queue.qsize() >= self.max_pending:
+            # Too far behind: end the stream so the client reconnects and refetches.
+            self.closed = True
+            self.queue.put_nowait(None)
+        else:
+            self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """Fans events out to the streams open in this process."""
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self, user, loop=None):
+        subscription = Subscription(user, loop or asyncio.get_running_loop())
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The stream's loop has gone away.
+                self.unsubscribe(subscription)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(getattr(settings, 'EVENT_BROKER', 'tasks_tracker.events.InProcessBroker'))()
+
+
+def publish_on_commit(event_type, data, user_ids, managers=True):
+    """Publish an event to ``user_ids`` (and managers) once the current transaction commits."""
+    event = {
+        'type': event_type,
+        'data': data,
+        'user_ids': {user_id for user_id in user_ids if user_id},
+        'managers': managers,
+    }
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], cls=DjangoJSONEncoder)}\n\n"
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def stream_ticket(request):
+    ticket = StreamTicket.objects.issue(request.user)
+    return Response(
+        {'ticket': ticket.key, 'expires_in': settings.STREAM_TICKET_SECONDS}, status=status.HTTP_201_CREATED
+    )
+
+
+def authenticate_stream(request):
+    """Authenticate with ``?ticket=`` from ``stream_ticket``, or the usual Bearer header."""
+    ticket = request.GET.get('ticket')
+    if ticket:
+        return StreamTicket.objects.redeem(ticket)
+    auth = ClaimsJWTAuthentication()
+    try:
+        result = auth.authenticate(request)
+        return result[0] if result else None
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+
+
+async def event_stream(request):
+    user = await sync_to_async(authenticate_stream)(request)
+    if user is None or not user.is_active:
+        return JsonResponse({'error': 'Authentication credentials were not provided or are invalid'}, status=401)
+
+    broker = get_broker()
+    subscription = broker.subscribe(user)
+
+    async def stream():
+        try:
+            yield ': connected\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                if event is None:
+                    break
+                yield format_event(event)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,175 @@
+"""
+Read-only fast path for list responses.
+
+``ValuesListMixin`` serves a viewset's list pages from ``.values()`` rows
+instead of model instances, and renders each row with a plan built once from
+the viewset's serializer: every readable field's own ``to_representation`` is
+applied to the column value, without instantiating models or resolving
+attributes per field. The output is the same as the serializer's, key order and
+all; fields that are not plain model columns are declared on the serializer in
+``values_fields`` as ``name: (lookups, function)``, where the function gets the
+looked-up values and may return ``SKIP`` to leave the key out the way DRF does
+for a source behind an empty relation.
+
+Clients narrow responses with ``?fields=a,b`` or ``?omit=a,b``; only the
+columns (and joins) those fields need are selected. ``?compact=1`` swaps the
+serializer's ``compact_fields`` (e.g. ``description``) for their stored
+snippets (``description_snippet``); a viewset with ``compact_lists`` does that
+for every response but retrieve, so its lists never read the full text.
+"""
+import functools
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.relations import PrimaryKeyRelatedField, RelatedField
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from .instrumentation import serializer_timer
+
+SKIP = object()
+
+
+def related_full_name(first_name, last_name):
+    """``<relation>.get_full_name`` from values() columns; left out when the relation is empty."""
+    if first_name is None:
+        return SKIP
+    return f"{first_name} {last_name}".strip()
+
+
+def related_value(value):
+    """``<relation>.<field>`` from a values() column; left out when the relation is empty."""
+    return SKIP if value is None else value
+
+
+def readable_fields(serializer_class):
+    return [name for name, field in serializer_class().fields.items() if not field.write_only]
+
+
+class ValuesRepresentation:
+    def __init__(self, serializer_class, fields=None, compact=False):
+        declared = getattr(serializer_class, 'values_fields', {})
+        compact_fields = getattr(serializer_class, 'compact_fields', {}) if compact else {}
+        self.lookups = []
+        self.steps = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if name in compact_fields:
+                # The snippet column, rendered like the full text.
+                name = compact_fields[name]
+                lookups = (name,)
+                self.steps.append((name, lookups, field.to_representation, False))
+            elif name in declared:
+                lookups, function = declared[name]
+                self.steps.append((name, tuple(lookups), function, True))
+            elif isinstance(field, PrimaryKeyRelatedField) and field.pk_field is None:
+                # values('<fk>') is the related primary key, which is what the field renders.
+                lookups = (field.source,)
+                self.steps.append((name, lookups, None, False))
+            elif isinstance(field, (BaseSerializer, RelatedField)) or '.' in field.source or field.source == '*':
+                raise ImproperlyConfigured(
+                    f'{serializer_class.__name__}.{name} needs an entry in values_fields for the fast path.'
+                )
+            else:
+                lookups = (field.source,)
+                self.steps.append((name, lookups, field.to_representation, False))
+            self.lookups.extend(lookup for lookup in lookups if lookup not in self.lookups)
+
+    def values(self, queryset, extra=()):
+        """``queryset.values()`` with the looked-up columns plus ``extra`` ones (e.g. the paginator's ordering)."""
+        # Keep annotations (e.g. search_rank) for the paginator's ordering too.
+        extra = [
+            name for name in dict.fromkeys([*extra, *queryset.query.annotations]) if name not in self.lookups
+        ]
+        return queryset.values(*self.lookups, *extra)
+
+    def to_representation(self, row):
+        ret = {}
+        for name, lookups, function, declared in self.steps:
+            if declared:
+                value = function(*[row[lookup] for lookup in lookups])
+                if value is SKIP:
+                    continue
+            else:
+                value = row[lookups[0]]
+                if value is not None and function is not None:
+                    value = function(value)
+            ret[name] = value
+        return ret
+
+    def represent(self, rows):
+        with serializer_timer():
+            return [self.to_representation(row) for row in rows]
+
+
+@functools.lru_cache(maxsize=256)
+def values_representation(serializer_class, fields=None, compact=False):
+    return ValuesRepresentation(serializer_class, fields, compact)
+
+
+class ValuesListMixin:
+    """
+    List pages (and ``list_response()`` in custom list actions) rendered through
+    ``ValuesRepresentation`` of the viewset's serializer, narrowed by
+    ``?fields=``/``?omit=``/``?compact=``. Retrieve takes the same path and
+    parameters; reads need no object permission check on these viewsets.
+    """
+    # Serve lists (and changes/) compact whatever ?compact= says; retrieve stays full.
+    compact_lists = False
+
+    def get_fieldset(self):
+        """The (fields, compact) requested; fields is None for all of them."""
+        params = self.request.query_params
+        available = readable_fields(self.get_serializer_class())
+        fields = None
+        for param in ('fields', 'omit'):
+            if param not in params:
+                continue
+            names = [name.strip() for name in params[param].split(',') if name.strip()]
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise ValidationError({
+                    param: f"Unknown field(s): {', '.join(unknown)}. Choose from: {', '.join(available)}."
+                })
+            if not names:
+                continue
+            if param == 'fields':
+                fields = [name for name in available if name in names]
+            else:
+                fields = [name for name in (fields or available) if name not in names]
+        compact = (
+            params.get('compact', '').lower() in ('1', 'true', 'yes')
+            or (self.compact_lists and self.action != 'retrieve')
+        )
+        return (None if fields is None else tuple(fields)), compact
+
+    def get_values_representation(self):
+        fields, compact = self.get_fieldset()
+        return values_representation(self.get_serializer_class(), fields, compact)
+
+    def prepare_rows(self, rows):
+        """Hook for the values() rows about to be rendered (e.g. to overlay pending writes)."""
+        return rows
+
+    def list_response(self, queryset):
+        representation = self.get_values_representation()
+        ordering = [field.lstrip('-') for field in getattr(self.paginator, 'ordering', ())]
+        values = representation.values(queryset, extra=ordering)
+        page = self.paginate_queryset(values)
+        if page is None:
+            return Response(representation.represent(self.prepare_rows(list(values))))
+        return self.get_paginated_response(representation.represent(self.prepare_rows(page)))
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        representation = self.get_values_representation()
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            representation.values(queryset, extra=[queryset.model._meta.pk.name]),
+            **{self.lookup_field: kwargs[lookup_url_kwarg]},
+        )
+        return Response(representation.represent(self.prepare_rows([row]))[0])
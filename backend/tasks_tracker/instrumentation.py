@@ -0,0 +1,180 @@
+"""
+Per-request timing: query count, database time, serializer time and total latency.
+
+``RequestTimingMiddleware`` labels each request with its view and action
+(``TaskViewSet.dashboard_stats``), adds a ``Server-Timing`` header and feeds the
+histograms served at ``/metrics``. With ``SLOW_REQUEST_THRESHOLD_MS`` set it
+also logs the most expensive SQL statements of slower requests to the
+``tasks_tracker.slow_requests`` logger; otherwise statements are not kept.
+Setting ``REQUEST_TIMING = False`` removes the middleware altogether.
+
+Serializer time is collected by ``TimedSerializerMixin`` on the app's serializers
+and by the ``.values()`` fast path (tasks_tracker/fastpath.py).
+"""
+import contextvars
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from .metrics import Histogram
+
+slow_request_logger = logging.getLogger('tasks_tracker.slow_requests')
+
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+request_seconds = Histogram(
+    'tasks_tracker_request_duration_seconds', 'Total request latency.', ['view', 'method']
+)
+request_db_seconds = Histogram(
+    'tasks_tracker_request_db_seconds', 'Time spent in database queries per request.', ['view', 'method']
+)
+request_serializer_seconds = Histogram(
+    'tasks_tracker_request_serializer_seconds', 'Time spent serializing per request.', ['view', 'method']
+)
+request_queries = Histogram(
+    'tasks_tracker_request_queries', 'Database queries per request.', ['view', 'method'], buckets=QUERY_BUCKETS
+)
+
+_current = contextvars.ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    def __init__(self, keep_statements):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+        self.statements = {} if keep_statements else None
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_seconds += elapsed
+            if self.statements is not None:
+                count, total = self.statements.get(sql, (0, 0.0))
+                self.statements[sql] = (count + 1, total + elapsed)
+
+    def top_statements(self, limit):
+        return sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+
+
+@contextmanager
+def serializer_timer():
+    """Counts the time spent in the block as serializer time of the current request (outermost block only)."""
+    timing = _current.get()
+    if timing is None or timing.serializer_depth:
+        yield
+        return
+    timing.serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.serializer_seconds += time.perf_counter() - start
+        timing.serializer_depth -= 1
+
+
+class TimedSerializerMixin:
+    """Adds the time spent in (top-level) to_representation to the current request's timing."""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+def view_label(view_func, method):
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', 'unknown')
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        return f"{view_class.__name__}.{actions.get(method.lower(), method.lower())}"
+    return view_class.__name__
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_TIMING', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', None)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing = RequestTiming(keep_statements=self.slow_threshold is not None)
+        token = _current.set(timing)
+        start = time.perf_counter()
+        try:
+            with self.wrap_connections(timing):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timing, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timing = RequestTiming(keep_statements=self.slow_threshold is not None)
+        token = _current.set(timing)
+        start = time.perf_counter()
+        try:
+            # Connections belong to the thread the request's sync code runs in
+            # (one per request under ASGI), so wrap them there.
+            stack = await sync_to_async(self.wrap_connections)(timing)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timing, time.perf_counter() - start)
+
+    def wrap_connections(self, timing):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timing))
+        return stack
+
+    def finish(self, request, response, timing, total):
+        label = getattr(request, '_timing_view', 'unmatched')
+        method = request.method
+        request_seconds.observe(total, view=label, method=method)
+        request_db_seconds.observe(timing.db_seconds, view=label, method=method)
+        request_serializer_seconds.observe(timing.serializer_seconds, view=label, method=method)
+        request_queries.observe(timing.queries, view=label, method=method)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timing.db_seconds * 1000:.1f};desc="{timing.queries} queries"',
+            f'serializer;dur={timing.serializer_seconds * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+        if self.slow_threshold is not None and total * 1000 >= self.slow_threshold:
+            self.log_slow_request(request, label, total, timing)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timing_view = view_label(view_func, request.method)
+
+    def log_slow_request(self, request, label, total, timing):
+        lines = [
+            f'{request.method} {request.get_full_path()} ({label}) took {total * 1000:.0f} ms: '
+            f'{timing.queries} queries in {timing.db_seconds * 1000:.0f} ms, '
+            f'serializer {timing.serializer_seconds * 1000:.0f} ms'
+        ]
+        for sql, (count, seconds) in timing.top_statements(getattr(settings, 'SLOW_REQUEST_TOP_STATEMENTS', 5)):
+            lines.append(f'  {seconds * 1000:.1f} ms x{count}: {sql}')
+        slow_request_logger.warning('\n'.join(lines))
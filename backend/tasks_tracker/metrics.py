@@ -0,0 +1,125 @@
+"""
+Process-local metrics in the Prometheus text format, served at ``/metrics``.
+
+Each server process keeps its own values; scrape every process (or sum them
+in Prometheus). Scrapers send ``Authorization: Bearer <METRICS_TOKEN>``; without
+a token the endpoint is only open when ``DEBUG`` is on.
+"""
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics)
+        return ''.join(metric.render() for metric in metrics)
+
+
+registry = Registry()
+
+
+def format_labels(labelnames, values):
+    if not labelnames:
+        return ''
+    pairs = ','.join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(labelnames, values)
+    )
+    return f'{{{pairs}}}'
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.register(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, self.labelnames, key, value) for key, value in sorted(self.values.items())]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        for name, labelnames, key, value in self.samples():
+            lines.append(f'{name}{format_labels(labelnames, key)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class Histogram:
+    type = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.register(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                # Per-bucket counts, then the sample count and sum.
+                counts = self.values[key] = [0] * len(self.buckets) + [0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-2] += 1
+            counts[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        with self.lock:
+            values = sorted((key, list(counts)) for key, counts in self.values.items())
+        for key, counts in values:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = format_labels(self.labelnames + ('le',), key + (f'{bound:g}',))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            lines.append(f'{self.name}_bucket{format_labels(self.labelnames + ("le",), key + ("+Inf",))} {counts[-2]}')
+            lines.append(f'{self.name}_count{format_labels(self.labelnames, key)} {counts[-2]}')
+            # Full precision: ``rate(_sum) / rate(_count)`` drifts once a rounded sum grows.
+            lines.append(f'{self.name}_sum{format_labels(self.labelnames, key)} {float(counts[-1])!r}')
+        return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token and not settings.DEBUG:
+        return HttpResponseForbidden()
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
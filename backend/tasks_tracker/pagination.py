@@ -0,0 +1,162 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def page_size_from(value, cutoff):
+    """A positive page size from a query parameter, capped at ``cutoff``."""
+    size = int(value)
+    if size <= 0:
+        raise ValueError(value)
+    return min(size, cutoff)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on (-created_at, -id).
+
+    Each page is fetched with an indexed range condition on the last row seen
+    rather than an OFFSET, and no COUNT is run, so deep pages cost the same as
+    the first one. Cursors are opaque; clients just follow ``next``/``previous``.
+    Ranked search results (see tasks_tracker.search) are paged on
+    (-search_rank, -id) instead.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+    field_types = {'created_at': datetime, 'id': int, 'search_rank': float}
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.fields = self.get_ordering(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        if reverse:
+            queryset = queryset.order_by(*(self.flip(field) for field in self.fields))
+        else:
+            queryset = queryset.order_by(*self.fields)
+
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if rows:
+            self.next_position = self.get_position(rows[-1])
+            self.previous_position = self.get_position(rows[0])
+        else:
+            self.next_position = self.previous_position = position
+        return rows
+
+    def get_ordering(self, queryset):
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', '-id')
+        return self.ordering
+
+    def flip(self, field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def after(self, position, reverse):
+        """Rows strictly after ``position`` in the (possibly reversed) ordering."""
+        conditions = []
+        for i, field in enumerate(self.fields):
+            descending = field.startswith('-') != reverse
+            name = field.lstrip('-')
+            equal = {f.lstrip('-'): value for f, value in zip(self.fields[:i], position)}
+            conditions.append(Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": position[i]}))
+        return reduce(or_, conditions)
+
+    def get_page_size(self, request):
+        try:
+            return page_size_from(request.query_params[self.page_size_query_param], self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return tuple(row[field.lstrip('-')] for field in self.fields)
+        return tuple(getattr(row, field.lstrip('-')) for field in self.fields)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            values, reverse = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if len(values) != len(self.fields) or not isinstance(reverse, bool):
+                raise ValueError
+            position = tuple(self.decode_value(field, value) for field, value in zip(self.fields, values))
+            return position, reverse
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def decode_value(self, field, value):
+        """One cursor value, checked against the type of its ordering field; raises ValueError."""
+        kind = self.field_types[field.lstrip('-')]
+        if kind is datetime:
+            parsed = parse_datetime(value['dt']) if isinstance(value, dict) else None
+            if parsed is None:
+                raise ValueError(value)
+            return parsed
+        accepted = (int, float) if kind is float else kind
+        if isinstance(value, bool) or not isinstance(value, accepted):
+            raise ValueError(value)
+        return kind(value)
+
+    def encode_cursor(self, position, reverse):
+        if position is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        values = [{'dt': value.isoformat()} if isinstance(value, datetime) else value for value in position]
+        encoded = urlsafe_b64encode(json.dumps([values, reverse]).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
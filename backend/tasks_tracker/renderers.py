@@ -0,0 +1,56 @@
+"""
+JSON renderer and parser backed by orjson, when it is installed.
+
+Output is byte-for-byte what DRF's ``JSONRenderer`` produces with the default
+compact, unicode settings: dates and datetimes, Decimals and the other types
+orjson does not handle the same way go through DRF's encoder. Indented output
+(the browsable API, ``; indent=`` media types), other ``COMPACT_JSON`` /
+``UNICODE_JSON`` settings and anything orjson refuses fall back to the stdlib
+renderer. The one difference: floats written in exponent form (``1e+16`` vs
+``1e16``); the API renders none.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional; DRF's stdlib json classes take over
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    def __init__(self):
+        if orjson is not None:
+            self.options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            self.default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.default, option=self.options)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which json.dumps writes out.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escape U+2028/U+2029 like JSONRenderer does.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if orjson is None or not self.strict or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # Like the strict stdlib parser, orjson rejects NaN and Infinity.
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,138 @@
+"""
+Full-text search over task and report text.
+
+PostgreSQL keeps a generated ``search_vector`` tsvector column with a GIN
+index on each searched table (see the tasks/reports search migrations).
+SQLite, used for local and test runs, gets an FTS5 external-content table kept
+in step by triggers, installed after every migrate. Other databases fall back
+to ``icontains``. Either way the database maintains the index, so every write
+path (save, bulk_update, queryset.update) is covered.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+# Searched columns per table, most important first.
+SEARCH_FIELDS = {
+    'tasks_task': ['title', 'description'],
+    'reports_taskreport': ['content'],
+}
+SEARCH_CONFIG = 'english'
+# ts_rank's default weights for labels A, B, C, D; reused for SQLite's bm25().
+RANK_WEIGHTS = [1.0, 0.4, 0.2, 0.1]
+MAX_TERMS = 8
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def postgres_search_column_sql(table):
+    weights = 'ABCD'
+    vector = ' || '.join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({field}, '')), '{weights[i]}')"
+        for i, field in enumerate(SEARCH_FIELDS[table])
+    )
+    return [
+        f'ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED',
+        f'CREATE INDEX {table}_search_idx ON {table} USING gin (search_vector)',
+    ]
+
+
+def install_sqlite_search(table, cursor):
+    """Create the FTS5 table and sync triggers for ``table`` if they are missing."""
+    fts = f'{table}_fts'
+    fields = SEARCH_FIELDS[table]
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{field}' for field in fields)
+    old_values = ', '.join(f'old.{field}' for field in fields)
+
+    cursor.execute("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s", [f'{fts}_%'])
+    if cursor.fetchone()[0] == 3:
+        return
+
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{columns}, content='{table}', content_rowid='id', tokenize='porter unicode61')"
+    )
+    cursor.execute(
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN '
+        f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END'
+    )
+    cursor.execute(
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    cursor.execute(
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END'
+    )
+    # Triggers were missing (new database, or SQLite rebuilt the table): reindex.
+    cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def install_sqlite_search_indexes(sender, using='default', **kwargs):
+    """post_migrate hook: (re)install the SQLite FTS5 fallback."""
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    tables = set(conn.introspection.table_names())
+    with conn.cursor() as cursor:
+        for table in SEARCH_FIELDS:
+            if table in tables:
+                install_sqlite_search(table, cursor)
+
+
+def search(queryset, query):
+    """Filter ``queryset`` to rows matching every term (as a prefix), annotated with ``search_rank``."""
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    table = queryset.model._meta.db_table
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.alias(
+            search_match=RawSQL(
+                f'"{table}"."search_vector" @@ to_tsquery(%s, %s)', (SEARCH_CONFIG, tsquery),
+                output_field=BooleanField()
+            )
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(
+                f'ts_rank("{table}"."search_vector", to_tsquery(%s, %s))', (SEARCH_CONFIG, tsquery),
+                output_field=FloatField()
+            )
+        )
+
+    if vendor == 'sqlite':
+        fts = f'{table}_fts'
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(w) for w in RANK_WEIGHTS[:len(SEARCH_FIELDS[table])])
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', (match,))
+        ).annotate(
+            # bm25() is lower-is-better; negate so both backends rank descending.
+            search_rank=RawSQL(
+                f'(SELECT -bm25({fts}, {weights}) FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid = "{table}"."id")',
+                (match,), output_field=FloatField()
+            )
+        )
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(*[Q(**{f'{field}__icontains': term}) for field in SEARCH_FIELDS[table]], _connector=Q.OR)
+    return queryset.filter(condition)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """``?search=`` over the viewset's own (already scoped) queryset, ranked best first."""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        return search(queryset, query) if query.strip() else queryset
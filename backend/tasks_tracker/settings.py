@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,9 +47,11 @@ INSTALLED_APPS = [
     'accounts',
     'tasks',
     'reports',
+    'benchmark',
 ]
 
 MIDDLEWARE = [
+    'tasks_tracker.instrumentation.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -94,25 +96,112 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite runs against a local SQLite file instead (e.g. for benchmarks)
+if config('DB_ENGINE', default='postgresql') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+    }
+
+# Read replicas: comma-separated hosts reached with the primary's credentials
+# (e.g. "localhost,localhost" for two local stand-ins). See tasks_tracker/db.py.
+# Seconds to wait when connecting to a replica before counting it unreachable
+REPLICA_CONNECT_TIMEOUT = config('DB_REPLICA_CONNECT_TIMEOUT', default=2, cast=int)
+for index, host in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv())):
+    DATABASES[f'replica{index}'] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+        DATABASES[f'replica{index}']['OPTIONS'] = {'connect_timeout': REPLICA_CONNECT_TIMEOUT}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['tasks_tracker.db.ReplicaRouter']
+# Seconds a user's reads stay on the primary after they write
+REPLICA_STICKY_SECONDS = 10
+# Replicas further behind than this are left out until they catch up
+REPLICA_MAX_LAG_SECONDS = 5
+REPLICA_CHECK_INTERVAL = 5
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    # orjson-backed when it is installed, DRF's stdlib json otherwise; see tasks_tracker/renderers.py
+    'DEFAULT_RENDERER_CLASSES': [
+        'tasks_tracker.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'tasks_tracker.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'tasks_tracker.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    # Token buckets for login and password reset; see accounts/throttling.py
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '20/min',
+        'login_username': '5/min',
+        'password_reset_ip': '5/min',
+        'password_reset_email': '3/hour',
+    },
 }
 
+# Cache holding the throttle buckets. Point it at a shared backend to throttle across processes.
+THROTTLE_CACHE = 'default'
+
+# Per-request Server-Timing header and /metrics histograms; see tasks_tracker/instrumentation.py
+REQUEST_TIMING = config('REQUEST_TIMING', default=True, cast=bool)
+# Log the top SQL statements of requests slower than this (milliseconds); 0 turns the log off
+SLOW_REQUEST_THRESHOLD_MS = config('SLOW_REQUEST_THRESHOLD_MS', default=0, cast=int) or None
+SLOW_REQUEST_TOP_STATEMENTS = 5
+
+# /metrics requires "Authorization: Bearer <METRICS_TOKEN>"; unset, it is only served with DEBUG on
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Fan-out for the /api/events/ stream; see tasks_tracker/events.py
+EVENT_BROKER = 'tasks_tracker.events.InProcessBroker'
+# How long a ticket from /api/events/ticket/ can be used to open the stream (seconds)
+STREAM_TICKET_SECONDS = 30
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
 }
 
+# Cache holding users' token versions (accounts/tokens.py). Unset, every token-authenticated
+# request reads the version from the database. Only point it at a backend all processes share
+# (Redis, Memcached): a version bump deletes the key there, but a per-process cache would keep
+# revoked tokens working in the other processes for up to TOKEN_VERSION_CACHE_TIMEOUT seconds.
+TOKEN_VERSION_CACHE = config('TOKEN_VERSION_CACHE', default=None)
+TOKEN_VERSION_CACHE_TIMEOUT = 30
+# How often each process picks up tokens blacklisted elsewhere (seconds); see accounts/blacklist.py
+TOKEN_BLACKLIST_SYNC_SECONDS = 10
+# Cache holding profiles and employee directory pages (accounts/directory.py). Unset, they are
+# built on every request. As with TOKEN_VERSION_CACHE, only point it at a backend all processes
+# share: user saves invalidate it there, and a per-process cache would serve other processes'
+# stale profiles (role included) for up to USER_DIRECTORY_CACHE_TIMEOUT seconds.
+USER_DIRECTORY_CACHE = config('USER_DIRECTORY_CACHE', default=None)
+# Upper bound on how long cached profiles and employee directory pages live (seconds)
+USER_DIRECTORY_CACHE_TIMEOUT = 300
+# Delta sync (tasks_tracker/sync.py): log entries per changes/ call, and how old an
+# entry must be before the cursor moves past it (at least the longest write transaction)
+SYNC_PAGE_SIZE = 500
+SYNC_SETTLE_SECONDS = 5
+# Days of change log kept by prune_change_log
+CHANGE_LOG_RETENTION_DAYS = 30
+# Buffer update_completion_percentage writes in memory and store the latest value per
+# task every COMPLETION_FLUSH_INTERVAL_MS; see tasks/write_behind.py
+COMPLETION_WRITE_BEHIND = config('COMPLETION_WRITE_BEHIND', default=False, cast=bool)
+COMPLETION_FLUSH_INTERVAL_MS = 250
+# archive_tasks archives tasks completed more than this many days ago; see tasks_tracker/archive.py
+TASK_ARCHIVE_AFTER_DAYS = 90
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
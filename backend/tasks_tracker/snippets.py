@@ -0,0 +1,21 @@
+"""
+Short previews of long text columns for compact list responses.
+
+The preview is a stored generated column, so the database keeps it in step on
+every write path (save, bulk_create, bulk_update, queryset.update) and compact
+lists never read the full text.
+"""
+from django.db.models import Case, F, TextField, Value, When
+from django.db.models.functions import Concat, Length, Substr
+from django.db.models.lookups import GreaterThan
+
+SNIPPET_LENGTH = 160
+
+
+def snippet_expression(field, length=SNIPPET_LENGTH):
+    """``field`` cut to at most ``length`` characters, ending in an ellipsis when anything was cut."""
+    return Case(
+        When(GreaterThan(Length(F(field)), length), then=Concat(Substr(F(field), 1, length - 1), Value('…'))),
+        default=F(field),
+        output_field=TextField(),
+    )
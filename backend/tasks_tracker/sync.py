@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from tasks.models import ChangeLogEntry
+
+
+class DeltaSyncMixin:
+    """
+    Adds a ``changes`` action for incremental refreshes, read from ChangeLogEntry.
+
+    ``GET changes/`` (no ``since``) returns the current cursor; ``GET
+    changes/?since=<cursor>`` returns the rows written after it, in their list
+    representation (``?fields=``/``?omit=``/``?compact=`` apply), the ids of
+    those deleted or no longer visible to the user in ``deleted``, and the
+    cursor to send next. Each call reads at most ``SYNC_PAGE_SIZE`` log entries
+    through the (kind, user, id) index, so its cost follows the number of
+    changes, not the size of the tables; ``more`` says another call would
+    return more right away.
+
+    Log ids are assigned before transactions commit, so an entry can appear
+    after a larger id has been read. The cursor only moves past entries older
+    than ``SYNC_SETTLE_SECONDS``; newer ones are returned again on the next
+    call, which clients apply as idempotent upserts. A cursor older than the
+    pruned log (see ``prune_change_log``) gets ``410 Gone``: reload the list.
+    """
+    change_log_kind = None
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        settled_before = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        log = ChangeLogEntry.objects
+        if 'since' not in request.query_params:
+            # Take the cursor before loading the full list; changes in between are replayed.
+            return Response({'changes': [], 'deleted': [], 'cursor': log.settled_cursor(settled_before), 'more': False})
+
+        try:
+            since = int(request.query_params['since'])
+            if since < 0:
+                raise ValueError
+        except ValueError:
+            return Response({'error': 'since must be a cursor returned by this endpoint'}, status=status.HTTP_400_BAD_REQUEST)
+        oldest = log.oldest_id()
+        if oldest is not None and since < oldest - 1:
+            return Response(
+                {'error': 'Changes before this cursor are no longer kept; reload the list and sync from a new cursor.'},
+                status=status.HTTP_410_GONE
+            )
+
+        # Managers read the everyone entries, employees their own.
+        audience = None if request.user.is_manager else request.user.pk
+        limit = settings.SYNC_PAGE_SIZE
+        entries = log.after(self.change_log_kind, audience, since, limit + 1)
+        more = len(entries) > limit
+        entries = entries[:limit]
+
+        cursor = since
+        for entry_id, _, created_at in entries:
+            if created_at > settled_before:
+                more = False
+                break
+            cursor = entry_id
+
+        # Each object once, in the order of its latest change.
+        latest = {}
+        for entry_id, object_id, _ in entries:
+            latest.pop(object_id, None)
+            latest[object_id] = entry_id
+
+        representation = self.get_values_representation()
+        queryset = self.filter_queryset(self.get_queryset()).filter(pk__in=list(latest))
+        rows = {row['id']: row for row in self.prepare_rows(list(representation.values(queryset, extra=['id'])))}
+        return Response({
+            'changes': representation.represent([rows[pk] for pk in latest if pk in rows]),
+            'deleted': [pk for pk in latest if pk not in rows],
+            'cursor': cursor,
+            'more': more,
+        })
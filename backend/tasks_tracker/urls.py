@@ -18,6 +18,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
 from rest_framework_simplejwt.views import TokenRefreshView
+from .events import event_stream, stream_ticket
+from .metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,5 +27,8 @@ urlpatterns = [
     path('api/tasks/', include('tasks.urls')),
     path('api/reports/', include('reports.urls')),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/events/', event_stream, name='event_stream'),
+    path('api/events/ticket/', stream_ticket, name='stream_ticket'),
+    path('metrics', metrics_view, name='metrics'),
     path('', lambda request: JsonResponse({'message': 'Tasks Tracker API is running'}), name='api_root'),
 ]
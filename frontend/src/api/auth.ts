@@ -108,4 +108,28 @@ export const authAPI = {
   },
 };
 
+export interface Page<T> {
+  results: T[];
+  next: string | null;
+  previous: string | null;
+}
+
+// List endpoints are cursor-paginated: pass a page's `next` link back in to get the following page.
+export const getPage = async <T>(url: string): Promise<Page<T>> => {
+  const response = await api.get(url);
+  return response.data;
+};
+
+// Only for callers that need every row (e.g. a picker); stops after maxRows.
+export const getAllPages = async <T>(url: string, maxRows: number): Promise<T[]> => {
+  const items: T[] = [];
+  let next: string | null = url;
+  while (next && items.length < maxRows) {
+    const page: Page<T> = await getPage<T>(next);
+    items.push(...page.results);
+    next = page.next;
+  }
+  return items.slice(0, maxRows);
+};
+
 export default api;
@@ -1,4 +1,5 @@
-import api from './auth';
+import api, { getPage } from './auth';
+import type { Page } from './auth';
 
 export interface TaskReportData {
   task: number;
@@ -11,9 +12,13 @@ export interface TaskReport {
   reported_by: number;
   reported_by_name: string;
   reported_by_username: string;
-  content: string;
+  // Lists carry content_snippet; content comes with getReport() and createReport().
+  content?: string;
+  content_snippet?: string;
+  content_length: number;
   created_at: string;
   updated_at: string;
+  archived_at: string | null;
 }
 
 export const reportsAPI = {
@@ -22,29 +27,29 @@ export const reportsAPI = {
     return response.data;
   },
 
-  getTaskReports: async (taskId: number): Promise<TaskReport[]> => {
-    const response = await api.get(`/reports/reports/task_reports/?task_id=${taskId}`);
+  getReport: async (id: number): Promise<TaskReport> => {
+    const response = await api.get(`/reports/reports/${id}/`);
     return response.data;
   },
 
-  getMyReports: async (): Promise<TaskReport[]> => {
-    const response = await api.get('/reports/reports/my_reports/');
-    return response.data;
+  getTaskReports: async (taskId: number): Promise<Page<TaskReport>> => {
+    return getPage<TaskReport>(`/reports/reports/task_reports/?task_id=${taskId}`);
   },
 
-  getAllReports: async (): Promise<TaskReport[]> => {
-    const response = await api.get('/reports/reports/');
-    return response.data;
+  getMyReports: async (): Promise<Page<TaskReport>> => {
+    return getPage<TaskReport>('/reports/reports/my_reports/');
   },
 
-  getEmployeeReports: async (employeeId?: number): Promise<TaskReport[]> => {
+  getAllReports: async (): Promise<Page<TaskReport>> => {
+    return getPage<TaskReport>('/reports/reports/');
+  },
+
+  getEmployeeReports: async (employeeId?: number): Promise<Page<TaskReport>> => {
     const params = employeeId ? `?employee_id=${employeeId}` : '';
-    const response = await api.get(`/reports/reports/employee_reports/${params}`);
-    return response.data;
+    return getPage<TaskReport>(`/reports/reports/employee_reports/${params}`);
   },
 
-  getManagerDashboardReports: async (): Promise<TaskReport[]> => {
-    const response = await api.get('/reports/reports/manager_dashboard/');
-    return response.data;
+  getManagerDashboardReports: async (): Promise<Page<TaskReport>> => {
+    return getPage<TaskReport>('/reports/reports/manager_dashboard/');
   },
 };
@@ -1,4 +1,5 @@
-import api from './auth';
+import api, { getAllPages, getPage } from './auth';
+import type { Page } from './auth';
 
 export interface Task {
   id: number;
@@ -13,6 +14,8 @@ export interface Task {
   created_at: string;
   updated_at: string;
   due_date: string | null;
+  version: number;
+  archived_at: string | null;
 }
 
 export interface CreateTaskData {
@@ -32,13 +35,17 @@ export interface DashboardStats {
 }
 
 export const tasksAPI = {
-  getTasks: async (filters?: { status?: string; assigned_to?: number }): Promise<Task[]> => {
+  getTasks: async (filters?: { status?: string; assigned_to?: number }): Promise<Page<Task>> => {
     const params = new URLSearchParams();
     if (filters?.status) params.append('status', filters.status);
     if (filters?.assigned_to) params.append('assigned_to', filters.assigned_to.toString());
     
-    const response = await api.get(`/tasks/tasks/?${params.toString()}`);
-    return response.data.results || response.data;
+    return getPage<Task>(`/tasks/tasks/?${params.toString()}`);
+  },
+
+  // Newest tasks first, at most maxRows of them, for pickers and title lookups.
+  getAllTasks: async (maxRows = 500): Promise<Task[]> => {
+    return getAllPages<Task>('/tasks/tasks/?page_size=100', maxRows);
   },
 
   getTask: async (id: number): Promise<Task> => {
@@ -51,18 +58,19 @@ export const tasksAPI = {
     return response.data;
   },
 
-  updateTask: async (id: number, data: Partial<CreateTaskData>): Promise<Task> => {
-    const response = await api.patch(`/tasks/tasks/${id}/`, data);
+  // Pass the version the task was read at to get a 409 instead of overwriting someone else's change.
+  updateTask: async (id: number, data: Partial<CreateTaskData>, version?: number): Promise<Task> => {
+    const response = await api.patch(`/tasks/tasks/${id}/`, { ...data, version });
     return response.data;
   },
 
-  updateTaskStatus: async (id: number, status: string): Promise<Task> => {
-    const response = await api.patch(`/tasks/tasks/${id}/update_status/`, { status });
+  updateTaskStatus: async (id: number, status: string, version?: number): Promise<Task> => {
+    const response = await api.patch(`/tasks/tasks/${id}/update_status/`, { status, version });
     return response.data;
   },
 
-  updateCompletionPercentage: async (id: number, completion_percentage: number): Promise<Task> => {
-    const response = await api.patch(`/tasks/tasks/${id}/update_completion_percentage/`, { completion_percentage });
+  updateCompletionPercentage: async (id: number, completion_percentage: number, version?: number): Promise<Task> => {
+    const response = await api.patch(`/tasks/tasks/${id}/update_completion_percentage/`, { completion_percentage, version });
     return response.data;
   },
 
@@ -70,9 +78,8 @@ export const tasksAPI = {
     await api.delete(`/tasks/tasks/${id}/`);
   },
 
-  getMyTasks: async (): Promise<Task[]> => {
-    const response = await api.get('/tasks/tasks/my_tasks/');
-    return response.data.results || response.data;
+  getMyTasks: async (): Promise<Page<Task>> => {
+    return getPage<Task>('/tasks/tasks/my_tasks/');
   },
 
   getDashboardStats: async (): Promise<DashboardStats> => {
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useCallback, useMemo } from "react";
 import { useAuth } from "../contexts/AuthContext";
 import type { Task, DashboardStats } from "../api/tasks";
 import { tasksAPI } from "../api/tasks";
+import { getPage } from "../api/auth";
 import {
   PlusIcon,
   CheckCircleIcon,
@@ -17,6 +18,8 @@ const Dashboard: React.FC = () => {
   const { user } = useAuth();
   const [stats, setStats] = useState<DashboardStats | null>(null);
   const [tasks, setTasks] = useState<Task[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [showTaskForm, setShowTaskForm] = useState(false);
   const [editingTask, setEditingTask] = useState<Task | null>(null);
   const [selectedStatus, setSelectedStatus] = useState("all");
@@ -37,14 +40,15 @@ const Dashboard: React.FC = () => {
         setIsLoading(true);
       }
       setError(null);
-      const [statsData, tasksData] = await Promise.all([
+      const [statsData, tasksPage] = await Promise.all([
         tasksAPI.getDashboardStats(),
         tasksAPI.getTasks(
           selectedStatus === "all" ? {} : { status: selectedStatus }
         ),
       ]);
       setStats(statsData);
-      setTasks(tasksData);
+      setTasks(tasksPage.results);
+      setNextPage(tasksPage.next);
     } catch (error) {
       console.error("Error loading dashboard data:", error);
       setError("Failed to load dashboard data. Please try again.");
@@ -54,6 +58,20 @@ const Dashboard: React.FC = () => {
     }
   }, [selectedStatus]);
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await getPage<Task>(nextPage);
+      setTasks((current) => [...current, ...page.results]);
+      setNextPage(page.next);
+    } catch (error) {
+      console.error("Error loading more tasks:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const retryLoad = () => {
     loadData();
   };
@@ -309,11 +327,24 @@ const Dashboard: React.FC = () => {
         {/* Content based on active tab */}
         {activeTab === "tasks" ? (
           /* Tasks Table */
-          <TaskTable
-            tasks={tasks}
-            onTaskUpdated={handleTaskUpdated}
-            onTaskEdit={handleEditTask}
-          />
+          <>
+            <TaskTable
+              tasks={tasks}
+              onTaskUpdated={handleTaskUpdated}
+              onTaskEdit={handleEditTask}
+            />
+            {nextPage && (
+              <div className="mt-4 text-center">
+                <button
+                  onClick={loadMore}
+                  disabled={isLoadingMore}
+                  className="px-4 py-2 rounded-md text-sm font-medium bg-white dark:bg-slate-700 text-gray-700 dark:text-slate-300 hover:bg-gray-50 dark:hover:bg-slate-600 border border-gray-300 dark:border-slate-600 disabled:opacity-50 disabled:cursor-not-allowed"
+                >
+                  {isLoadingMore ? "Loading..." : "Load more tasks"}
+                </button>
+              </div>
+            )}
+          </>
         ) : (
           /* Employee Reports */
           <EmployeeReports onTaskSelect={handleTaskSelect} />
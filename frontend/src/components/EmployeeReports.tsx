@@ -4,6 +4,7 @@ import type { TaskReport } from '../api/reports';
 import type { Task } from '../api/tasks';
 import { reportsAPI } from '../api/reports';
 import { tasksAPI } from '../api/tasks';
+import { getPage } from '../api/auth';
 import {
   DocumentTextIcon,
   UserIcon,
@@ -20,6 +21,8 @@ interface EmployeeReportsProps {
 const EmployeeReports: React.FC<EmployeeReportsProps> = React.memo(({ onTaskSelect }) => {
   const { user } = useAuth();
   const [reports, setReports] = useState<TaskReport[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [tasks, setTasks] = useState<Task[]>([]);
   const [employees, setEmployees] = useState<{id: number, name: string}[]>([]);
   const [selectedEmployee, setSelectedEmployee] = useState<number | null>(null);
@@ -28,6 +31,20 @@ const EmployeeReports: React.FC<EmployeeReportsProps> = React.memo(({ onTaskSele
   const [error, setError] = useState<string | null>(null);
   const [isRefreshing, setIsRefreshing] = useState(false);
   const [showFilters, setShowFilters] = useState(false);
+  const [fullContent, setFullContent] = useState<Record<number, string>>({});
+
+  // The employee filter lists everyone who appears in the reports loaded so far.
+  const addEmployees = useCallback((loaded: TaskReport[]) => {
+    setEmployees(prev => Array.from(
+      new Map([
+        ...prev.map(employee => [employee.id, employee] as const),
+        ...loaded.map(report => [
+          report.reported_by,
+          { id: report.reported_by, name: report.reported_by_name }
+        ] as const),
+      ]).values()
+    ));
+  }, []);
 
   const loadData = useCallback(async (refresh = false) => {
     try {
@@ -38,28 +55,20 @@ const EmployeeReports: React.FC<EmployeeReportsProps> = React.memo(({ onTaskSele
       }
       setError(null);
 
-      const [reportsData, tasksData] = await Promise.all([
+      const [reportsPage, tasksData] = await Promise.all([
         selectedEmployee || selectedTask 
           ? selectedEmployee 
             ? reportsAPI.getEmployeeReports(selectedEmployee)
             : reportsAPI.getTaskReports(selectedTask!)
           : reportsAPI.getManagerDashboardReports(),
-        tasksAPI.getTasks(),
+        // Titles and the task filter; capped, older tasks show as "Task #id".
+        tasksAPI.getAllTasks(),
       ]);
 
-      setReports(reportsData);
+      setReports(reportsPage.results);
+      setNextPage(reportsPage.next);
       setTasks(tasksData);
-
-      // Extract unique employees from reports - memoized
-      const uniqueEmployees = Array.from(
-        new Map(
-          reportsData.map(report => [
-            report.reported_by,
-            { id: report.reported_by, name: report.reported_by_name }
-          ])
-        ).values()
-      );
-      setEmployees(uniqueEmployees);
+      addEmployees(reportsPage.results);
 
     } catch (error) {
       console.error('Error loading employee reports:', error);
@@ -68,7 +77,7 @@ const EmployeeReports: React.FC<EmployeeReportsProps> = React.memo(({ onTaskSele
       setIsLoading(false);
       setIsRefreshing(false);
     }
-  }, [selectedEmployee, selectedTask]);
+  }, [selectedEmployee, selectedTask, addEmployees]);
 
   useEffect(() => {
     if (user?.is_manager) {
@@ -76,6 +85,21 @@ const EmployeeReports: React.FC<EmployeeReportsProps> = React.memo(({ onTaskSele
     }
   }, [user, loadData]);
 
+  const loadMore = useCallback(async () => {
+    if (!nextPage) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await getPage<TaskReport>(nextPage);
+      setReports(prev => [...prev, ...page.results]);
+      setNextPage(page.next);
+      addEmployees(page.results);
+    } catch (error) {
+      console.error('Error loading more reports:', error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  }, [nextPage, addEmployees]);
+
   const filteredReports = useMemo(() => {
     let filtered = reports;
     
@@ -114,6 +138,15 @@ const EmployeeReports: React.FC<EmployeeReportsProps> = React.memo(({ onTaskSele
     });
   }, []);
 
+  const showFullReport = useCallback(async (reportId: number) => {
+    try {
+      const report = await reportsAPI.getReport(reportId);
+      setFullContent(prev => ({ ...prev, [reportId]: report.content ?? '' }));
+    } catch (error) {
+      console.error('Error loading report:', error);
+    }
+  }, []);
+
   const clearFilters = useCallback(() => {
     setSelectedEmployee(null);
     setSelectedTask(null);
@@ -269,11 +302,10 @@ const EmployeeReports: React.FC<EmployeeReportsProps> = React.memo(({ onTaskSele
                   </div>
                   <div className="mb-2">
                     <button
-                      onClick={() => {
-                        const task = tasks.find(t => t.id === report.task);
-                        if (task && onTaskSelect) {
-                          onTaskSelect(task);
-                        }
+                      onClick={async () => {
+                        if (!onTaskSelect) return;
+                        const task = tasks.find(t => t.id === report.task) ?? await tasksAPI.getTask(report.task);
+                        onTaskSelect(task);
                       }}
                       className="text-sm font-medium text-indigo-600 hover:text-indigo-800"
                     >
@@ -281,13 +313,34 @@ const EmployeeReports: React.FC<EmployeeReportsProps> = React.memo(({ onTaskSele
                     </button>
                   </div>
                   <p className="text-sm text-gray-700 whitespace-pre-wrap">
-                    {report.content}
+                    {fullContent[report.id] ?? report.content ?? report.content_snippet}
                   </p>
+                  {fullContent[report.id] === undefined &&
+                    report.content === undefined &&
+                    report.content_length > (report.content_snippet?.length ?? 0) && (
+                    <button
+                      onClick={() => showFullReport(report.id)}
+                      className="mt-1 text-xs font-medium text-indigo-600 hover:text-indigo-800"
+                    >
+                      Show full report
+                    </button>
+                  )}
                 </div>
               </div>
             </div>
           ))
         )}
+        {nextPage && (
+          <div className="p-4 text-center">
+            <button
+              onClick={loadMore}
+              disabled={isLoadingMore}
+              className="inline-flex items-center px-3 py-1.5 border border-gray-300 text-sm font-medium rounded-md text-gray-700 bg-white hover:bg-gray-50 disabled:opacity-50"
+            >
+              {isLoadingMore ? 'Loading...' : 'Load more reports'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );